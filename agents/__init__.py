@@ -1,7 +1,7 @@
 from .supervisor import SupervisorAgent, route_to_next_agent
 from .literature_reviewer import LiteratureReviewerAgent
 from .technical_analyzer import TechnicalAnalyzerAgent
-from .critical_reviewer import CriticalReviewerAgent
+from .critical_reviewer import CriticalReviewerAgent, get_quality_gate_stats
 from .synthesis_agent import SynthesisAgent
 
 __all__ = [
@@ -10,5 +10,6 @@ __all__ = [
     "TechnicalAnalyzerAgent",
     "CriticalReviewerAgent",
     "SynthesisAgent",
-    "route_to_next_agent"
+    "route_to_next_agent",
+    "get_quality_gate_stats"
 ]
\ No newline at end of file
@@ -1,17 +1,68 @@
 import json
-from typing import Dict, Any
+import re
+import threading
+from typing import Dict, Any, List, Tuple
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from graph.state import AgentState
 from utils.logger import logger, format_agent_message
-from utils.prompts import build_critical_prompt
-from utils.model_factory import create_llm
+from utils.prompts import build_critical_prompt, LITERATURE_REVIEWER_PROMPT, TECHNICAL_ANALYZER_PROMPT
+from utils.model_factory import create_llm, create_structured_llm
+from utils.schemas import CriticalEvaluation
+from utils.deadline import fit_structured_to_deadline
+
+# Share of the remaining time budget the quality assessment may use (synthesis still follows)
+TIME_SHARE = 0.3
+
+SECTION_HEADER_PATTERN = re.compile(r"^([A-Z][A-Z /]+):\s*$", re.MULTILINE)
+
+
+def required_sections(prompt: str) -> Tuple[str, ...]:
+    """Section headers an agent prompt asks for in its OUTPUT FORMAT block"""
+    return tuple(SECTION_HEADER_PATTERN.findall(prompt.split("OUTPUT FORMAT:", 1)[-1]))
+
+
+# Analyses checked by the quality gate: state field -> (label, required section headers)
+GATED_ANALYSES = {
+    "literature_findings": ("literature", required_sections(LITERATURE_REVIEWER_PROMPT)),
+    "technical_analysis": ("technical", required_sections(TECHNICAL_ANALYZER_PROMPT)),
+}
+
+_gate_stats = {"checked": 0, "skipped": 0}
+_gate_lock = threading.Lock()
+
+
+def get_quality_gate_stats() -> Dict[str, Any]:
+    """Process-wide quality gate counters: reviews checked, LLM reviews skipped, skip rate"""
+    with _gate_lock:
+        checked, skipped = _gate_stats["checked"], _gate_stats["skipped"]
+    return {"checked": checked, "skipped": skipped, "skip_rate": skipped / checked if checked else 0.0}
+
+
+def reset_quality_gate_stats():
+    with _gate_lock:
+        _gate_stats.update(checked=0, skipped=0)
+
+
+def _has_section(text: str, header: str) -> bool:
+    # Accepts markdown variants such as "**Key Concepts:**" or "### KEY CONCEPTS"
+    return re.search(rf"^[\s#*]*{re.escape(header)}[\s*]*:?", text, re.IGNORECASE | re.MULTILINE) is not None
 
 
 class CriticalReviewerAgent:
-    def __init__(self, model_name: str = "llama3.1:8b", local: int = 1):
+    def __init__(
+        self,
+        model_name: str = "llama3.1:8b",
+        local: int = 1,
+        quality_gate: bool = False,
+        gate_min_words: int = 150,
+        structured_output: bool = True
+    ):
         self.name = "Critical Reviewer"
         self.model_name = model_name
+        # With quality_gate, analyses that pass cheap structural checks skip the LLM review
+        self.quality_gate = quality_gate
+        self.gate_min_words = gate_min_words
         
         self.llm = create_llm(
             model_name=model_name,
@@ -19,6 +70,8 @@ class CriticalReviewerAgent:
             temperature=0.4,  # Balanced temperature for fair quality assessment
             num_predict=600
         )
+        # Schema-constrained evaluations when the backend supports it; None = parse free text
+        self.structured_llm = create_structured_llm(self.llm, CriticalEvaluation) if structured_output else None
         
         logger.info(f"{self.name} agent ready - Quality Assessor role")
     
@@ -26,77 +79,139 @@ class CriticalReviewerAgent:
         logger.agent_start(self.name, "Quality Assessment and Rerun Recommendation")
         
         try:
-            paper_abstract = state.get("paper_abstract", "")
-            lit_findings = state.get("literature_findings", "")
-            tech_analysis = state.get("technical_analysis", "")
+            if not self._check_inputs(state):
+                return {}
             
-            if not paper_abstract:
-                logger.warning("No paper abstract available")
-                return state
+            evaluation_json = self._gate_evaluation(state) or self._evaluate_quality_and_reruns(state)
             
-            if not lit_findings or not tech_analysis:
-                logger.warning("Cannot perform quality assessment: literature or technical analysis missing")
-                return state
+            return self._apply_evaluation(state, evaluation_json)
             
-            logger.info("Assessing quality of literature review and technical analysis")
-            logger.info("Will determine if reruns are needed or if workflow should proceed to synthesis")
-            
-            evaluation_json = self._evaluate_quality_and_reruns(state)
-            
-            updated_state = state.copy()
-            updated_state["critical_evaluation"] = evaluation_json
-            
-            # Parse the JSON to extract rerun recommendations
-            try:
-                parsed_eval = json.loads(evaluation_json)
-                needs_rerun = parsed_eval.get("needs_rerun", [])
-                
-                if needs_rerun:
-                    logger.warning(f"Critical Reviewer recommends reruns: {needs_rerun}")
-                    updated_state["needs_rerun"] = needs_rerun
-                    # Track rerun counts
-                    for agent in needs_rerun:
-                        if agent == "literature_reviewer":
-                            updated_state["literature_rerun_count"] = state.get("literature_rerun_count", 0) + 1
-                        elif agent == "technical_analyzer":
-                            updated_state["technical_rerun_count"] = state.get("technical_rerun_count", 0) + 1
-                else:
-                    logger.success("Critical Reviewer assessment: Quality is acceptable, proceeding to synthesis")
-                    updated_state["needs_rerun"] = []
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse critical evaluation JSON: {str(e)}")
-                logger.warning("Treating evaluation as acceptable and proceeding to synthesis")
-                updated_state["needs_rerun"] = []
-            
-            message = format_agent_message(
-                agent_name=self.name,
-                content=f"Quality assessment complete. Rerun recommendations: {updated_state.get('needs_rerun', [])}",
-                action="quality_assessment"
-            )
-            current_messages = state.get("messages", [])
-            updated_state["messages"] = current_messages + [message]
-            
-            logger.state_update("critical_evaluation", "Quality assessment stored")
-            logger.success("Critical assessment complete")
+        except Exception as e:
+            logger.error(f"Critical assessment failed: {str(e)}")
+            return {}
+    
+    async def aexecute(self, state: AgentState) -> Dict[str, Any]:
+        logger.agent_start(self.name, "Quality Assessment and Rerun Recommendation")
+        
+        try:
+            if not self._check_inputs(state):
+                return {}
             
-            # Always route back to supervisor for next decision
-            updated_state["next_agent"] = "supervisor"
+            evaluation_json = self._gate_evaluation(state) or await self._aevaluate_quality_and_reruns(state)
             
-            return updated_state
+            return self._apply_evaluation(state, evaluation_json)
             
         except Exception as e:
             logger.error(f"Critical assessment failed: {str(e)}")
-            return state
+            return {}
     
-    def _evaluate_quality_and_reruns(self, state: AgentState) -> str:
+    def _check_inputs(self, state: AgentState) -> bool:
+        paper_abstract = state.get("paper_abstract", "")
+        lit_findings = state.get("literature_findings", "")
+        tech_analysis = state.get("technical_analysis", "")
+        
+        if not paper_abstract:
+            logger.warning("No paper abstract available")
+            return False
+        
+        if not lit_findings or not tech_analysis:
+            logger.warning("Cannot perform quality assessment: literature or technical analysis missing")
+            return False
+        
+        logger.info("Assessing quality of literature review and technical analysis")
+        logger.info("Will determine if reruns are needed or if workflow should proceed to synthesis")
+        return True
+    
+    def _gate_issues(self, text: str, sections: Tuple[str, ...]) -> List[str]:
+        issues = [f"missing section {header}" for header in sections if not _has_section(text, header)]
+        word_count = len(text.split())
+        if word_count < self.gate_min_words:
+            issues.append(f"only {word_count} words")
+        return issues
+    
+    def _gate_evaluation(self, state: AgentState) -> str:
         """
-        Evaluates the quality of literature and technical analyses.
-        Returns JSON with quality assessment and rerun recommendations.
+        Cheap pre-check run before the LLM review: if both analyses contain every section
+        their prompt asks for and are long enough, returns an accepting evaluation without
+        calling the LLM. Returns "" when the gate is off or an analysis fails the checks.
         """
+        if not self.quality_gate:
+            return ""
+        
+        evaluation = {}
+        passed = True
+        for field, (label, sections) in GATED_ANALYSES.items():
+            issues = self._gate_issues(state.get(field, ""), sections)
+            passed = passed and not issues
+            evaluation[f"{label}_quality"] = "ACCEPTABLE" if not issues else "NEEDS_IMPROVEMENT"
+            evaluation[f"{label}_assessment"] = (
+                "Passed the structural pre-check (all required sections, sufficient length)."
+                if not issues else f"Failed the structural pre-check: {', '.join(issues)}."
+            )
+        
+        with _gate_lock:
+            _gate_stats["checked"] += 1
+            if passed:
+                _gate_stats["skipped"] += 1
+            checked, skipped = _gate_stats["checked"], _gate_stats["skipped"]
+        
+        if not passed:
+            logger.info(f"Quality gate: LLM review required ({evaluation['literature_assessment']} "
+                        f"{evaluation['technical_assessment']})")
+            return ""
+        
+        logger.info(f"Quality gate: both analyses passed the pre-check, skipping the LLM review "
+                    f"(skip rate {skipped}/{checked} = {skipped / checked:.0%})")
+        evaluation["reasoning"] = "Both analyses passed the structural pre-check, so the LLM review was skipped."
+        evaluation["needs_rerun"] = []
+        evaluation["quality_gate"] = "skipped_llm_review"
+        return json.dumps(evaluation, indent=4)
+    
+    def _apply_evaluation(self, state: AgentState, evaluation_json: str) -> Dict[str, Any]:
+        update = {"critical_evaluation": evaluation_json}
+        
+        # Parse the JSON to extract rerun recommendations
+        try:
+            parsed_eval = json.loads(evaluation_json)
+            needs_rerun = parsed_eval.get("needs_rerun", [])
+            
+            if needs_rerun:
+                logger.warning(f"Critical Reviewer recommends reruns: {needs_rerun}")
+                update["needs_rerun"] = needs_rerun
+                # Track rerun counts
+                for agent in needs_rerun:
+                    if agent == "literature_reviewer":
+                        update["literature_rerun_count"] = state.get("literature_rerun_count", 0) + 1
+                    elif agent == "technical_analyzer":
+                        update["technical_rerun_count"] = state.get("technical_rerun_count", 0) + 1
+            else:
+                logger.success("Critical Reviewer assessment: Quality is acceptable, proceeding to synthesis")
+                update["needs_rerun"] = []
+                
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse critical evaluation JSON: {str(e)}")
+            logger.warning("Treating evaluation as acceptable and proceeding to synthesis")
+            update["needs_rerun"] = []
+        
+        message = format_agent_message(
+            agent_name=self.name,
+            content=f"Quality assessment complete. Rerun recommendations: {update.get('needs_rerun', [])}",
+            action="quality_assessment"
+        )
+        update["messages"] = [message]
+        
+        logger.state_update("critical_evaluation", "Quality assessment stored")
+        logger.success("Critical assessment complete")
+        
+        # Always route back to supervisor for next decision
+        update["next_agent"] = "supervisor"
+        
+        return update
+    
+    def _build_messages(self, state: AgentState) -> list:
         system_prompt = build_critical_prompt(state)
         
-        messages = [
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(
                 content="Evaluate the quality of the literature review and technical analysis. "
@@ -104,11 +219,45 @@ class CriticalReviewerAgent:
                         "Return ONLY valid JSON as specified in the prompt."
             )
         ]
+    
+    def _structured_evaluation(self, result: Dict[str, Any]) -> str:
+        if result["parsed"] is not None:
+            return json.dumps(result["parsed"].model_dump(), indent=4)
+        
+        logger.warning("Structured evaluation did not match the schema, using the raw answer")
+        return result["raw"].content
+    
+    def _evaluate_quality_and_reruns(self, state: AgentState) -> str:
+        """
+        Evaluates the quality of literature and technical analyses.
+        Returns JSON with quality assessment and rerun recommendations.
+        """
+        messages = self._build_messages(state)
         
         logger.info("Running quality assessment via LLM")
-        response = self.llm.invoke(messages)
+        llm, structured_llm = fit_structured_to_deadline(self.llm, self.structured_llm, CriticalEvaluation, state, TIME_SHARE)
+        if structured_llm is not None:
+            evaluation_text = self._structured_evaluation(structured_llm.invoke(messages))
+        else:
+            evaluation_text = llm.invoke(messages).content
         
-        evaluation_text = response.content
+        try:
+            logger.reasoning(evaluation_text[:400])
+        except Exception:
+            pass
+        
+        return evaluation_text
+    
+    async def _aevaluate_quality_and_reruns(self, state: AgentState) -> str:
+        """Async counterpart of _evaluate_quality_and_reruns"""
+        messages = self._build_messages(state)
+        
+        logger.info("Running quality assessment via LLM")
+        llm, structured_llm = fit_structured_to_deadline(self.llm, self.structured_llm, CriticalEvaluation, state, TIME_SHARE)
+        if structured_llm is not None:
+            evaluation_text = self._structured_evaluation(await structured_llm.ainvoke(messages))
+        else:
+            evaluation_text = (await llm.ainvoke(messages)).content
         
         try:
             logger.reasoning(evaluation_text[:400])
@@ -1,17 +1,43 @@
-from typing import Dict, Any
+import re
+from typing import Dict, Any, List, Optional
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from graph.state import AgentState
 from utils.logger import logger, format_agent_message
-from utils.prompts import build_literature_prompt
+from utils.prompts import (
+    build_literature_prompt,
+    build_literature_chunk_prompt,
+    build_literature_reduce_prompt,
+    build_literature_batch_prompt
+)
+from utils.chunking import split_into_chunks, map_reduce, amap_reduce
 from utils.model_factory import create_llm
+from utils.deadline import fit_to_deadline
+
+# Share of the remaining time budget the literature review may use (the other agents still follow)
+TIME_SHARE = 0.3
+
+# "=== PAPER 2 ===" marker lines of a multi-paper answer, tolerating markdown decoration
+PAPER_MARKER_PATTERN = re.compile(r"^[\s#*]*=+\s*PAPER\s+(\d+)\s*=+[\s*]*$", re.MULTILINE | re.IGNORECASE)
 
 
 class LiteratureReviewerAgent:
     
-    def __init__(self, model_name: str = "llama3.1:8b", local: int = 1):
+    def __init__(
+        self,
+        model_name: str = "llama3.1:8b",
+        local: int = 1,
+        chunk_chars: Optional[int] = None,
+        max_concurrency: int = 4,
+        batch_size: int = 1
+    ):
         self.name = "Literature Reviewer"
         self.model_name = model_name
+        # Papers longer than chunk_chars are analyzed chunk by chunk (map-reduce); None = single prompt
+        self.chunk_chars = chunk_chars
+        self.max_concurrency = max_concurrency
+        # review_batch sends up to batch_size abstracts per request; 1 = one request per paper
+        self.batch_size = batch_size
         
         self.llm = create_llm(
             model_name=model_name,
@@ -20,6 +46,22 @@ class LiteratureReviewerAgent:
             num_predict=800   # Longer outputs for detailed analysis
         )
         
+        if chunk_chars:
+            self.chunk_llm = create_llm(
+                model_name=model_name,
+                local=local,
+                temperature=0.3,  # Factual note-taking per chunk
+                num_predict=300   # Short notes keep the reduce prompt bounded
+            )
+        
+        if batch_size > 1:
+            self.batch_llm = create_llm(
+                model_name=model_name,
+                local=local,
+                temperature=0.5,
+                num_predict=800 * batch_size  # One full review per paper in the request
+            )
+        
         logger.info(f"{self.name} agent ready")
     
     def execute(self, state: AgentState) -> Dict[str, Any]:
@@ -29,51 +71,178 @@ class LiteratureReviewerAgent:
             paper_abstract = state.get("paper_abstract", "")
             if not paper_abstract:
                 logger.warning("No paper abstract available")
-                return state
+                return {}
             
             logger.info(f"Analyzing paper ({len(paper_abstract)} chars)")
             
-            findings = self._analyze_literature(paper_abstract)
-            
-            logger.reasoning(f"Identified key research context and related work areas. "
-                           f"Analysis covers: key concepts, research domain, novelty assessment.")
+            findings = self._analyze_literature(paper_abstract, state)
             
-            updated_state = state.copy()
-            updated_state["literature_findings"] = findings
+            return self._apply_findings(state, findings)
             
-            message = format_agent_message(
-                agent_name=self.name,
-                content=f"Completed literature review. Identified key concepts and research context.",
-                action="literature_analysis"
-            )
-            current_messages = state.get("messages", [])
-            updated_state["messages"] = current_messages + [message]
+        except Exception as e:
+            logger.error(f"Literature review failed: {str(e)}")
+            return {}
+    
+    async def aexecute(self, state: AgentState) -> Dict[str, Any]:
+        logger.agent_start(self.name, "Analyzing Research Context")
+        
+        try:
+            paper_abstract = state.get("paper_abstract", "")
+            if not paper_abstract:
+                logger.warning("No paper abstract available")
+                return {}
             
-            logger.state_update("literature_findings", findings[:150])
-            logger.success("Literature review complete")
+            logger.info(f"Analyzing paper ({len(paper_abstract)} chars)")
             
-            updated_state["next_agent"] = "supervisor"
+            findings = await self._aanalyze_literature(paper_abstract, state)
             
-            return updated_state
+            return self._apply_findings(state, findings)
             
         except Exception as e:
             logger.error(f"Literature review failed: {str(e)}")
-            return state
+            return {}
     
-    def _analyze_literature(self, paper_abstract: str) -> str:
+    def _apply_findings(self, state: AgentState, findings: str) -> Dict[str, Any]:
+        logger.reasoning(f"Identified key research context and related work areas. "
+                       f"Analysis covers: key concepts, research domain, novelty assessment.")
+        
+        update = {"literature_findings": findings}
+        
+        message = format_agent_message(
+            agent_name=self.name,
+            content=f"Completed literature review. Identified key concepts and research context.",
+            action="literature_analysis"
+        )
+        update["messages"] = [message]
+        
+        logger.state_update("literature_findings", findings[:150])
+        logger.success("Literature review complete")
+        
+        update["next_agent"] = "supervisor"
+        
+        return update
+    
+    def _build_messages(self, paper_abstract: str) -> list:
         system_prompt = build_literature_prompt({"paper_abstract": paper_abstract})
         
-        messages = [
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(content="Provide your literature review analysis following the specified format.")
         ]
+    
+    def _use_chunks(self, paper_abstract: str) -> bool:
+        return bool(self.chunk_chars) and len(paper_abstract) > self.chunk_chars
+    
+    def _chunk_messages(self, chunk: str, index: int, total: int) -> list:
+        return [
+            SystemMessage(content=build_literature_chunk_prompt(chunk, index, total)),
+            HumanMessage(content="Provide your notes on this part following the specified format.")
+        ]
+    
+    def _reduce_messages(self, notes: List[str]) -> list:
+        return [
+            SystemMessage(content=build_literature_reduce_prompt(notes)),
+            HumanMessage(content="Provide your literature review analysis following the specified format.")
+        ]
+    
+    def _analyze_literature(self, paper_abstract: str, state: Optional[AgentState] = None) -> str:
+        llm = fit_to_deadline(self.llm, state or {}, TIME_SHARE)
+        if self._use_chunks(paper_abstract):
+            chunks = split_into_chunks(paper_abstract, self.chunk_chars)
+            logger.info(f"Running the literature analysis over {len(chunks)} chunks (map-reduce)")
+            return map_reduce(fit_to_deadline(self.chunk_llm, state or {}, TIME_SHARE), llm, chunks,
+                              self._chunk_messages, self._reduce_messages, max_concurrency=self.max_concurrency)
+        
+        messages = self._build_messages(paper_abstract)
         
         logger.info("Running the literature analysis")
-        response = self.llm.invoke(messages)
+        response = llm.invoke(messages)
         try:
             logger.reasoning(response.content[:500])
         except Exception:
             # Fallback: if response has no content attribute or logger fails, ignore
             pass
 
-        return response.content
\ No newline at end of file
+        return response.content
+    
+    async def _aanalyze_literature(self, paper_abstract: str, state: Optional[AgentState] = None) -> str:
+        llm = fit_to_deadline(self.llm, state or {}, TIME_SHARE)
+        if self._use_chunks(paper_abstract):
+            chunks = split_into_chunks(paper_abstract, self.chunk_chars)
+            logger.info(f"Running the literature analysis over {len(chunks)} chunks (map-reduce)")
+            return await amap_reduce(fit_to_deadline(self.chunk_llm, state or {}, TIME_SHARE), llm, chunks,
+                                     self._chunk_messages, self._reduce_messages, max_concurrency=self.max_concurrency)
+        
+        messages = self._build_messages(paper_abstract)
+        
+        logger.info("Running the literature analysis")
+        response = await llm.ainvoke(messages)
+        try:
+            logger.reasoning(response.content[:500])
+        except Exception:
+            pass
+
+        return response.content
+    
+    def _batch_messages(self, abstracts: List[str]) -> list:
+        return [
+            SystemMessage(content=build_literature_batch_prompt(abstracts)),
+            HumanMessage(content="Provide the literature review of every paper following the specified format.")
+        ]
+    
+    def _split_batch_response(self, content: str, count: int) -> List[Optional[str]]:
+        """Splits a multi-paper answer at its paper markers; papers without a usable section are None"""
+        sections: List[Optional[str]] = [None] * count
+        markers = list(PAPER_MARKER_PATTERN.finditer(content))
+        
+        for marker, next_marker in zip(markers, markers[1:] + [None]):
+            index = int(marker.group(1)) - 1
+            end = next_marker.start() if next_marker else len(content)
+            section = content[marker.end():end].strip()
+            if 0 <= index < count and section and sections[index] is None:
+                sections[index] = section
+        
+        return sections
+    
+    def review_batch(self, abstracts: List[str], config: Optional[Dict[str, Any]] = None) -> List[Optional[str]]:
+        """
+        Literature findings for several independent papers with as few requests as possible.
+        With batch_size > 1, up to batch_size abstracts share one request whose answer is
+        split back at the paper markers. Papers the answer does not cover fall back to one
+        prompt each, sent concurrently with llm.batch. Papers long enough to be chunked are
+        left out; a paper whose review failed is None, so the workflow reviews it as usual.
+        """
+        config = {**(config or {}), "max_concurrency": self.max_concurrency}
+        findings: List[Optional[str]] = [None] * len(abstracts)
+        pending = [index for index, abstract in enumerate(abstracts) if abstract and not self._use_chunks(abstract)]
+        
+        if self.batch_size > 1 and len(pending) > 1:
+            groups = [pending[start:start + self.batch_size] for start in range(0, len(pending), self.batch_size)]
+            logger.info(f"Reviewing {len(pending)} papers in {len(groups)} multi-paper requests")
+            responses = self.batch_llm.batch(
+                [self._batch_messages([abstracts[index] for index in group]) for group in groups],
+                config=config,
+                return_exceptions=True
+            )
+            for group, response in zip(groups, responses):
+                if isinstance(response, Exception):
+                    logger.warning(f"Multi-paper literature request failed: {str(response)}")
+                    continue
+                for index, section in zip(group, self._split_batch_response(response.content, len(group))):
+                    findings[index] = section
+            pending = [index for index in pending if findings[index] is None]
+        
+        if pending:
+            logger.info(f"Reviewing {len(pending)} papers with one request each")
+            responses = self.llm.batch(
+                [self._build_messages(abstracts[index]) for index in pending],
+                config=config,
+                return_exceptions=True
+            )
+            for index, response in zip(pending, responses):
+                if isinstance(response, Exception):
+                    logger.warning(f"Literature review failed: {str(response)}")
+                    continue
+                findings[index] = response.content
+        
+        return findings
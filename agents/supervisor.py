@@ -1,18 +1,39 @@
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from graph.state import AgentState
 from utils.logger import logger, format_agent_message
-from utils.prompts import build_supervisor_prompt
-from utils.model_factory import create_llm
+from utils.prompts import build_supervisor_prompt, build_partial_report
+from utils.model_factory import create_llm, create_structured_llm
+from utils.schemas import RoutingDecision
+from utils.deadline import remaining_time, reserve, fit_structured_to_deadline
+
+
+ROUTING_MODES = ("llm", "rules")
+# Share of the remaining time budget a routing decision may use
+TIME_SHARE = 0.1
+ROUTING_TARGETS = ("literature_reviewer", "technical_analyzer", "critical_reviewer", "synthesis", "FINISH")
+# State field each agent produces, in pipeline order
+PIPELINE_STEPS = (
+    ("literature_findings", "literature_reviewer"),
+    ("technical_analysis", "technical_analyzer"),
+    ("critical_evaluation", "critical_reviewer"),
+    ("final_report", "synthesis"),
+)
+ANALYSIS_FIELDS = tuple(field for field, _ in PIPELINE_STEPS[:-1])
 
 
 class SupervisorAgent:
     
-    def __init__(self, model_name: str = "llama3.1:8b", local: int = 1):
+    def __init__(self, model_name: str = "llama3.1:8b", local: int = 1, routing_mode: str = "llm", structured_output: bool = True):
+        if routing_mode not in ROUTING_MODES:
+            raise ValueError(f"Unknown routing mode '{routing_mode}', expected one of {ROUTING_MODES}")
+        
         self.name = "Supervisor"
         self.model_name = model_name
+        # "llm": every hop asks the LLM; "rules": deterministic routing, LLM only for ambiguous states
+        self.routing_mode = routing_mode
         
         self.llm = create_llm(
             model_name=model_name,
@@ -20,8 +41,10 @@ class SupervisorAgent:
             temperature=0.3,  # Lower temperature for consistent decisions
             num_predict=500   # Limit output length
         )
+        # Schema-constrained decisions when the backend supports it; None = parse free text
+        self.structured_llm = create_structured_llm(self.llm, RoutingDecision) if structured_output else None
         
-        logger.info(f"{self.name} agent ready")
+        logger.info(f"{self.name} agent ready (routing mode: {routing_mode})")
     
     def execute(self, state: AgentState) -> Dict[str, Any]:
         logger.agent_start(self.name, "Hierarchical Coordinator")
@@ -30,101 +53,243 @@ class SupervisorAgent:
             iteration = state.get("iteration_count", 0) + 1
             logger.info(f"Reviewing workflow state (iteration {iteration})")
             
-            if iteration > 15:
-                logger.warning("Maximum iterations reached. Forcing completion.")
-                return self._force_completion(state)
-
-            # Check if Critical Reviewer has recommended reruns
-            needs_rerun = state.get("needs_rerun") or []
-            if needs_rerun:
-                # Process rerun requests from Critical Reviewer
-                next_agent = needs_rerun[0]
-                logger.warning(f"Supervisor detected rerun request from Critical Reviewer: {needs_rerun}")
-                logger.info(f"Routing to {next_agent} for re-execution")
-
-                # Check if this agent has been rerun too many times (safety check)
-                lit_rerun_count = state.get("literature_rerun_count", 0)
-                tech_rerun_count = state.get("technical_rerun_count", 0)
-                
-                if next_agent == "literature_reviewer" and lit_rerun_count >= 2:
-                    logger.warning("Literature Reviewer has been rerun twice already. Forcing quality as-is and proceeding.")
-                    updated_state = state.copy()
-                    updated_state["needs_rerun"] = needs_rerun[1:] if len(needs_rerun) > 1 else []
-                    updated_state["next_agent"] = needs_rerun[1] if len(needs_rerun) > 1 else "FINISH"
-                    return updated_state
-                
-                if next_agent == "technical_analyzer" and tech_rerun_count >= 2:
-                    logger.warning("Technical Analyzer has been rerun twice already. Forcing quality as-is and proceeding.")
-                    updated_state = state.copy()
-                    updated_state["needs_rerun"] = needs_rerun[1:] if len(needs_rerun) > 1 else []
-                    updated_state["next_agent"] = needs_rerun[1] if len(needs_rerun) > 1 else "FINISH"
-                    return updated_state
-
-                updated_state = state.copy()
-                updated_state["next_agent"] = next_agent
-                updated_state["iteration_count"] = iteration
-                updated_state["needs_rerun"] = needs_rerun[1:] if len(needs_rerun) > 1 else []
-
-                supervisor_message = format_agent_message(
-                    agent_name=self.name,
-                    content=f"Routing to rerun: {next_agent} (recommended by Critical Reviewer)",
-                    action="route_rerun"
-                )
-                current_messages = state.get("messages", [])
-                updated_state["messages"] = current_messages + [supervisor_message]
-
-                logger.state_update("next_agent", next_agent)
-                return updated_state
-
-            # Standard routing decision from LLM
-            reasoning_output = self._make_routing_decision(state)
-            
-            decision = self._parse_decision(reasoning_output)
-            
-            logger.reasoning(decision["reasoning"])
-            logger.decision(
-                f"Route to {decision['next_agent']}", 
-                f"Priority: {decision.get('priority', 'medium')}"
-            )
-            
-            updated_state = state.copy()
-            updated_state["next_agent"] = decision["next_agent"]
-            updated_state["iteration_count"] = iteration
+            routed_state = self._route_without_llm(state, iteration)
+            if routed_state is not None:
+                return routed_state
+
+            decision = self._rule_based_decision(state)
+            if decision is None:
+                # Standard routing decision from LLM
+                decision = self._make_routing_decision(state)
             
-            supervisor_message = format_agent_message(
-                agent_name=self.name,
-                content=f"Routing decision: {decision['next_agent']}. {decision['reasoning'][:100]}",
-                action="route"
-            )
-            current_messages = state.get("messages", [])
-            updated_state["messages"] = current_messages + [supervisor_message]
+            return self._apply_decision(state, iteration, decision)
             
-            if decision["next_agent"] == "FINISH":
-                updated_state["analysis_complete"] = True
-                logger.success("Workflow marked as complete by Supervisor")
+        except Exception as e:
+            logger.error(f"Supervisor execution failed: {str(e)}")
+            return self._fallback_routing(state)
+    
+    async def aexecute(self, state: AgentState) -> Dict[str, Any]:
+        logger.agent_start(self.name, "Hierarchical Coordinator")
+        
+        try:
+            iteration = state.get("iteration_count", 0) + 1
+            logger.info(f"Reviewing workflow state (iteration {iteration})")
             
-            logger.state_update("next_agent", decision["next_agent"])
+            routed_state = self._route_without_llm(state, iteration)
+            if routed_state is not None:
+                return routed_state
+
+            decision = self._rule_based_decision(state)
+            if decision is None:
+                decision = await self._amake_routing_decision(state)
             
-            return updated_state
+            return self._apply_decision(state, iteration, decision)
             
         except Exception as e:
             logger.error(f"Supervisor execution failed: {str(e)}")
             return self._fallback_routing(state)
     
-    def _make_routing_decision(self, state: AgentState) -> str:
+    def _route_without_llm(self, state: AgentState, iteration: int) -> Optional[Dict[str, Any]]:
+        """Handles the iteration cap and Critical Reviewer rerun requests. Returns None when the LLM must decide."""
+        if iteration > 15:
+            logger.warning("Maximum iterations reached. Forcing completion.")
+            return self._force_completion(state)
+
+        deadline_update = self._route_for_deadline(state, iteration)
+        if deadline_update is not None:
+            return deadline_update
+
+        # Check if Critical Reviewer has recommended reruns
+        needs_rerun = state.get("needs_rerun") or []
+        if not needs_rerun:
+            return None
+
+        # Process rerun requests from Critical Reviewer
+        next_agent = needs_rerun[0]
+        logger.warning(f"Supervisor detected rerun request from Critical Reviewer: {needs_rerun}")
+        logger.info(f"Routing to {next_agent} for re-execution")
+
+        # Check if this agent has been rerun too many times (safety check)
+        lit_rerun_count = state.get("literature_rerun_count", 0)
+        tech_rerun_count = state.get("technical_rerun_count", 0)
+        
+        if next_agent == "literature_reviewer" and lit_rerun_count >= 2:
+            logger.warning("Literature Reviewer has been rerun twice already. Forcing quality as-is and proceeding.")
+            return {
+                "needs_rerun": needs_rerun[1:] if len(needs_rerun) > 1 else [],
+                "next_agent": needs_rerun[1] if len(needs_rerun) > 1 else "FINISH"
+            }
+        
+        if next_agent == "technical_analyzer" and tech_rerun_count >= 2:
+            logger.warning("Technical Analyzer has been rerun twice already. Forcing quality as-is and proceeding.")
+            return {
+                "needs_rerun": needs_rerun[1:] if len(needs_rerun) > 1 else [],
+                "next_agent": needs_rerun[1] if len(needs_rerun) > 1 else "FINISH"
+            }
+
+        update = {
+            "next_agent": next_agent,
+            "iteration_count": iteration,
+            "needs_rerun": needs_rerun[1:] if len(needs_rerun) > 1 else []
+        }
+
+        supervisor_message = format_agent_message(
+            agent_name=self.name,
+            content=f"Routing to rerun: {next_agent} (recommended by Critical Reviewer)",
+            action="route_rerun"
+        )
+        update["messages"] = [supervisor_message]
+
+        logger.state_update("next_agent", next_agent)
+        return update
+    
+    def _route_for_deadline(self, state: AgentState, iteration: int) -> Optional[Dict[str, Any]]:
+        """
+        Skips reruns, and near the deadline every step but synthesis. Without any completed
+        analysis to synthesize, the run ends with a partial report instead. None when time
+        allows the usual routing.
+        """
+        remaining = remaining_time(state)
+        if remaining is None:
+            return None
+        
+        has_report = bool(state.get("final_report"))
+        if remaining < reserve("synthesis_reserve", state):
+            next_agent = "FINISH" if has_report else "synthesis"
+            reason = f"only {remaining:.0f}s of the time budget left, skipping the remaining analysis steps"
+        elif state.get("needs_rerun") and remaining < reserve("rerun_reserve", state):
+            next_agent = "FINISH" if has_report else "synthesis"
+            reason = f"only {remaining:.0f}s of the time budget left, skipping reruns {state['needs_rerun']}"
+        else:
+            return None
+        
+        update = {
+            "next_agent": next_agent,
+            "iteration_count": iteration,
+            "needs_rerun": []
+        }
+        if next_agent == "synthesis" and not any(state.get(field) for field in ANALYSIS_FIELDS):
+            # A report written from the abstract alone would pass for a real analysis
+            next_agent = update["next_agent"] = "FINISH"
+            reason = f"only {remaining:.0f}s of the time budget left and no analysis completed, returning a partial report"
+            update.update(timed_out=True, final_report=build_partial_report(state))
+        
+        logger.warning(f"Supervisor: {reason}")
+        if next_agent == "FINISH":
+            update["analysis_complete"] = True
+        update["messages"] = [format_agent_message(
+            agent_name=self.name,
+            content=f"Routing to {next_agent}: {reason}",
+            action="route_deadline"
+        )]
+        
+        logger.state_update("next_agent", next_agent)
+        return update
+    
+    def _rule_based_decision(self, state: AgentState) -> Optional[Dict[str, str]]:
+        """
+        Deterministic routing from the state fields, following the fixed order in SUPERVISOR_PROMPT.
+        Returns None in "llm" mode, or when the state is ambiguous and the LLM should decide.
+        """
+        if self.routing_mode != "rules":
+            return None
+        
+        if not state.get("literature_findings"):
+            next_agent = "literature_reviewer"
+        elif not state.get("technical_analysis"):
+            next_agent = "technical_analyzer"
+        elif not state.get("critical_evaluation"):
+            next_agent = "critical_reviewer"
+        elif self._analyses_rerun_since_review(state):
+            # Reruns finished after the last quality assessment: re-review or synthesize is a judgement call
+            logger.info("Ambiguous state after reruns - deferring routing to the LLM")
+            return None
+        elif not state.get("final_report"):
+            next_agent = "synthesis"
+        else:
+            next_agent = "FINISH"
+        
+        logger.info("Rule-based routing decision (no LLM call)")
+        return {
+            "reasoning": f"Deterministic routing: next pending step is {next_agent}.",
+            "next_agent": next_agent,
+            "priority": "medium"
+        }
+    
+    def _analyses_rerun_since_review(self, state: AgentState) -> bool:
+        for message in reversed(state.get("messages", [])):
+            action = message.get("action", "")
+            if action == "quality_assessment":
+                return False
+            if action in ("literature_analysis", "technical_analysis"):
+                return True
+        return False
+    
+    def _apply_decision(self, state: AgentState, iteration: int, decision: Dict[str, str]) -> Dict[str, Any]:
+        logger.reasoning(decision["reasoning"])
+        logger.decision(
+            f"Route to {decision['next_agent']}", 
+            f"Priority: {decision.get('priority', 'medium')}"
+        )
+        
+        update = {
+            "next_agent": decision["next_agent"],
+            "iteration_count": iteration
+        }
+        
+        supervisor_message = format_agent_message(
+            agent_name=self.name,
+            content=f"Routing decision: {decision['next_agent']}. {decision['reasoning'][:100]}",
+            action="route"
+        )
+        update["messages"] = [supervisor_message]
+        
+        if decision["next_agent"] == "FINISH":
+            update["analysis_complete"] = True
+            logger.success("Workflow marked as complete by Supervisor")
+        
+        logger.state_update("next_agent", decision["next_agent"])
+        
+        return update
+    
+    def _build_messages(self, state: AgentState) -> list:
         system_prompt = build_supervisor_prompt(state)
         
-        messages = [
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(content="Analyze the current state and decide the next agent to execute. Provide your response in the JSON format specified.")
         ]
+    
+    def _make_routing_decision(self, state: AgentState) -> Dict[str, str]:
+        messages = self._build_messages(state)
         
         logger.info("Consulting the LLM for a routing decision")
-        response = self.llm.invoke(messages)
+        llm, structured_llm = fit_structured_to_deadline(self.llm, self.structured_llm, RoutingDecision, state, TIME_SHARE)
+        if structured_llm is not None:
+            return self._structured_decision(structured_llm.invoke(messages), state)
         
-        return response.content
+        response = llm.invoke(messages)
+        return self._parse_decision(response.content, state)
     
-    def _parse_decision(self, llm_output: str) -> Dict[str, str]:
+    async def _amake_routing_decision(self, state: AgentState) -> Dict[str, str]:
+        messages = self._build_messages(state)
+        
+        logger.info("Consulting the LLM for a routing decision")
+        llm, structured_llm = fit_structured_to_deadline(self.llm, self.structured_llm, RoutingDecision, state, TIME_SHARE)
+        if structured_llm is not None:
+            return self._structured_decision(await structured_llm.ainvoke(messages), state)
+        
+        response = await llm.ainvoke(messages)
+        return self._parse_decision(response.content, state)
+    
+    def _structured_decision(self, result: Dict[str, Any], state: AgentState) -> Dict[str, str]:
+        if result["parsed"] is not None:
+            return result["parsed"].model_dump()
+        
+        logger.warning("Structured routing decision did not match the schema, parsing the raw answer")
+        return self._parse_decision(result["raw"].content, state)
+    
+    def _parse_decision(self, llm_output: str, state: AgentState) -> Dict[str, str]:
         try:
             if "{" in llm_output and "}" in llm_output:
                 json_start = llm_output.find("{")
@@ -132,16 +297,16 @@ class SupervisorAgent:
                 json_str = llm_output[json_start:json_end]
                 decision = json.loads(json_str)
                 
-                if "next_agent" in decision:
+                if decision.get("next_agent") in ROUTING_TARGETS:
                     return decision
         except:
             pass
         
         logger.warning("Could not parse JSON, using fallback extraction")
-        decision = self._extract_decision_from_text(llm_output)
+        decision = self._extract_decision_from_text(llm_output, state)
         return decision
     
-    def _extract_decision_from_text(self, text: str) -> Dict[str, str]:
+    def _extract_decision_from_text(self, text: str, state: AgentState) -> Dict[str, str]:
         text_lower = text.lower()
         
         if "literature" in text_lower and "review" in text_lower:
@@ -155,7 +320,7 @@ class SupervisorAgent:
         elif "finish" in text_lower or "complete" in text_lower:
             next_agent = "FINISH"
         else:
-            next_agent = self._get_default_next_agent(text)
+            next_agent = self._get_default_next_agent(state)
         
         return {
             "reasoning": text[:200],
@@ -163,41 +328,46 @@ class SupervisorAgent:
             "priority": "medium"
         }
     
-    def _get_default_next_agent(self, text: str) -> str:
-        return "literature_reviewer"
+    def _get_default_next_agent(self, state: AgentState) -> str:
+        # Continue with the next pending step rather than restarting at the literature review
+        for field, agent in PIPELINE_STEPS:
+            if not state.get(field):
+                return agent
+        return "FINISH"
     
     def _fallback_routing(self, state: AgentState) -> Dict[str, Any]:
         logger.warning("Using fallback routing logic")
         
-        updated_state = state.copy()
+        update = {}
         
         if not state.get("literature_findings"):
-            updated_state["next_agent"] = "literature_reviewer"
+            update["next_agent"] = "literature_reviewer"
         elif not state.get("technical_analysis"):
-            updated_state["next_agent"] = "technical_analyzer"
+            update["next_agent"] = "technical_analyzer"
         elif not state.get("critical_review"):
-            updated_state["next_agent"] = "critical_reviewer"
+            update["next_agent"] = "critical_reviewer"
         elif not state.get("final_report"):
-            updated_state["next_agent"] = "synthesis"
+            update["next_agent"] = "synthesis"
         else:
-            updated_state["next_agent"] = "FINISH"
-            updated_state["analysis_complete"] = True
+            update["next_agent"] = "FINISH"
+            update["analysis_complete"] = True
         
-        return updated_state
+        return update
     
     def _force_completion(self, state: AgentState) -> Dict[str, Any]:
-        updated_state = state.copy()
-        updated_state["next_agent"] = "FINISH"
-        updated_state["analysis_complete"] = True
+        update = {
+            "next_agent": "FINISH",
+            "analysis_complete": True
+        }
         
         message = format_agent_message(
             agent_name=self.name,
             content="Maximum iterations reached. Forcing workflow completion.",
             action="force_complete"
         )
-        updated_state["messages"] = state.get("messages", []) + [message]
+        update["messages"] = [message]
         
-        return updated_state
+        return update
 
 
 def route_to_next_agent(state: AgentState) -> str:
@@ -1,17 +1,26 @@
-from typing import Dict, Any
+import threading
+import time
+from typing import Dict, Any, List, Optional
 from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.runnables import ensure_config
 
 from graph.state import AgentState
 from utils.logger import logger, format_agent_message
 from utils.prompts import build_synthesis_prompt
 from utils.model_factory import create_llm
+from utils.deadline import fit_to_deadline
+
+# Share of the remaining time budget the report may use (the last step, so most of it)
+TIME_SHARE = 0.9
 
 
 class SynthesisAgent:
     
-    def __init__(self, model_name: str = "llama3.1:8b", local: int = 1):
+    def __init__(self, model_name: str = "llama3.1:8b", local: int = 1, stream: bool = False):
         self.name = "Synthesis Agent"
         self.model_name = model_name
+        # Print report tokens as they are generated instead of after the full report
+        self.stream = stream
         
         self.llm = create_llm(
             model_name=model_name,
@@ -26,81 +35,203 @@ class SynthesisAgent:
         logger.agent_start(self.name, "Synthesizing Final Report")
         
         try:
-            paper_abstract = state.get("paper_abstract", "")
-            lit_findings = state.get("literature_findings", "")
-            tech_analysis = state.get("technical_analysis", "")
-            critical_review = state.get("critical_review", "")
-            
-            if not all([paper_abstract, lit_findings, tech_analysis, critical_review]):
-                missing = []
-                if not lit_findings:
-                    missing.append("literature review")
-                if not tech_analysis:
-                    missing.append("technical analysis")
-                if not critical_review:
-                    missing.append("critical review")
-                
-                # logger.warning(f"Incomplete analyses. Missing: {', '.join(missing)}")
-                logger.info("Proceeding with the available information")
-            
-            total_content = sum([
-                len(lit_findings),
-                len(tech_analysis),
-                len(critical_review)
-            ])
-            logger.info(f"Integrating {total_content} characters from three agents")
+            self._check_inputs(state)
             
             final_report = self._synthesize_report(state)
             
-            logger.reasoning(
-                f"Synthesized insights from {3} specialized agents into a unified review. "
-                f"This demonstrates EMERGENT BEHAVIOR - the final report's quality and "
-                f"structure emerges from simple agent interactions, not explicit programming. "
-                f"Each agent contributed specialized analysis; synthesis creates holistic value."
-            )
-            
-            updated_state = state.copy()
-            updated_state["final_report"] = final_report
-            updated_state["analysis_complete"] = True
+            return self._apply_report(state, final_report)
             
-            message = format_agent_message(
-                agent_name=self.name,
-                content=f"Completed final synthesis. Generated comprehensive review report integrating all agent findings.",
-                action="synthesis_complete"
-            )
-            current_messages = state.get("messages", [])
-            updated_state["messages"] = current_messages + [message]
-            
-            logger.state_update("final_report", "Complete synthesis generated")
-            logger.success("Synthesis complete - final report generated")
-            
-            updated_state["next_agent"] = "FINISH"
+        except Exception as e:
+            logger.error(f"Synthesis failed: {str(e)}")
+            return {}
+    
+    async def aexecute(self, state: AgentState) -> Dict[str, Any]:
+        logger.agent_start(self.name, "Synthesizing Final Report")
+        
+        try:
+            self._check_inputs(state)
             
-            logger.final_output(final_report)
+            final_report = await self._asynthesize_report(state)
             
-            return updated_state
+            return self._apply_report(state, final_report)
             
         except Exception as e:
             logger.error(f"Synthesis failed: {str(e)}")
-            return state
+            return {}
     
-    def _synthesize_report(self, state: AgentState) -> str:
+    def _check_inputs(self, state: AgentState):
+        paper_abstract = state.get("paper_abstract", "")
+        lit_findings = state.get("literature_findings", "")
+        tech_analysis = state.get("technical_analysis", "")
+        critical_review = state.get("critical_review", "")
+        
+        if not all([paper_abstract, lit_findings, tech_analysis, critical_review]):
+            missing = []
+            if not lit_findings:
+                missing.append("literature review")
+            if not tech_analysis:
+                missing.append("technical analysis")
+            if not critical_review:
+                missing.append("critical review")
+            
+            # logger.warning(f"Incomplete analyses. Missing: {', '.join(missing)}")
+            logger.info("Proceeding with the available information")
+        
+        total_content = sum([
+            len(lit_findings),
+            len(tech_analysis),
+            len(critical_review)
+        ])
+        logger.info(f"Integrating {total_content} characters from three agents")
+    
+    def _apply_report(self, state: AgentState, final_report: str) -> Dict[str, Any]:
+        logger.reasoning(
+            f"Synthesized insights from {3} specialized agents into a unified review. "
+            f"This demonstrates EMERGENT BEHAVIOR - the final report's quality and "
+            f"structure emerges from simple agent interactions, not explicit programming. "
+            f"Each agent contributed specialized analysis; synthesis creates holistic value."
+        )
+        
+        update = {
+            "final_report": final_report,
+            "analysis_complete": True
+        }
+        
+        message = format_agent_message(
+            agent_name=self.name,
+            content=f"Completed final synthesis. Generated comprehensive review report integrating all agent findings.",
+            action="synthesis_complete"
+        )
+        update["messages"] = [message]
+        
+        logger.state_update("final_report", "Complete synthesis generated")
+        logger.success("Synthesis complete - final report generated")
+        
+        update["next_agent"] = "FINISH"
+        
+        if not self.stream:
+            logger.final_output(final_report)
+        
+        return update
+    
+    def _build_messages(self, state: AgentState) -> list:
         system_prompt = build_synthesis_prompt(state)
         
-        messages = [
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(content="Create the final comprehensive review report by synthesizing "
                                 "all the analyses. Follow the specified format and provide a "
                                 "balanced, professional assessment.")
         ]
+    
+    def _synthesize_report(self, state: AgentState) -> str:
+        messages = self._build_messages(state)
         
         logger.info("Running the final synthesis")
         logger.info("Pulling together the remaining context for the report")
         
-        response = self.llm.invoke(messages)
+        llm = fit_to_deadline(self.llm, state, TIME_SHARE)
+        if self.stream:
+            return self._stream_report(llm, messages)
+        
+        response = llm.invoke(messages)
         try:
             logger.reasoning(response.content[:500])
         except Exception:
             pass
 
-        return response.content
\ No newline at end of file
+        return response.content
+    
+    async def _asynthesize_report(self, state: AgentState) -> str:
+        messages = self._build_messages(state)
+        
+        logger.info("Running the final synthesis")
+        logger.info("Pulling together the remaining context for the report")
+        
+        llm = fit_to_deadline(self.llm, state, TIME_SHARE)
+        if self.stream:
+            return await self._astream_report(llm, messages)
+        
+        response = await llm.ainvoke(messages)
+        try:
+            logger.reasoning(response.content[:500])
+        except Exception:
+            pass
+
+        return response.content
+    
+    def _stream_report(self, llm, messages: list) -> str:
+        start_time = time.time()
+        first_token_time = None
+        parts = []
+        
+        logger.stream_start()
+        for chunk in llm.stream(messages):
+            if not chunk.content:
+                continue
+            if first_token_time is None:
+                first_token_time = time.time() - start_time
+            parts.append(chunk.content)
+            logger.stream_token(chunk.content)
+        logger.stream_end()
+        
+        self._log_stream_timing(start_time, first_token_time)
+        return "".join(parts)
+    
+    async def _astream_report(self, llm, messages: list) -> str:
+        start_time = time.time()
+        first_token_time = None
+        parts = []
+        
+        logger.stream_start()
+        async for chunk in llm.astream(messages):
+            if not chunk.content:
+                continue
+            if first_token_time is None:
+                first_token_time = time.time() - start_time
+            parts.append(chunk.content)
+            logger.stream_token(chunk.content)
+        logger.stream_end()
+        
+        self._log_stream_timing(start_time, first_token_time)
+        return "".join(parts)
+    
+    def apply_speculative_report(self, state: AgentState, final_report: str) -> Dict[str, Any]:
+        """State update for a report written speculatively during the critical review"""
+        logger.agent_start(self.name, "Keeping the Speculative Report")
+        update = self._apply_report(state, final_report)
+        if self.stream:
+            # The speculative report was generated silently
+            logger.final_output(final_report)
+        return update
+    
+    def _speculation_config(self, node_name: str) -> Dict[str, Any]:
+        # Metrics attribute the speculative call to its own node instead of the Critical Reviewer's
+        config = ensure_config()
+        return {**config, "metadata": {**config.get("metadata", {}), "langgraph_node": node_name}}
+    
+    def speculate(self, state: AgentState, parts: List[str], cancel: threading.Event,
+                  node_name: str = "speculative_synthesis") -> str:
+        """
+        Writes the report without printing it, appending the generated text to parts.
+        Stops generating as soon as cancel is set and returns what was written so far.
+        Runs before the critical review exists, so the report does not take it into account.
+        """
+        llm = fit_to_deadline(self.llm, state, TIME_SHARE)
+        for chunk in llm.stream(self._build_messages(state), config=self._speculation_config(node_name)):
+            if cancel.is_set():
+                break
+            parts.append(chunk.content)
+        return "".join(parts)
+    
+    async def aspeculate(self, state: AgentState, parts: List[str], node_name: str = "speculative_synthesis") -> str:
+        """Async counterpart of speculate; cancel the task to stop it"""
+        llm = fit_to_deadline(self.llm, state, TIME_SHARE)
+        async for chunk in llm.astream(self._build_messages(state), config=self._speculation_config(node_name)):
+            parts.append(chunk.content)
+        return "".join(parts)
+    
+    def _log_stream_timing(self, start_time: float, first_token_time: Optional[float]):
+        if first_token_time is not None:
+            logger.info(f"Report time to first token: {first_token_time:.2f}s "
+                        f"(full report: {time.time() - start_time:.2f}s)")
@@ -1,17 +1,25 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from graph.state import AgentState
 from utils.logger import logger, format_agent_message
-from utils.prompts import build_technical_prompt
+from utils.prompts import build_technical_prompt, build_technical_chunk_prompt, build_technical_reduce_prompt
+from utils.chunking import split_into_chunks, map_reduce, amap_reduce
 from utils.model_factory import create_llm
+from utils.deadline import fit_to_deadline
+
+# Share of the remaining time budget the technical analysis may use (review and synthesis still follow)
+TIME_SHARE = 0.4
 
 
 class TechnicalAnalyzerAgent:
     
-    def __init__(self, model_name: str = "llama3.1:8b", local: int = 1):
+    def __init__(self, model_name: str = "llama3.1:8b", local: int = 1, chunk_chars: Optional[int] = None, max_concurrency: int = 4):
         self.name = "Technical Analyzer"
         self.model_name = model_name
+        # Papers longer than chunk_chars are analyzed chunk by chunk (map-reduce); None = single prompt
+        self.chunk_chars = chunk_chars
+        self.max_concurrency = max_concurrency
         
         self.llm = create_llm(
             model_name=model_name,
@@ -20,62 +28,135 @@ class TechnicalAnalyzerAgent:
             num_predict=800
         )
         
+        if chunk_chars:
+            self.chunk_llm = create_llm(
+                model_name=model_name,
+                local=local,
+                temperature=0.3,  # Factual note-taking per chunk
+                num_predict=300   # Short notes keep the reduce prompt bounded
+            )
+        
         logger.info(f"{self.name} agent ready")
     
     def execute(self, state: AgentState) -> Dict[str, Any]:
         logger.agent_start(self.name, "Evaluating Technical Methodology")
         
         try:
-            paper_abstract = state.get("paper_abstract", "")
-            literature_context = state.get("literature_findings", "")
-            
-            if not paper_abstract:
-                logger.warning("No paper abstract available")
-                return state
-            
-            if literature_context:
-                logger.info("Building on literature review context")
-            else:
-                logger.warning("No literature context available - proceeding anyway")
+            if not self._check_inputs(state):
+                return {}
             
             analysis = self._analyze_technical_approach(state)
             
-            logger.reasoning(f"Evaluated technical methodology, assessed soundness, "
-                           f"identified strengths and potential concerns based on "
-                           f"both paper content and literature context.")
-            
-            updated_state = state.copy()
-            updated_state["technical_analysis"] = analysis
+            return self._apply_analysis(state, analysis)
             
-            message = format_agent_message(
-                agent_name=self.name,
-                content=f"Completed technical analysis. Assessed methodology soundness and identified key technical aspects.",
-                action="technical_analysis"
-            )
-            current_messages = state.get("messages", [])
-            updated_state["messages"] = current_messages + [message]
-            
-            logger.state_update("technical_analysis", analysis[:150])
-            logger.success("Technical analysis complete")
+        except Exception as e:
+            logger.error(f"Technical analysis failed: {str(e)}")
+            return {}
+    
+    async def aexecute(self, state: AgentState) -> Dict[str, Any]:
+        logger.agent_start(self.name, "Evaluating Technical Methodology")
+        
+        try:
+            if not self._check_inputs(state):
+                return {}
             
-            updated_state["next_agent"] = "supervisor"
+            analysis = await self._aanalyze_technical_approach(state)
             
-            return updated_state
+            return self._apply_analysis(state, analysis)
             
         except Exception as e:
             logger.error(f"Technical analysis failed: {str(e)}")
-            return state
+            return {}
     
-    def _analyze_technical_approach(self, state: AgentState) -> str:
+    def _check_inputs(self, state: AgentState) -> bool:
+        paper_abstract = state.get("paper_abstract", "")
+        literature_context = state.get("literature_findings", "")
+        
+        if not paper_abstract:
+            logger.warning("No paper abstract available")
+            return False
+        
+        if literature_context:
+            logger.info("Building on literature review context")
+        else:
+            logger.warning("No literature context available - proceeding anyway")
+        
+        return True
+    
+    def _apply_analysis(self, state: AgentState, analysis: str) -> Dict[str, Any]:
+        logger.reasoning(f"Evaluated technical methodology, assessed soundness, "
+                       f"identified strengths and potential concerns based on "
+                       f"both paper content and literature context.")
+        
+        update = {"technical_analysis": analysis}
+        
+        message = format_agent_message(
+            agent_name=self.name,
+            content=f"Completed technical analysis. Assessed methodology soundness and identified key technical aspects.",
+            action="technical_analysis"
+        )
+        update["messages"] = [message]
+        
+        logger.state_update("technical_analysis", analysis[:150])
+        logger.success("Technical analysis complete")
+        
+        update["next_agent"] = "supervisor"
+        
+        return update
+    
+    def _build_messages(self, state: AgentState) -> list:
         system_prompt = build_technical_prompt(state)
         
-        messages = [
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(content="Provide your technical analysis following the specified format, building on the literature context.")
         ]
+    
+    def _use_chunks(self, state: AgentState) -> bool:
+        return bool(self.chunk_chars) and len(state.get("paper_abstract", "")) > self.chunk_chars
+    
+    def _map_reduce_inputs(self, state: AgentState):
+        chunks = split_into_chunks(state["paper_abstract"], self.chunk_chars)
+        
+        def chunk_messages(chunk: str, index: int, total: int) -> list:
+            return [
+                SystemMessage(content=build_technical_chunk_prompt(state, chunk, index, total)),
+                HumanMessage(content="Provide your notes on this part following the specified format.")
+            ]
+        
+        def reduce_messages(notes: List[str]) -> list:
+            return [
+                SystemMessage(content=build_technical_reduce_prompt(state, notes)),
+                HumanMessage(content="Provide your technical analysis following the specified format, building on the literature context.")
+            ]
+        
+        logger.info(f"Running the technical analysis over {len(chunks)} chunks (map-reduce)")
+        return (fit_to_deadline(self.chunk_llm, state, TIME_SHARE), fit_to_deadline(self.llm, state, TIME_SHARE),
+                chunks, chunk_messages, reduce_messages)
+    
+    def _analyze_technical_approach(self, state: AgentState) -> str:
+        if self._use_chunks(state):
+            return map_reduce(*self._map_reduce_inputs(state), max_concurrency=self.max_concurrency)
+        
+        messages = self._build_messages(state)
+        
+        logger.info("Running the technical analysis")
+        response = fit_to_deadline(self.llm, state, TIME_SHARE).invoke(messages)
+        try:
+            logger.reasoning(response.content[:500])
+        except Exception:
+            pass
+
+        return response.content
+    
+    async def _aanalyze_technical_approach(self, state: AgentState) -> str:
+        if self._use_chunks(state):
+            return await amap_reduce(*self._map_reduce_inputs(state), max_concurrency=self.max_concurrency)
+        
+        messages = self._build_messages(state)
         
         logger.info("Running the technical analysis")
-        response = self.llm.invoke(messages)
+        response = await fit_to_deadline(self.llm, state, TIME_SHARE).ainvoke(messages)
         try:
             logger.reasoning(response.content[:500])
         except Exception:
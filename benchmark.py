@@ -0,0 +1,166 @@
+"""
+Reproducible benchmark of the full research workflow against the deterministic fake LLM
+(utils/fake_llm.py). No Ollama server or OpenAI key is needed.
+
+Example:
+    python benchmark.py --batch-sizes 1,8,32 --concurrency 1,4,16 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+from graph.state import create_initial_state
+from graph.workflow import create_research_workflow, run_workflow, arun_workflow
+from utils.fake_llm import configure_fake_llm
+from utils.logger import logger
+from utils.metrics import metrics
+
+SAMPLE_PAPER_PATH = Path(__file__).parent / "examples" / "sample_paper.txt"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def make_papers(count: int) -> List[Dict[str, str]]:
+    base_text = SAMPLE_PAPER_PATH.read_text(encoding="utf-8").strip()
+    # Distinct texts per paper so nothing can be shared between papers by accident
+    return [
+        {"paper_id": f"bench-{i}", "paper_abstract": f"{base_text}\n\n(Benchmark copy {i})"}
+        for i in range(count)
+    ]
+
+
+def run_threaded(workflow, papers: List[Dict[str, str]], concurrency: int) -> List[Dict[str, Any]]:
+    def timed_run(paper: Dict[str, str]) -> Dict[str, Any]:
+        start_time = time.perf_counter()
+        final_state = run_workflow(workflow, create_initial_state(paper["paper_abstract"], paper["paper_id"]))
+        return {"paper_id": paper["paper_id"], "latency": time.perf_counter() - start_time, "state": final_state}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(timed_run, papers))
+
+
+def run_async(workflow, papers: List[Dict[str, str]], concurrency: int) -> List[Dict[str, Any]]:
+    async def run_all() -> List[Dict[str, Any]]:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed_run(paper: Dict[str, str]) -> Dict[str, Any]:
+            async with semaphore:
+                start_time = time.perf_counter()
+                final_state = await arun_workflow(workflow, create_initial_state(paper["paper_abstract"], paper["paper_id"]))
+                return {"paper_id": paper["paper_id"], "latency": time.perf_counter() - start_time, "state": final_state}
+
+        return await asyncio.gather(*[timed_run(paper) for paper in papers])
+
+    return asyncio.run(run_all())
+
+
+def benchmark_config(workflow, batch_size: int, concurrency: int, use_async: bool) -> Dict[str, Any]:
+    papers = make_papers(batch_size)
+    metrics.reset()
+
+    start_time = time.perf_counter()
+    # Agent logging is silenced so console I/O does not dominate the measurement
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if use_async:
+            results = run_async(workflow, papers, concurrency)
+        else:
+            results = run_threaded(workflow, papers, concurrency)
+    elapsed_time = time.perf_counter() - start_time
+
+    llm_time = {}
+    llm_calls = 0
+    for record in metrics.records:
+        llm_time[record["paper_id"]] = llm_time.get(record["paper_id"], 0.0) + record["llm_time"]
+        llm_calls += record["llm_calls"]
+
+    latencies = [result["latency"] for result in results]
+    overheads = [result["latency"] - llm_time.get(result["paper_id"], 0.0) for result in results]
+    iterations = [result["state"].get("iteration_count", 0) for result in results]
+    completed = sum(1 for result in results if result["state"].get("final_report"))
+
+    return {
+        "mode": "async" if use_async else "threads",
+        "batch_size": batch_size,
+        "concurrency": concurrency,
+        "completed": completed,
+        "elapsed_time": elapsed_time,
+        "throughput": batch_size / elapsed_time if elapsed_time else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "supervisor_iterations_mean": statistics.mean(iterations) if iterations else 0.0,
+        "llm_calls_per_paper": llm_calls / batch_size if batch_size else 0.0,
+        "overhead_p50": percentile(overheads, 50),
+        "overhead_p95": percentile(overheads, 95)
+    }
+
+
+def display_results(results: List[Dict[str, Any]]):
+    logger.section("BENCHMARK RESULTS")
+    print(f"{'Mode':7} | {'Batch':>5} | {'Conc':>4} | {'Done':>4} | {'Papers/s':>8} | {'p50 s':>7} | {'p95 s':>7} | "
+          f"{'Iter':>4} | {'LLM/paper':>9} | {'Overhead p50 ms':>15}")
+    for result in results:
+        print(f"{result['mode']:7} | {result['batch_size']:>5} | {result['concurrency']:>4} | {result['completed']:>4} | "
+              f"{result['throughput']:>8.2f} | {result['latency_p50']:>7.3f} | {result['latency_p95']:>7.3f} | "
+              f"{result['supervisor_iterations_mean']:>4.1f} | {result['llm_calls_per_paper']:>9.1f} | "
+              f"{result['overhead_p50'] * 1000:>15.1f}")
+    print()
+
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the research workflow against a deterministic fake LLM")
+    parser.add_argument("--batch-sizes", type=parse_int_list, default=[1, 8, 32])
+    parser.add_argument("--concurrency", type=parse_int_list, default=[1, 4, 16])
+    parser.add_argument("--latency", type=float, default=0.05, help="Fixed seconds per LLM call")
+    parser.add_argument("--time-per-token", type=float, default=0.0, help="Extra seconds per generated token")
+    parser.add_argument("--output-tokens", type=int, default=200, help="Words generated by free-text agents")
+    parser.add_argument("--parallel", action="store_true", help="Benchmark the parallel analysis graph")
+    parser.add_argument("--routing-mode", default="llm", choices=["llm", "rules"])
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Drive papers with arun_workflow")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    configure_fake_llm(latency=args.latency, time_per_token=args.time_per_token, output_tokens=args.output_tokens)
+    logger.verbosity = -1
+
+    workflow = create_research_workflow(
+        model_name="fake-llm",
+        local=2,
+        parallel=args.parallel,
+        routing_mode=args.routing_mode
+    )
+
+    results = []
+    for batch_size in args.batch_sizes:
+        for concurrency in args.concurrency:
+            if concurrency > batch_size and concurrency != args.concurrency[0]:
+                continue
+            results.append(benchmark_config(workflow, batch_size, concurrency, args.use_async))
+
+    display_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
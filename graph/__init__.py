@@ -7,9 +7,29 @@ from .state import (
 from .workflow import (
     create_research_workflow,
     run_workflow,
+    arun_workflow,
+    resume_workflow,
+    aresume_workflow,
+    stream_workflow,
+    astream_workflow,
     display_workflow_summary,
+    display_metrics_summary,
     visualize_workflow_structure
 )
+from .checkpoint import (
+    create_checkpointer,
+    create_async_checkpointer
+)
+from .results import (
+    create_result_sink,
+    DEFAULT_RESULT_FIELDS
+)
+from .incremental import AnalysisStore
+from .speculation import get_speculation_stats
+from .batch import (
+    iter_papers,
+    run_batch
+)
 
 __all__ = [
     "AgentState",
@@ -18,6 +38,20 @@ __all__ = [
     "STATE_FIELD_DESCRIPTIONS",
     "create_research_workflow",
     "run_workflow",
+    "arun_workflow",
+    "resume_workflow",
+    "aresume_workflow",
+    "stream_workflow",
+    "astream_workflow",
     "display_workflow_summary",
-    "visualize_workflow_structure"
+    "display_metrics_summary",
+    "visualize_workflow_structure",
+    "create_checkpointer",
+    "create_async_checkpointer",
+    "create_result_sink",
+    "DEFAULT_RESULT_FIELDS",
+    "AnalysisStore",
+    "get_speculation_stats",
+    "iter_papers",
+    "run_batch"
 ]
\ No newline at end of file
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional, Sequence, Tuple
+
+from graph.state import AgentState, create_initial_state
+from graph.workflow import run_workflow, resume_workflow
+from graph.checkpoint import checkpointed_abstract
+from graph.incremental import normalize_text
+from graph.results import create_result_sink, build_result_record, build_error_record
+from utils.logger import logger, log_context
+from utils.metrics import metrics
+
+PAPER_FILE_SUFFIXES = (".txt", ".md")
+ABSTRACT_KEYS = ("paper_abstract", "abstract", "text")
+
+
+def iter_papers(source: str) -> Iterator[Dict[str, str]]:
+    """Yield {"paper_id", "paper_abstract"} dicts from a directory of text files or a JSONL file"""
+    path = Path(source)
+
+    if path.is_dir():
+        for file_path in sorted(path.iterdir()):
+            if file_path.suffix.lower() in PAPER_FILE_SUFFIXES:
+                yield {
+                    "paper_id": file_path.stem,
+                    "paper_abstract": file_path.read_text(encoding="utf-8").strip()
+                }
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping malformed JSONL line {line_number}: {str(e)}")
+                continue
+
+            abstract = next((record[key] for key in ABSTRACT_KEYS if record.get(key)), "")
+            if not abstract:
+                logger.warning(f"Skipping JSONL line {line_number}: no abstract field")
+                continue
+
+            paper_id = record.get("paper_id") or record.get("id") or f"line-{line_number}"
+            yield {"paper_id": str(paper_id), "paper_abstract": abstract.strip()}
+
+
+def _paper_thread(workflow, paper: Dict[str, str]) -> Tuple[str, bool]:
+    """
+    Checkpoint thread of a paper and whether it can be resumed. The paper id is the thread
+    id; a checkpoint started from a different abstract is stale, so an edited paper gets a
+    thread named after its abstract's hash, which a crashed rerun of that version resumes.
+    """
+    abstract = normalize_text(paper["paper_abstract"])
+    thread_id = paper["paper_id"]
+    checkpointed = checkpointed_abstract(workflow, thread_id)
+    if checkpointed is None or normalize_text(checkpointed) == abstract:
+        return thread_id, checkpointed is not None
+
+    logger.warning(f"Paper {thread_id} changed since its checkpoint, starting a fresh run")
+    thread_id = f"{thread_id}-{hashlib.sha256(abstract.encode('utf-8')).hexdigest()[:8]}"
+    return thread_id, checkpointed_abstract(workflow, thread_id) is not None
+
+
+def _with_prefetched_literature(
+    jobs: Iterator[Tuple[Dict[str, str], Optional[AgentState]]],
+    literature_agent,
+    group_size: int
+) -> Iterator[Tuple[Dict[str, str], Optional[AgentState]]]:
+    """
+    Reviews the literature of each group of papers with the agent's batched requests before
+    their workflows start. Prefetched findings are marked as reused so the literature node
+    is skipped; papers resuming from a checkpoint or already reusing stored findings are
+    left alone, and papers whose batched review failed are reviewed by the workflow.
+    """
+    while True:
+        group = list(islice(jobs, group_size))
+        if not group:
+            return
+
+        targets = [
+            state for _, state in group
+            if state is not None and "literature_findings" not in state.get("reused_fields", [])
+        ]
+        if targets:
+            group_id = f"{targets[0]['paper_id']}..{targets[-1]['paper_id']}"
+            record = metrics.start_node(group_id, "literature_batch", literature_agent.name)
+            try:
+                findings = literature_agent.review_batch(
+                    [state["paper_abstract"] for state in targets],
+                    config={"metadata": {"paper_id": group_id, "langgraph_node": "literature_batch"}}
+                )
+            except Exception as e:
+                logger.warning(f"Batched literature review failed, reviewing papers one by one: {str(e)}")
+                findings = [None] * len(targets)
+            finally:
+                metrics.end_node(record)
+
+            for state, finding in zip(targets, findings):
+                if finding:
+                    state["literature_findings"] = finding
+                    state["reused_fields"] = list(state.get("reused_fields", [])) + ["literature_findings"]
+
+        yield from group
+
+
+def run_batch(
+    workflow,
+    source: str,
+    output_path: str,
+    max_workers: int = 4,
+    result_fields: Optional[Sequence[str]] = None,
+    analysis_store=None,
+    literature_agent=None,
+    paper_timeout: Optional[float] = None,
+    paper_verbosity: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Runs the compiled workflow over every paper in source using a bounded thread pool.
+    Each finished paper is streamed to output_path (JSONL, or Parquet for a .parquet path
+    when pyarrow is installed) and dropped from memory; papers already present in the
+    output are skipped, so a crashed batch can simply be restarted. result_fields selects
+    the state fields written (see graph.results). If the workflow has a checkpointer,
+    unfinished papers resume from their last node unless their abstract changed since. With an analysis_store
+    (graph.incremental.AnalysisStore), re-submitted papers only re-run the agents whose
+    inputs changed. With a literature_agent (LiteratureReviewerAgent), the literature
+    reviews of upcoming papers are computed in batched requests (see review_batch) ahead
+    of their workflows. paper_timeout (seconds) bounds each paper: a paper that runs out
+    of time is written with a partial report instead of holding its worker.
+    Log lines are tagged with their paper id; paper_verbosity overrides the verbosity of
+    the per-paper runs (e.g. 0 to keep only headers and errors).
+    """
+    logger.header(f"Starting batch analysis ({max_workers} workers)")
+
+    sink = create_result_sink(output_path, result_fields)
+    completed_ids = sink.completed_ids()
+    if completed_ids:
+        logger.info(f"Resuming batch: {len(completed_ids)} papers already completed")
+
+    stats = {"submitted": 0, "succeeded": 0, "failed": 0, "skipped": 0}
+    start_time = time.time()
+
+    def prepare(paper: Dict[str, str]) -> Optional[AgentState]:
+        # With a checkpointer a crashed paper resumes mid-graph, unless its abstract was edited
+        paper["thread_id"], resumable = _paper_thread(workflow, paper)
+        if resumable:
+            return None
+        initial_state = create_initial_state(paper["paper_abstract"], paper_id=paper["paper_id"])
+        if analysis_store is not None:
+            initial_state = analysis_store.prefill(initial_state)
+        return initial_state
+
+    def iter_jobs() -> Iterator[Tuple[Dict[str, str], Optional[AgentState]]]:
+        for paper in iter_papers(source):
+            if paper["paper_id"] in completed_ids:
+                stats["skipped"] += 1
+                continue
+            yield paper, prepare(paper)
+
+    def analyze(paper: Dict[str, str], initial_state: Optional[AgentState]) -> Dict[str, Any]:
+        with log_context(paper_id=paper["paper_id"], verbosity=paper_verbosity):
+            return analyze_paper(paper, initial_state)
+
+    def analyze_paper(paper: Dict[str, str], initial_state: Optional[AgentState]) -> Dict[str, Any]:
+        paper_start = time.time()
+        try:
+            if initial_state is None:
+                final_state = resume_workflow(workflow, paper["thread_id"], timeout=paper_timeout)
+            else:
+                final_state = run_workflow(workflow, initial_state, thread_id=paper["thread_id"], timeout=paper_timeout)
+            if analysis_store is not None:
+                analysis_store.save(final_state)
+            return build_result_record(paper["paper_id"], final_state, time.time() - paper_start, sink.fields)
+        except Exception as e:
+            return build_error_record(paper["paper_id"], e, time.time() - paper_start)
+
+    with sink:
+
+        def write_result(record: Dict[str, Any]):
+            sink.write(record)
+
+            if record["status"] == "ok":
+                stats["succeeded"] += 1
+            else:
+                stats["failed"] += 1
+                logger.error(f"Paper {record['paper_id']} failed: {record['error']}")
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = set()
+
+            jobs = iter_jobs()
+            if literature_agent is not None:
+                # Groups of at least max_workers papers keep every worker supplied
+                jobs = _with_prefetched_literature(jobs, literature_agent, max(literature_agent.batch_size, max_workers))
+
+            for paper, initial_state in jobs:
+                # Keep the queue bounded so huge inputs are never fully loaded in memory
+                if len(in_flight) >= max_workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        write_result(future.result())
+
+                in_flight.add(executor.submit(analyze, paper, initial_state))
+                stats["submitted"] += 1
+
+            for future in as_completed(in_flight):
+                write_result(future.result())
+
+    stats["elapsed_time"] = time.time() - start_time
+
+    logger.header("Batch analysis complete")
+    logger.info(f"Papers analyzed: {stats['succeeded']} ok, {stats['failed']} failed, {stats['skipped']} skipped")
+    logger.info(f"Total batch time: {stats['elapsed_time']:.2f} seconds")
+
+    return stats
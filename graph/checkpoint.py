@@ -0,0 +1,56 @@
+"""Local SQLite checkpointing so an interrupted workflow can resume from its last completed node"""
+
+import sqlite3
+import uuid
+from typing import Any, Dict, Optional
+
+from graph.state import AgentState
+
+
+def create_checkpointer(path: str = "checkpoints.sqlite"):
+    """SQLite checkpointer for workflows driven with run_workflow / resume_workflow"""
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError as e:
+        raise ImportError("Checkpointing requires langgraph-checkpoint-sqlite (pip install langgraph-checkpoint-sqlite)") from e
+
+    return SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+
+
+def create_async_checkpointer(path: str = "checkpoints.sqlite"):
+    """
+    SQLite checkpointer for workflows driven with arun_workflow / aresume_workflow.
+    Call `await checkpointer.conn.close()` when done: aiosqlite runs a non-daemon thread.
+    """
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError as e:
+        raise ImportError("Async checkpointing requires langgraph-checkpoint-sqlite and aiosqlite") from e
+
+    # The connection is opened lazily on the event loop that first uses the saver
+    return AsyncSqliteSaver(aiosqlite.connect(path))
+
+
+def new_thread_id(initial_state: AgentState) -> str:
+    return f"{initial_state.get('paper_id', 'paper')}-{uuid.uuid4().hex[:8]}"
+
+
+def thread_config(thread_id: Optional[str]) -> Dict[str, Any]:
+    if thread_id is None:
+        return {}
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def has_checkpoint(workflow, thread_id: str) -> bool:
+    if workflow.checkpointer is None:
+        return False
+    return bool(workflow.get_state(thread_config(thread_id)).values)
+
+
+def checkpointed_abstract(workflow, thread_id: str) -> Optional[str]:
+    """The paper abstract a thread was started with, or None when it has no checkpoint"""
+    if workflow.checkpointer is None:
+        return None
+    values = workflow.get_state(thread_config(thread_id)).values
+    return values.get("paper_abstract", "") if values else None
@@ -0,0 +1,117 @@
+"""
+Incremental re-analysis: agent outputs are stored under a fingerprint of their inputs, so a
+re-submitted paper only re-runs the agents whose inputs actually changed.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+from graph.state import AgentState
+from utils.logger import logger
+
+# Output field -> state fields it is computed from, in pipeline order
+FIELD_DEPENDENCIES = {
+    "literature_findings": ("paper_abstract",),
+    "technical_analysis": ("paper_abstract", "literature_findings"),
+    "critical_evaluation": ("paper_abstract", "literature_findings", "technical_analysis"),
+    "final_report": ("paper_abstract", "literature_findings", "technical_analysis", "critical_evaluation"),
+}
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace-insensitive form, so re-wrapped or re-indented abstracts keep their fingerprint"""
+    return " ".join((text or "").split())
+
+
+class AnalysisStore:
+    """
+    SQLite store of agent outputs. Outputs are content-addressed by (field, fingerprint of
+    its inputs); the latest fingerprints of each paper are kept per field as well. scope
+    separates outputs of different models/backends (e.g. "1:llama3.1:8b").
+    """
+
+    def __init__(self, path: str = ".analysis_store.sqlite", scope: str = ""):
+        self.path = path
+        self.scope = scope
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS field_outputs ("
+            "field TEXT NOT NULL, fingerprint TEXT NOT NULL, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, PRIMARY KEY (field, fingerprint))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS paper_fingerprints ("
+            "paper_id TEXT NOT NULL, field TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, PRIMARY KEY (paper_id, field))"
+        )
+        self._conn.commit()
+
+    def fingerprint(self, field: str, state: AgentState) -> str:
+        digest = hashlib.sha256(f"{self.scope}\x00{field}".encode("utf-8"))
+        for input_field in FIELD_DEPENDENCIES[field]:
+            digest.update(b"\x00" + normalize_text(state.get(input_field, "")).encode("utf-8"))
+        return digest.hexdigest()
+
+    def prefill(self, initial_state: AgentState) -> AgentState:
+        """
+        Copies every stored output whose input fingerprint still matches into the initial
+        state and lists them in reused_fields. Stops at the first changed field, since all
+        fields after it depend on its new output.
+        """
+        state = initial_state.copy()
+        reused: List[str] = []
+
+        with self._lock:
+            for field in FIELD_DEPENDENCIES:
+                row = self._conn.execute(
+                    "SELECT value FROM field_outputs WHERE field = ? AND fingerprint = ?",
+                    (field, self.fingerprint(field, state))
+                ).fetchone()
+                if row is None:
+                    break
+                state[field] = row[0]
+                reused.append(field)
+
+        if reused:
+            state["reused_fields"] = reused
+            # A reused evaluation was already acted on when it was produced
+            state["needs_rerun"] = []
+            logger.info(f"Incremental re-analysis: reusing {', '.join(reused)}")
+        return state
+
+    def save(self, final_state: AgentState):
+        """Stores the outputs of a finished run under the fingerprints of their inputs"""
+        now = time.time()
+        paper_id = final_state.get("paper_id", "")
+
+        with self._lock:
+            for field in FIELD_DEPENDENCIES:
+                value = final_state.get(field)
+                if not value:
+                    break
+                fingerprint = self.fingerprint(field, final_state)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO field_outputs (field, fingerprint, value, created_at) VALUES (?, ?, ?, ?)",
+                    (field, fingerprint, value, now)
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO paper_fingerprints (paper_id, field, fingerprint, updated_at) VALUES (?, ?, ?, ?)",
+                    (paper_id, field, fingerprint, now)
+                )
+            self._conn.commit()
+
+    def paper_fingerprints(self, paper_id: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT field, fingerprint FROM paper_fingerprints WHERE paper_id = ?", (paper_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
@@ -0,0 +1,249 @@
+"""Append-only result sinks that stream each finished AgentState to disk as papers complete"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Sequence, Set
+
+from graph.state import AgentState, MessageLog
+from utils.logger import logger
+
+# State fields written by default; messages and other large intermediate fields are left out
+DEFAULT_RESULT_FIELDS = (
+    "literature_findings",
+    "technical_analysis",
+    "critical_evaluation",
+    "final_report",
+    "analysis_complete",
+    "iteration_count",
+    "timed_out"
+)
+RECORD_FIELDS = ("paper_id", "status", "elapsed_time", "error")
+PART_INDEX_PATTERN = re.compile(r"^part-(\d+)\.parquet")
+
+
+def build_result_record(
+    paper_id: str,
+    final_state: AgentState,
+    elapsed_time: float,
+    fields: Sequence[str] = DEFAULT_RESULT_FIELDS
+) -> Dict[str, Any]:
+    record = {"paper_id": paper_id, "status": "ok", "elapsed_time": round(elapsed_time, 3)}
+    for field in fields:
+        value = final_state.get(field)
+        record[field] = list(value) if isinstance(value, MessageLog) else value
+    return record
+
+
+def build_error_record(paper_id: str, error: Exception, elapsed_time: float) -> Dict[str, Any]:
+    return {"paper_id": paper_id, "status": "error", "error": str(error), "elapsed_time": round(elapsed_time, 3)}
+
+
+class JSONLResultSink:
+    """
+    Appends one JSON line per result. Every record is flushed to the OS as soon as it is
+    written, so a killed process loses nothing; only the fsync (protection against an OS
+    crash or power loss) is batched every sync_every records or sync_interval seconds and
+    on close. A truncated last line is ignored when reading back.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fields: Sequence[str] = DEFAULT_RESULT_FIELDS,
+        sync_every: int = 20,
+        sync_interval: float = 5.0
+    ):
+        self.path = path
+        self.fields = tuple(fields)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.time()
+        self._lock = threading.Lock()
+
+    def completed_ids(self) -> Set[str]:
+        """Paper ids already written successfully, used to resume a crashed batch"""
+        completed = set()
+        path = Path(self.path)
+
+        if not path.exists():
+            return completed
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a truncated last line behind
+                    continue
+                if record.get("status") == "ok":
+                    completed.add(record.get("paper_id"))
+
+        return completed
+
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every or time.time() - self._last_sync >= self.sync_interval:
+                self._sync()
+
+    def write_state(self, paper_id: str, final_state: AgentState, elapsed_time: float = 0.0):
+        self.write(build_result_record(paper_id, final_state, elapsed_time, self.fields))
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.time()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParquetResultSink:
+    """
+    Writes results to a directory of Parquet part files. Rows are buffered and written
+    as a complete part file (with its footer) every row_group_size rows, and by a
+    background timer every flush_interval seconds, so a crash loses at most the rows of
+    the last few seconds and never leaves a part that cannot be read. A restarted batch
+    appends new parts instead of rewriting old ones; unreadable parts from older versions
+    are moved aside. Text fields are stored as strings; non-string values are stored as JSON.
+    """
+
+    TYPED_FIELDS = {"elapsed_time": "float64", "analysis_complete": "bool_", "iteration_count": "int64", "timed_out": "bool_"}
+
+    def __init__(
+        self,
+        path: str,
+        fields: Sequence[str] = DEFAULT_RESULT_FIELDS,
+        row_group_size: int = 16,
+        flush_interval: float = 10.0
+    ):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._pq = pq
+        self.path = path
+        self.fields = tuple(fields)
+        self.row_group_size = row_group_size
+        self.flush_interval = flush_interval
+        self.columns = list(RECORD_FIELDS) + [field for field in self.fields if field not in RECORD_FIELDS]
+        self.schema = pa.schema([
+            (column, getattr(pa, self.TYPED_FIELDS.get(column, "string"))()) for column in self.columns
+        ])
+        self._rows = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._timer: Optional[threading.Thread] = None
+
+    def _part_paths(self):
+        directory = Path(self.path)
+        return sorted(directory.glob("part-*.parquet")) if directory.is_dir() else []
+
+    def _next_part_path(self, directory: Path) -> Path:
+        # Corrupt and temporary parts count too, so a new part never replaces an existing file
+        indexes = [int(match.group(1)) for match in map(PART_INDEX_PATTERN.match, os.listdir(directory)) if match]
+        return directory / f"part-{max(indexes, default=-1) + 1:05d}.parquet"
+
+    def completed_ids(self) -> Set[str]:
+        completed = set()
+        for part_path in self._part_paths():
+            try:
+                table = self._pq.read_table(part_path, columns=["paper_id", "status"])
+            except (OSError, self._pa.ArrowException) as e:
+                # A part left behind by a crashed writer has no footer; keep it for inspection
+                corrupt_path = part_path.with_suffix(".parquet.corrupt")
+                part_path.rename(corrupt_path)
+                logger.warning(f"Skipping unreadable result part {part_path.name} ({str(e)}), moved to {corrupt_path.name}")
+                continue
+            for paper_id, status in zip(table.column("paper_id").to_pylist(), table.column("status").to_pylist()):
+                if status == "ok":
+                    completed.add(paper_id)
+        return completed
+
+    def _cell(self, column: str, value: Any) -> Any:
+        if value is None or column in self.TYPED_FIELDS or isinstance(value, str):
+            return value
+        return json.dumps(value, ensure_ascii=False, default=str)
+
+    def write(self, record: Dict[str, Any]):
+        with self._lock:
+            self._rows.append({column: self._cell(column, record.get(column)) for column in self.columns})
+            if len(self._rows) >= self.row_group_size:
+                self._flush_rows()
+            elif self._timer is None:
+                self._timer = threading.Thread(target=self._flush_periodically, name="parquet-flush", daemon=True)
+                self._timer.start()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            with self._lock:
+                self._flush_rows()
+
+    def write_state(self, paper_id: str, final_state: AgentState, elapsed_time: float = 0.0):
+        self.write(build_result_record(paper_id, final_state, elapsed_time, self.fields))
+
+    def _flush_rows(self):
+        if not self._rows:
+            return
+        directory = Path(self.path)
+        directory.mkdir(parents=True, exist_ok=True)
+        part_path = self._next_part_path(directory)
+        # Written under a temporary name and renamed, so a part is either complete or absent
+        temp_path = part_path.with_suffix(".parquet.tmp")
+        self._pq.write_table(self._pa.Table.from_pylist(self._rows, schema=self.schema), str(temp_path))
+        os.replace(temp_path, part_path)
+        self._rows = []
+
+    def close(self):
+        self._closed.set()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+        with self._lock:
+            self._flush_rows()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def create_result_sink(path: str, fields: Optional[Sequence[str]] = None):
+    """
+    Parquet sink for paths ending in .parquet when pyarrow is installed (a directory of
+    part files), JSONL sink otherwise. Without pyarrow a .parquet path falls back to
+    JSONL next to it. fields selects the state fields written; None = DEFAULT_RESULT_FIELDS.
+    """
+    fields = DEFAULT_RESULT_FIELDS if fields is None else fields
+
+    if path.endswith(".parquet"):
+        try:
+            return ParquetResultSink(path, fields)
+        except ImportError:
+            path = path[:-len(".parquet")] + ".jsonl"
+            logger.warning(f"pyarrow is not installed - writing results as JSONL to {path}")
+
+    return JSONLResultSink(path, fields)
@@ -0,0 +1,162 @@
+"""
+Speculative synthesis: the Critical Reviewer node also starts writing the final report while
+the quality assessment runs. Most reviews request no rerun, and then the report is ready as
+soon as the review is. When a rerun is requested, the report is cancelled and thrown away.
+
+Trade-off: the speculative report is generated before the review exists, so the model writes
+it without the Critical Reviewer's assessment. A kept report gets the finished assessment
+appended as a CRITICAL REVIEW section (utils.prompts.build_critical_review_addendum), but
+the assessment does not shape the report's own text as it does in regular synthesis.
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+from graph.state import AgentState
+from utils.context_budget import count_tokens
+from utils.logger import logger
+from utils.metrics import metrics
+from utils.prompts import build_critical_review_addendum
+
+SPECULATION_NODE = "speculative_synthesis"
+
+_speculation_stats = {"started": 0, "kept": 0, "discarded": 0, "wasted_tokens": 0}
+_speculation_lock = threading.Lock()
+
+
+def get_speculation_stats() -> Dict[str, Any]:
+    """
+    Process-wide counters: speculative reports started, kept and discarded, the hit rate, and
+    the estimated prompt and output tokens spent on discarded reports.
+    """
+    with _speculation_lock:
+        stats = dict(_speculation_stats)
+    decided = stats["kept"] + stats["discarded"]
+    stats["hit_rate"] = stats["kept"] / decided if decided else 0.0
+    return stats
+
+
+def reset_speculation_stats():
+    with _speculation_lock:
+        _speculation_stats.update(started=0, kept=0, discarded=0, wasted_tokens=0)
+
+
+def _record_outcome(kept: bool, wasted_tokens: int = 0):
+    with _speculation_lock:
+        _speculation_stats["kept" if kept else "discarded"] += 1
+        _speculation_stats["wasted_tokens"] += wasted_tokens
+
+
+class SpeculativeReviewAgent:
+    """
+    Runs in place of the Critical Reviewer. Each review is paired with a speculative
+    synthesis, and the node returns the review plus, when no rerun is requested, the report.
+    """
+
+    def __init__(self, critic, get_synthesis: Callable[[], Any]):
+        self.critic = critic
+        self.name = critic.name
+        self._get_synthesis = get_synthesis
+
+    def _should_speculate(self, state: AgentState) -> bool:
+        return not state.get("final_report") and "final_report" not in state.get("reused_fields", [])
+
+    def _keep(self, review: Dict[str, Any]) -> bool:
+        # A failed review ({}) falls back to the regular synthesis step as well
+        return bool(review) and not review.get("needs_rerun")
+
+    def _merge(self, state: AgentState, review: Dict[str, Any], synthesis, report: str) -> Dict[str, Any]:
+        _record_outcome(kept=True)
+        logger.success("Speculative synthesis kept: no reruns requested")
+        # The report was written without the review; its assessment is added after the fact
+        if review.get("critical_evaluation"):
+            report += build_critical_review_addendum(review["critical_evaluation"])
+        update = synthesis.apply_speculative_report({**state, **review}, report)
+        # The review's routing stays in charge; the supervisor sees the finished report
+        return {
+            **review,
+            "final_report": update["final_report"],
+            "analysis_complete": update["analysis_complete"],
+            "messages": review.get("messages", []) + update["messages"]
+        }
+
+    def _discard(self, state: AgentState, synthesis, parts: List[str]):
+        prompt = "\n".join(str(message.content) for message in synthesis._build_messages(state))
+        wasted_tokens = count_tokens(prompt) + count_tokens("".join(parts))
+        _record_outcome(kept=False, wasted_tokens=wasted_tokens)
+        logger.info(f"Speculative synthesis discarded (about {wasted_tokens} tokens spent)")
+
+    def execute(self, state: AgentState) -> Dict[str, Any]:
+        if not self._should_speculate(state):
+            return self.critic.execute(state)
+
+        synthesis = self._get_synthesis()
+        parts: List[str] = []
+        cancel = threading.Event()
+        future: Future = Future()
+        context = contextvars.copy_context()
+
+        def speculate():
+            record = metrics.start_node(state.get("paper_id", ""), SPECULATION_NODE, synthesis.name)
+            try:
+                future.set_result(synthesis.speculate(state, parts, cancel, SPECULATION_NODE))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                metrics.end_node(record)
+
+        with _speculation_lock:
+            _speculation_stats["started"] += 1
+        logger.info("Starting speculative synthesis alongside the critical review")
+        threading.Thread(target=lambda: context.run(speculate), name="speculative-synthesis", daemon=True).start()
+
+        review = {}
+        try:
+            review = self.critic.execute(state)
+            if self._keep(review):
+                return self._merge(state, review, synthesis, future.result())
+        except Exception as e:
+            logger.warning(f"Speculative synthesis failed: {str(e)}")
+        finally:
+            cancel.set()
+
+        self._discard(state, synthesis, parts)
+        return review
+
+    async def aexecute(self, state: AgentState) -> Dict[str, Any]:
+        if not self._should_speculate(state):
+            return await self.critic.aexecute(state)
+
+        synthesis = self._get_synthesis()
+        parts: List[str] = []
+
+        async def speculate():
+            record = metrics.start_node(state.get("paper_id", ""), SPECULATION_NODE, synthesis.name)
+            try:
+                return await synthesis.aspeculate(state, parts, SPECULATION_NODE)
+            finally:
+                metrics.end_node(record)
+
+        with _speculation_lock:
+            _speculation_stats["started"] += 1
+        logger.info("Starting speculative synthesis alongside the critical review")
+        task = asyncio.create_task(speculate())
+        # A discarded report's failure is not an error of the run
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+        review = {}
+        try:
+            review = await self.critic.aexecute(state)
+            if self._keep(review):
+                return self._merge(state, review, synthesis, await task)
+        except Exception as e:
+            logger.warning(f"Speculative synthesis failed: {str(e)}")
+        finally:
+            # Cancelling the task closes the model's response stream
+            task.cancel()
+
+        self._discard(state, synthesis, parts)
+        return review
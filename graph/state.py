@@ -1,12 +1,94 @@
-from typing import TypedDict, List, Annotated
+import threading
+from typing import TypedDict, Any, Dict, Iterable, Iterator, List, Annotated, Optional, Sequence
 from typing_extensions import NotRequired
 
+from utils.logger import AgentMessage
+
+# Maximum number of messages kept in the state (oldest dropped first); None = keep all
+MESSAGE_LOG_LIMIT: Optional[int] = None
+
+
+def set_message_log_limit(limit: Optional[int]):
+    global MESSAGE_LOG_LIMIT
+    MESSAGE_LOG_LIMIT = limit
+
+
+class MessageLog(Sequence):
+    """
+    Read-only message log. Versions appended to one another share a buffer: appending to
+    the newest version extends it in place, so a hop costs only its new messages, while
+    every older version LangGraph still holds (checkpoints, branch reads) stays unchanged.
+    """
+
+    __slots__ = ("_buffer", "_start", "_end")
+    _lock = threading.Lock()
+
+    def __init__(self, messages: Iterable[AgentMessage] = ()):
+        self._buffer = list(messages)
+        self._start = 0
+        self._end = len(self._buffer)
+
+    @classmethod
+    def _view(cls, buffer: List[AgentMessage], start: int, end: int) -> "MessageLog":
+        log = cls.__new__(cls)
+        log._buffer, log._start, log._end = buffer, start, end
+        return log
+
+    def appended(self, messages: Sequence[AgentMessage], limit: Optional[int] = None) -> "MessageLog":
+        """New version with messages added, keeping only the last limit messages when set"""
+        with self._lock:
+            if self._end == len(self._buffer):
+                buffer, start = self._buffer, self._start
+            else:
+                # Another version already extended the buffer past this one
+                buffer, start = self._buffer[self._start:self._end], 0
+            buffer.extend(messages)
+            end = len(buffer)
+        if limit and end - start > limit:
+            start = end - limit
+            if start > limit:
+                # Dropped messages take as much room as the kept ones: move to a smaller buffer
+                buffer, start, end = buffer[start:], 0, limit
+        return self._view(buffer, start, end)
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._buffer[self._start + i] for i in range(len(self))[index]]
+        return self._buffer[self._start + range(len(self))[index]]
+
+    def __iter__(self) -> Iterator[AgentMessage]:
+        return iter(self._buffer[self._start:self._end])
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, (MessageLog, list)) and list(self) == list(other)
+
+    def __add__(self, other: Iterable[AgentMessage]) -> List[AgentMessage]:
+        return list(self) + list(other)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def _asdict(self) -> Dict[str, List[AgentMessage]]:
+        # Checkpointers serialize objects with _asdict by their fields and rebuild them from keyword arguments
+        return {"messages": list(self)}
+
+
+def append_messages(left: Optional[Sequence[AgentMessage]], right: Optional[Sequence[AgentMessage]]) -> MessageLog:
+    """Reducer of the messages channel: appends new messages and keeps the last MESSAGE_LOG_LIMIT"""
+    if not isinstance(left, MessageLog):
+        left = MessageLog(left or [])
+    return left.appended(right or [], MESSAGE_LOG_LIMIT)
+
 
 class AgentState(TypedDict):
     
     paper_abstract: str
+    paper_id: NotRequired[str]
     
-    messages: List[dict]
+    messages: Annotated[Sequence[AgentMessage], append_messages]  # Nodes return only new messages; LangGraph appends them
     next_agent: str
     
     literature_findings: NotRequired[str]
@@ -21,11 +103,16 @@ class AgentState(TypedDict):
     rerun_count: NotRequired[dict]  # Track how many times each agent has been rerun
     literature_rerun_count: NotRequired[int]
     technical_rerun_count: NotRequired[int]
+    reused_fields: NotRequired[list]  # Outputs prefilled before the run (graph.incremental, batched literature review)
+    deadline: NotRequired[float]  # Absolute time budget end, handed to agents by the node wrappers (not persisted)
+    time_budget: NotRequired[float]  # Total seconds of that budget, handed over with the deadline (not persisted)
+    timed_out: NotRequired[bool]
 
 
-def create_initial_state(paper_abstract: str) -> AgentState:
+def create_initial_state(paper_abstract: str, paper_id: str = "sample") -> AgentState:
     return AgentState(
         paper_abstract=paper_abstract,
+        paper_id=paper_id,
         messages=[],
         next_agent="supervisor",
         analysis_complete=False,
@@ -53,6 +140,7 @@ def get_state_summary(state: AgentState) -> str:
 
 STATE_FIELD_DESCRIPTIONS = {
     "paper_abstract": "Input research paper abstract for analysis",
+    "paper_id": "Identifier of the paper (file name or JSONL id in batch mode)",
     "messages": "Agent communication log (blackboard pattern)",
     "next_agent": "Routing decision for hierarchical coordination",
     "literature_findings": "Literature review results",
@@ -65,5 +153,9 @@ STATE_FIELD_DESCRIPTIONS = {
     "needs_rerun": "List of agent names to rerun based on critical reviewer assessment",
     "rerun_count": "Track how many times each agent has been rerun",
     "literature_rerun_count": "Counter for literature reviewer reruns",
-    "technical_rerun_count": "Counter for technical analyzer reruns"
+    "technical_rerun_count": "Counter for technical analyzer reruns",
+    "reused_fields": "Outputs prefilled before the run (reused from an earlier run or reviewed in a batch)",
+    "deadline": "Time (epoch seconds) by which the paper must finish; set from the run_workflow timeout",
+    "time_budget": "The run_workflow timeout in seconds; reserves for reruns and synthesis scale with it",
+    "timed_out": "True when the time budget ran out and final_report is a partial report"
 }
\ No newline at end of file
@@ -1,6 +1,14 @@
-from typing import Literal
-from langgraph.graph import StateGraph, END
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Literal, Dict, Any, Optional, Tuple, Iterator, AsyncIterator, Callable
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import StateGraph, START, END
 from graph.state import AgentState
+from graph.checkpoint import new_thread_id, thread_config
+from graph.speculation import SpeculativeReviewAgent
 
 from agents.supervisor import SupervisorAgent, route_to_next_agent
 from agents.literature_reviewer import LiteratureReviewerAgent
@@ -8,31 +16,222 @@ from agents.technical_analyzer import TechnicalAnalyzerAgent
 from agents.critical_reviewer import CriticalReviewerAgent
 from agents.synthesis_agent import SynthesisAgent
 
-from utils.logger import logger
+from utils.logger import logger, log_context
+from utils.metrics import metrics
+from utils.model_factory import resolve_agent_models
+from utils.deadline import call_with_timeout
+from utils.prompts import build_partial_report
 
 
-def create_research_workflow(model_name: str = "llama3.1:8b", local: int = 1) -> StateGraph:
+def _state_update(state: AgentState, result: Dict[str, Any], fields: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Turns the partial update returned by an agent into a LangGraph update: new messages
+    (appended by the messages reducer) plus only the keys whose value changed. When fields
+    is given, the update is restricted to those keys so that parallel branches never write
+    the same channel in one step. Returns None when there is nothing to write.
+    """
+    update = {}
+    
+    for key, value in result.items():
+        if key == "messages":
+            if value:
+                update["messages"] = value
+        elif fields is not None and key not in fields:
+            continue
+        elif key not in state or state[key] != value:
+            update[key] = value
+    
+    return update or None
+
+
+def _lazy_agent(factory: Callable[[], Any]) -> Callable[[], Any]:
+    """Returns a getter that builds the agent on its first call (once, even across threads)"""
+    lock = threading.Lock()
+    built = []
+    
+    def get_agent():
+        if not built:
+            with lock:
+                if not built:
+                    built.append(factory())
+        return built[0]
+    
+    return get_agent
+
+
+# Output field of each agent node, used to skip nodes whose output is prefilled (graph.incremental, graph.batch)
+NODE_OUTPUTS = {
+    "literature_reviewer": "literature_findings",
+    "literature_branch": "literature_findings",
+    "technical_analyzer": "technical_analysis",
+    "technical_branch": "technical_analysis",
+    "critical_reviewer": "critical_evaluation",
+    "synthesis": "final_report",
+}
+
+
+def _is_reused(node_name: str, state: AgentState) -> bool:
+    if NODE_OUTPUTS.get(node_name) in state.get("reused_fields", []):
+        logger.info(f"Skipping {node_name}: output already available")
+        return True
+    return False
+
+
+def _fresh_update(state: AgentState, update: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    # A freshly computed output invalidates the reuse markers: later reruns must really run
+    if update and state.get("reused_fields"):
+        update["reused_fields"] = []
+    return update
+
+
+def _run_deadline(config: Optional[Dict[str, Any]]) -> Optional[float]:
+    return ((config or {}).get("configurable") or {}).get("deadline")
+
+
+def _with_time_budget(state: AgentState, config: Optional[Dict[str, Any]], deadline: float) -> AgentState:
+    return {**state, "deadline": deadline, "time_budget": ((config or {}).get("configurable") or {}).get("time_budget")}
+
+
+def _deadline_update(node_name: str, state: AgentState, fields: Optional[Tuple[str, ...]]) -> Optional[Dict[str, Any]]:
+    """Ends the run with a partial report built from the completed outputs once the time budget is spent"""
+    if fields is not None:
+        # Parallel branches must not write the routing fields; the join node ends the run
+        return None
+    
+    update = {"next_agent": "FINISH", "analysis_complete": True, "timed_out": True}
+    if not state.get("final_report"):
+        logger.warning(f"Time budget exhausted at {node_name} - returning a partial report")
+        update["final_report"] = build_partial_report(state)
+    return update
+
+
+def _agent_node(node_name: str, get_agent: Callable[[], Any], fields: Optional[Tuple[str, ...]] = None) -> RunnableLambda:
+    def node(state: AgentState, config: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        if _is_reused(node_name, state):
+            return None
+        deadline = _run_deadline(config)
+        if deadline is not None and time.time() >= deadline:
+            return _deadline_update(node_name, state, fields)
+        agent = get_agent()
+        record = metrics.start_node(state.get("paper_id", ""), node_name, agent.name)
+        try:
+            if deadline is None:
+                result = agent.execute(state)
+            else:
+                # Agents see the deadline in the state; a call still running when it passes is abandoned
+                result = call_with_timeout(lambda: agent.execute(_with_time_budget(state, config, deadline)), deadline - time.time())
+            return _fresh_update(state, _state_update(state, result, fields))
+        except FutureTimeoutError:
+            return _deadline_update(node_name, state, fields)
+        finally:
+            metrics.end_node(record)
+    
+    async def anode(state: AgentState, config: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        if _is_reused(node_name, state):
+            return None
+        deadline = _run_deadline(config)
+        if deadline is not None and time.time() >= deadline:
+            return _deadline_update(node_name, state, fields)
+        agent = get_agent()
+        record = metrics.start_node(state.get("paper_id", ""), node_name, agent.name)
+        try:
+            if deadline is None:
+                result = await agent.aexecute(state)
+            else:
+                result = await asyncio.wait_for(agent.aexecute(_with_time_budget(state, config, deadline)), deadline - time.time())
+            return _fresh_update(state, _state_update(state, result, fields))
+        except asyncio.TimeoutError:
+            return _deadline_update(node_name, state, fields)
+        finally:
+            metrics.end_node(record)
+    
+    return RunnableLambda(node, afunc=anode, name=node_name)
+
+
+def create_research_workflow(
+    model_name: str = "llama3.1:8b",
+    local: int = 1,
+    parallel: bool = False,
+    routing_mode: str = "llm",
+    checkpointer=None,
+    stream_report: bool = False,
+    lazy_agents: bool = False,
+    chunk_chars: Optional[int] = None,
+    quality_gate: bool = False,
+    structured_output: bool = True,
+    agent_models: Optional[Dict[str, Tuple[str, int]]] = None,
+    speculative_synthesis: bool = False
+) -> StateGraph:
+    """
+    Builds the supervisor graph. With parallel=True the literature review and the
+    technical analysis start together from the entry point and are joined before
+    the Critical Reviewer; the supervisor then takes over for reruns and synthesis.
+    routing_mode="rules" lets the supervisor route deterministically and only
+    consult the LLM for ambiguous states. A checkpointer (see graph.checkpoint)
+    persists state after every node so runs can be resumed by thread id.
+    stream_report=True prints the final report token by token as it is generated.
+    lazy_agents=True defers building each agent (and its LLM client) to the first
+    time its node runs, so nodes that a run never reaches cost nothing at startup.
+    chunk_chars enables map-reduce analysis for papers longer than that many characters:
+    the paper is split into sections, chunks are analyzed concurrently and reduced into
+    literature_findings / technical_analysis.
+    quality_gate=True lets the Critical Reviewer skip its LLM call when both analyses pass
+    cheap structural checks (see agents.critical_reviewer.get_quality_gate_stats).
+    structured_output=True makes the supervisor and the Critical Reviewer request
+    schema-constrained JSON (utils.schemas) where the backend supports it.
+    agent_models gives some agents their own (model_name, local), e.g. a small model for
+    routing and a larger one for synthesis; the others use model_name and local.
+    speculative_synthesis=True starts the final report together with every critical review
+    and keeps it when no rerun is requested (see graph.speculation.get_speculation_stats).
+    """
     logger.info("Building the multi-agent workflow graph")
     
-    supervisor = SupervisorAgent(model_name, local)
-    literature_reviewer = LiteratureReviewerAgent(model_name, local)
-    technical_analyzer = TechnicalAnalyzerAgent(model_name, local)
-    critical_reviewer = CriticalReviewerAgent(model_name, local)
-    synthesis_agent = SynthesisAgent(model_name, local)
+    profiles = resolve_agent_models(model_name, local, agent_models)
+    if agent_models:
+        logger.info("Agent models: " + ", ".join(f"{agent}={model}" for agent, (model, _) in profiles.items()))
+    
+    supervisor = _lazy_agent(lambda: SupervisorAgent(
+        *profiles["supervisor"], routing_mode=routing_mode, structured_output=structured_output
+    ))
+    literature_reviewer = _lazy_agent(lambda: LiteratureReviewerAgent(*profiles["literature_reviewer"], chunk_chars=chunk_chars))
+    technical_analyzer = _lazy_agent(lambda: TechnicalAnalyzerAgent(*profiles["technical_analyzer"], chunk_chars=chunk_chars))
+    critical_reviewer = _lazy_agent(lambda: CriticalReviewerAgent(
+        *profiles["critical_reviewer"], quality_gate=quality_gate, structured_output=structured_output
+    ))
+    synthesis_agent = _lazy_agent(lambda: SynthesisAgent(*profiles["synthesis"], stream=stream_report))
+    if speculative_synthesis:
+        get_critic = critical_reviewer
+        critical_reviewer = _lazy_agent(lambda: SpeculativeReviewAgent(get_critic(), synthesis_agent))
     
-    logger.info("All agents initialized")
+    if lazy_agents:
+        logger.info("Agents will be initialized on first use")
+    else:
+        for get_agent in (supervisor, literature_reviewer, technical_analyzer, critical_reviewer, synthesis_agent):
+            get_agent()
+        logger.info("All agents initialized")
     
     workflow = StateGraph(AgentState)
     
-    workflow.add_node("supervisor", supervisor.execute)
-    workflow.add_node("literature_reviewer", literature_reviewer.execute)
-    workflow.add_node("technical_analyzer", technical_analyzer.execute)
-    workflow.add_node("critical_reviewer", critical_reviewer.execute)
-    workflow.add_node("synthesis", synthesis_agent.execute)
+    # Each node carries both entry points: workflow.invoke runs execute, workflow.ainvoke runs aexecute
+    workflow.add_node("supervisor", _agent_node("supervisor", supervisor))
+    workflow.add_node("literature_reviewer", _agent_node("literature_reviewer", literature_reviewer))
+    workflow.add_node("technical_analyzer", _agent_node("technical_analyzer", technical_analyzer))
+    workflow.add_node("critical_reviewer", _agent_node("critical_reviewer", critical_reviewer))
+    workflow.add_node("synthesis", _agent_node("synthesis", synthesis_agent))
+    
+    if parallel:
+        # Fan-out branches only publish their own output, so the join never sees conflicting writes
+        workflow.add_node("literature_branch", _agent_node("literature_branch", literature_reviewer, ("literature_findings",)))
+        workflow.add_node("technical_branch", _agent_node("technical_branch", technical_analyzer, ("technical_analysis",)))
     
     logger.info("Graph nodes (agents) added")
     
-    workflow.set_entry_point("supervisor")
+    if parallel:
+        workflow.add_edge(START, "literature_branch")
+        workflow.add_edge(START, "technical_branch")
+        workflow.add_edge(["literature_branch", "technical_branch"], "critical_reviewer")
+    else:
+        workflow.set_entry_point("supervisor")
     
     workflow.add_conditional_edges(
         "supervisor",
@@ -53,11 +252,11 @@ def create_research_workflow(model_name: str = "llama3.1:8b", local: int = 1) ->
     
     logger.info("Graph edges (transitions) configured")
     
-    compiled_workflow = workflow.compile()
+    compiled_workflow = workflow.compile(checkpointer=checkpointer)
     
     logger.success("Workflow compilation complete")
     logger.info("Architecture: Hierarchical Multi-Agent System")
-    logger.info("Coordination: Supervisor-based routing")
+    logger.info("Coordination: Supervisor-based routing" + (" with parallel analysis fan-out" if parallel else ""))
     logger.info("Communication: Shared state (blackboard pattern)")
     
     return compiled_workflow
@@ -75,31 +274,265 @@ def visualize_workflow_structure():
     2. Supervisor -> Technical Analyzer -> Supervisor
     3. Supervisor -> Critical Reviewer -> Supervisor
     4. Supervisor -> Synthesis -> Supervisor -> END
+    
+    Parallel Mode Entry:
+    Start -> [Literature Reviewer | Technical Analyzer] -> Critical Reviewer -> Supervisor
     """
     return structure
 
 
-def run_workflow(workflow: StateGraph, initial_state: AgentState) -> AgentState:
-    logger.header("Starting multi-agent workflow execution")
-    logger.info(f"Input: {len(initial_state['paper_abstract'])} char paper abstract")
-    logger.info(f"Target: Complete research paper review\n")
+def _with_deadline(config: Dict[str, Any], timeout: Optional[float]) -> Dict[str, Any]:
+    # The deadline lives in the run config, not the state, so a resumed run gets a fresh budget
+    if timeout is not None:
+        config.setdefault("configurable", {}).update(deadline=time.time() + timeout, time_budget=timeout)
+    return config
+
+
+def _new_run_id(state: AgentState) -> str:
+    # One id per entry point call, shared by its log lines (log_context) and its metrics records
+    return f"{state.get('paper_id') or 'run'}-{uuid.uuid4().hex[:8]}"
+
+
+def _run_metadata(state: AgentState, run_id: str) -> Dict[str, Any]:
+    # run_id keeps the metrics of concurrent runs of the same paper id apart
+    return {"paper_id": state.get("paper_id", ""), "run_id": run_id}
+
+
+def _run_config(
+    workflow: StateGraph,
+    initial_state: AgentState,
+    thread_id: Optional[str],
+    run_id: str,
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    # The paper id in the run metadata lets LLM callbacks attribute metrics to the right paper
+    config = {"metadata": _run_metadata(initial_state, run_id)}
+    if workflow.checkpointer is None:
+        return _with_deadline(config, timeout)
     
-    try:
-        final_state = workflow.invoke(initial_state)
+    thread_id = thread_id or new_thread_id(initial_state)
+    logger.info(f"Checkpointing enabled (thread id: {thread_id})")
+    config.update(thread_config(thread_id))
+    return _with_deadline(config, timeout)
+
+
+def _log_execution_complete(final_state: AgentState, config: Dict[str, Any]):
+    # The message log may be capped (MESSAGE_LOG_LIMIT); the metrics count every execution
+    total_agents = metrics.run_executions(config["metadata"]["run_id"])
+    iterations = final_state.get("iteration_count", 0)
+    
+    logger.header("Workflow execution complete")
+    logger.info(f"Total agent executions: {total_agents}")
+    logger.info(f"Supervisor iterations: {iterations}")
+    logger.info(f"Analysis complete: {final_state.get('analysis_complete', False)}")
+
+
+def run_workflow(
+    workflow: StateGraph,
+    initial_state: AgentState,
+    thread_id: Optional[str] = None,
+    timeout: Optional[float] = None
+) -> AgentState:
+    """
+    Runs the workflow to completion. With a timeout (seconds), agents fit their work into
+    the remaining time and a run that exceeds it ends with a partial report (timed_out=True).
+    """
+    run_id = _new_run_id(initial_state)
+    with log_context(run_id=run_id, paper_id=initial_state.get("paper_id")):
+        logger.header("Starting multi-agent workflow execution")
+        logger.info(f"Input: {len(initial_state['paper_abstract'])} char paper abstract")
+        logger.info(f"Target: Complete research paper review\n")
+        
+        try:
+            config = _run_config(workflow, initial_state, thread_id, run_id, timeout)
+            final_state = workflow.invoke(initial_state, config)
+            
+            _log_execution_complete(final_state, config)
+            
+            return final_state
+        
+        except Exception as e:
+            logger.error(f"Workflow execution failed: {str(e)}")
+            raise
+
+
+async def arun_workflow(
+    workflow: StateGraph,
+    initial_state: AgentState,
+    thread_id: Optional[str] = None,
+    timeout: Optional[float] = None
+) -> AgentState:
+    """Async counterpart of run_workflow: every agent call goes through llm.ainvoke on the running event loop"""
+    run_id = _new_run_id(initial_state)
+    with log_context(run_id=run_id, paper_id=initial_state.get("paper_id")):
+        logger.header("Starting multi-agent workflow execution (async)")
+        logger.info(f"Input: {len(initial_state['paper_abstract'])} char paper abstract")
+        logger.info(f"Target: Complete research paper review\n")
+        
+        try:
+            config = _run_config(workflow, initial_state, thread_id, run_id, timeout)
+            final_state = await workflow.ainvoke(initial_state, config)
+            
+            _log_execution_complete(final_state, config)
+            
+            return final_state
         
-        total_agents = len(final_state.get("messages", []))
-        iterations = final_state.get("iteration_count", 0)
+        except Exception as e:
+            logger.error(f"Workflow execution failed: {str(e)}")
+            raise
+
+
+def resume_workflow(workflow: StateGraph, thread_id: str, timeout: Optional[float] = None) -> AgentState:
+    """
+    Continues a checkpointed run from its last completed node; finished agent outputs are not
+    regenerated. timeout is the time budget of the resumed part of the run.
+    """
+    config = thread_config(thread_id)
+    snapshot = workflow.get_state(config)
+    run_id = _new_run_id(snapshot.values)
+    config["metadata"] = _run_metadata(snapshot.values, run_id)
+    
+    if not snapshot.values:
+        raise ValueError(f"No checkpoint found for thread '{thread_id}'")
+    
+    with log_context(run_id=run_id, paper_id=config["metadata"]["paper_id"]):
+        if not snapshot.next:
+            logger.info(f"Thread {thread_id} already completed, returning stored state")
+            return snapshot.values
         
-        logger.header("Workflow execution complete")
-        logger.info(f"Total agent executions: {total_agents}")
-        logger.info(f"Supervisor iterations: {iterations}")
-        logger.info(f"Analysis complete: {final_state.get('analysis_complete', False)}")
+        logger.header(f"Resuming workflow {thread_id}")
+        logger.info(f"Continuing at: {', '.join(snapshot.next)}")
         
-        return final_state
+        try:
+            final_state = workflow.invoke(None, _with_deadline(config, timeout))
+            
+            _log_execution_complete(final_state, config)
+            
+            return final_state
         
-    except Exception as e:
-        logger.error(f"Workflow execution failed: {str(e)}")
-        raise
+        except Exception as e:
+            logger.error(f"Workflow execution failed: {str(e)}")
+            raise
+
+
+async def aresume_workflow(workflow: StateGraph, thread_id: str, timeout: Optional[float] = None) -> AgentState:
+    config = thread_config(thread_id)
+    snapshot = await workflow.aget_state(config)
+    run_id = _new_run_id(snapshot.values)
+    config["metadata"] = _run_metadata(snapshot.values, run_id)
+    
+    if not snapshot.values:
+        raise ValueError(f"No checkpoint found for thread '{thread_id}'")
+    
+    with log_context(run_id=run_id, paper_id=config["metadata"]["paper_id"]):
+        if not snapshot.next:
+            logger.info(f"Thread {thread_id} already completed, returning stored state")
+            return snapshot.values
+        
+        logger.header(f"Resuming workflow {thread_id}")
+        logger.info(f"Continuing at: {', '.join(snapshot.next)}")
+        
+        try:
+            final_state = await workflow.ainvoke(None, _with_deadline(config, timeout))
+            
+            _log_execution_complete(final_state, config)
+            
+            return final_state
+        
+        except Exception as e:
+            logger.error(f"Workflow execution failed: {str(e)}")
+            raise
+
+
+def _stream_event(mode: str, payload: Any, token_nodes: Tuple[str, ...]) -> Iterator[Dict[str, Any]]:
+    if mode == "messages":
+        chunk, metadata = payload
+        node = metadata.get("langgraph_node")
+        if node in token_nodes and isinstance(chunk.content, str) and chunk.content:
+            yield {"type": "token", "node": node, "content": chunk.content}
+    elif mode == "updates":
+        for node, update in payload.items():
+            yield {"type": "update", "node": node, "update": update}
+
+
+def stream_workflow(
+    workflow: StateGraph,
+    initial_state: AgentState,
+    thread_id: Optional[str] = None,
+    token_nodes: Tuple[str, ...] = ("synthesis",),
+    timeout: Optional[float] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Runs the workflow and yields events as they are produced:
+    {"type": "update", "node", "update"} after every agent step,
+    {"type": "token", "node", "content"} for LLM tokens generated inside token_nodes,
+    and a last {"type": "final", "state"} with the complete final state.
+    """
+    run_id = _new_run_id(initial_state)
+    with log_context(run_id=run_id, paper_id=initial_state.get("paper_id")):
+        logger.header("Starting multi-agent workflow execution (streaming)")
+        config = _run_config(workflow, initial_state, thread_id, run_id, timeout)
+        final_state = None
+        
+        for mode, payload in workflow.stream(initial_state, config, stream_mode=["updates", "messages", "values"]):
+            if mode == "values":
+                final_state = payload
+                continue
+            yield from _stream_event(mode, payload, token_nodes)
+        
+        _log_execution_complete(final_state, config)
+        yield {"type": "final", "state": final_state}
+
+
+async def astream_workflow(
+    workflow: StateGraph,
+    initial_state: AgentState,
+    thread_id: Optional[str] = None,
+    token_nodes: Tuple[str, ...] = ("synthesis",),
+    timeout: Optional[float] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Async counterpart of stream_workflow"""
+    run_id = _new_run_id(initial_state)
+    with log_context(run_id=run_id, paper_id=initial_state.get("paper_id")):
+        logger.header("Starting multi-agent workflow execution (streaming)")
+        config = _run_config(workflow, initial_state, thread_id, run_id, timeout)
+        final_state = None
+        
+        async for mode, payload in workflow.astream(initial_state, config, stream_mode=["updates", "messages", "values"]):
+            if mode == "values":
+                final_state = payload
+                continue
+            for event in _stream_event(mode, payload, token_nodes):
+                yield event
+        
+        _log_execution_complete(final_state, config)
+        yield {"type": "final", "state": final_state}
+
+
+def display_metrics_summary():
+    by_node = metrics.summary_by("node")
+    if not by_node:
+        return
+    
+    logger.section("Per-agent performance")
+    logger.info(f"{'Node':22} | {'Runs':>4} | {'Wall s':>7} | {'LLM s':>7} | {'Prompt s/call':>13} | {'Tokens in/out':>15} | "
+                f"{'Cached':>6} | {'Cache':>5} | {'Cost $':>8} | Time share")
+    for node, stats in sorted(by_node.items(), key=lambda item: -item[1]["wall_time"]):
+        tokens = f"{stats['prompt_tokens']}/{stats['completion_tokens']}"
+        logger.info(f"{node:22} | {stats['executions']:>4} | {stats['wall_time']:>7.2f} | {stats['llm_time']:>7.2f} | "
+                    f"{stats['prompt_eval_per_call']:>13.3f} | {tokens:>15} | {stats['cached_token_rate']:>6.0%} | "
+                    f"{stats['cache_hits']:>5} | {stats['cost_usd']:>8.4f} | {stats['time_share']:.0%}")
+    
+    by_model = metrics.summary_by("model")
+    if len(by_model) > 1:
+        logger.section("Per-model performance")
+        logger.info(f"{'Model':22} | {'Calls':>5} | {'LLM s':>7} | {'Tokens in/out':>15} | {'Cost $':>8} | "
+                    f"{'$/paper':>8} | {'Time share':>10} | Cost share")
+        for model, stats in sorted(by_model.items(), key=lambda item: -item[1]["wall_time"]):
+            tokens = f"{stats['prompt_tokens']}/{stats['completion_tokens']}"
+            logger.info(f"{model:22} | {stats['llm_calls']:>5} | {stats['llm_time']:>7.2f} | {tokens:>15} | "
+                        f"{stats['cost_usd']:>8.4f} | {stats['cost_per_paper']:>8.4f} | {stats['time_share']:>10.0%} | "
+                        f"{stats['cost_share']:.0%}")
 
 
 def display_workflow_summary(final_state: AgentState):
@@ -132,4 +565,4 @@ def display_workflow_summary(final_state: AgentState):
     
     total_output = sum(c[1] for c in contributions)
     logger.info(f"\n{'Total Output':30} | {total_output:5} chars")
-    logger.info(f"Emergent Value: Comprehensive review from specialized analyses")
\ No newline at end of file
+    logger.info(f"Emergent Value: Comprehensive review from specialized analyses")
@@ -3,19 +3,94 @@ import time
 import os
 from pathlib import Path
 
-from graph.state import create_initial_state, get_state_summary
-from graph.workflow import create_research_workflow, run_workflow, display_workflow_summary
-from utils.logger import logger, set_verbosity
+from graph.state import create_initial_state, get_state_summary, set_message_log_limit
+from graph.workflow import (
+    create_research_workflow,
+    run_workflow,
+    resume_workflow,
+    display_workflow_summary,
+    display_metrics_summary
+)
+from graph.checkpoint import create_checkpointer
+from graph.batch import run_batch
+from graph.results import create_result_sink
+from graph.incremental import AnalysisStore
+from graph.speculation import get_speculation_stats
+from agents.literature_reviewer import LiteratureReviewerAgent
+from agents.critical_reviewer import get_quality_gate_stats
+from utils.logger import configure_logging, logger, set_verbosity
+from utils.prompts import set_prompt_layout
+from utils.context_budget import configure_context_budgets
+from utils.model_factory import configure_llm_cache, get_llm_cache, resolve_agent_models, start_warm_up
+from utils.http_pool import configure_http_pool, get_ollama_clients, get_openai_http_clients
+from utils.rate_limiter import configure_rate_limiter, get_rate_limiter
+from utils.metrics import metrics
 
 VERBOSITY = 1
+LOG_MODE = "console"  # "queue": log lines are written by a background thread, tagged with their paper/run id
+LOG_JSON_PATH = None  # e.g. "run_log.jsonl": structured JSON lines of every log record (queue mode)
 INTERACTIVE_MODE = False
+PARALLEL_MODE = False  # Run literature and technical analysis as parallel graph branches
+ROUTING_MODE = "llm"  # "llm" = LLM routing on every hop, "rules" = deterministic routing, LLM only when ambiguous
+STREAM_REPORT = False  # Print the final report token by token while it is generated
+FAST_START = False  # Warm the model up in the background while the graph compiles, build agents on first use
+CHUNK_CHARS = None  # e.g. 3000: papers longer than this are analyzed chunk by chunk (map-reduce)
+CONTEXT_BUDGETS = {}  # Prompt token budget overrides per agent, e.g. {"synthesis": 4000} (defaults in utils/context_budget.py)
+PROMPT_LAYOUT = "role_first"  # "shared_prefix" = paper and earlier outputs first, so model prompt caches reuse them
+STRUCTURED_OUTPUT = True  # Supervisor and Critical Reviewer answer with schema-checked JSON (OpenAI/Ollama)
+PAPER_TIMEOUT_SECONDS = None  # e.g. 300: time budget per paper; a paper out of time ends with a partial report
+SPECULATIVE_SYNTHESIS = False  # Write the final report during the critical review (without its assessment, which is appended); discarded on a rerun
+QUALITY_GATE = False  # Skip the Critical Reviewer's LLM call when both analyses pass cheap structural checks
+MESSAGE_LOG_LIMIT = None  # e.g. 50: messages kept in the state per paper (oldest dropped first); None = keep all
 
-LOCAL = 0  # 1 = Ollama, 0 = GPT 4o-mini
+# Batch mode: set BATCH_INPUT to a directory of .txt/.md papers or a JSONL file of abstracts
+BATCH_INPUT = None
+BATCH_OUTPUT = "batch_results.jsonl"  # A ".parquet" path writes Parquet part files when pyarrow is installed
+BATCH_WORKERS = 4
+PAPER_VERBOSITY = None  # Verbosity inside each batch paper's run (e.g. 0 = headers and errors only); None = VERBOSITY
+LITERATURE_BATCH_SIZE = 0  # > 0: review the literature of upcoming papers ahead of their workflows, this many abstracts per request
+RESULT_FIELDS = None  # State fields written per paper, e.g. ("final_report", "iteration_count"); None = default set
+RESULT_OUTPUT_PATH = None  # Also append single-run results here (same format as BATCH_OUTPUT)
+
+# On-disk LLM response cache shared by all agents (None = disabled)
+LLM_CACHE_PATH = None  # e.g. ".llm_cache.sqlite"
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+LLM_CACHE_MAX_ENTRIES = 10000
+
+# Pooled HTTP connections shared by all agents (one sync and one async client per backend)
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20  # Raise together with BATCH_WORKERS for high-concurrency batches
+HTTP_KEEPALIVE_EXPIRY = 60.0  # Seconds an idle connection is kept open for reuse
+
+# OpenAI rate limiting: shared in-flight limit adapted to 429/5xx and rate-limit headers (AIMD)
+OPENAI_INITIAL_CONCURRENCY = 8
+OPENAI_MAX_CONCURRENCY = 64
+OPENAI_MAX_RETRIES = 6
+
+# Checkpointing: persist state after every agent so an interrupted run can be resumed
+CHECKPOINT_PATH = None  # e.g. "checkpoints.sqlite"
+RESUME_THREAD_ID = None  # Thread id logged by a previous run; requires CHECKPOINT_PATH
+
+# Incremental re-analysis: reuse stored agent outputs whose inputs did not change (None = disabled)
+ANALYSIS_STORE_PATH = None  # e.g. ".analysis_store.sqlite"
+
+# Per-agent latency/token/cost metrics export (.json or .csv, None = console summary only)
+METRICS_EXPORT_PATH = None
+
+LOCAL = 0  # 1 = Ollama, 0 = GPT 4o-mini, 2 = deterministic fake model (no server needed)
 if LOCAL == 1:
     MODEL_NAME = "llama3.1:8b"
+elif LOCAL == 2:
+    MODEL_NAME = "fake-llm"
 else:
     MODEL_NAME = "gpt-4o-mini"
 
+# Per-agent (model, LOCAL) overrides; agents not listed use MODEL_NAME. Ollama and OpenAI can be mixed,
+# e.g. {"supervisor": ("llama3.2:3b", 1), "critical_reviewer": ("llama3.2:3b", 1), "synthesis": ("gpt-4o-mini", 0)}
+AGENT_MODELS = {}
+MODEL_PROFILES = resolve_agent_models(MODEL_NAME, LOCAL, AGENT_MODELS)
+BACKENDS = {local for _, local in MODEL_PROFILES.values()}
+
 SAMPLE_PAPER = """
 Recent advances in deep learning have demonstrated remarkable performance in image classification tasks. 
 However, standard convolutional neural networks often struggle with limited training data and exhibit 
@@ -65,6 +140,8 @@ def check_ollama_connection(model_name: str) -> bool:
         from langchain_ollama import ChatOllama
         
         llm = ChatOllama(model=model_name, num_predict=10)
+        # Check over the shared pool so the agents reuse the already open connection
+        llm._client, llm._async_client = get_ollama_clients(llm.base_url)
         llm.invoke("test")
         
         logger.success("Ollama is running correctly")
@@ -80,7 +157,9 @@ def check_openai_connection() -> bool:
     try:
         from langchain_openai import ChatOpenAI
         
-        llm = ChatOpenAI(model="gpt-4o-mini", max_tokens=10)
+        http_client, http_async_client = get_openai_http_clients()
+        # Check over the shared pool so the agents reuse the already open connection
+        llm = ChatOpenAI(model="gpt-4o-mini", max_tokens=10, max_retries=0, http_client=http_client, http_async_client=http_async_client)
         llm.invoke("test")
         
         logger.success("OpenAI API connection successful")
@@ -91,6 +170,101 @@ def check_openai_connection() -> bool:
         return False
 
 
+def wait_for_warm_up(warm_ups):
+    try:
+        for warm_up in warm_ups:
+            warm_up.result()
+        logger.success("Model warm-up complete")
+    except Exception as e:
+        logger.error(f"Model warm-up failed: {str(e)}")
+        sys.exit(1)
+
+
+def build_workflow(warm_ups=None):
+    try:
+        checkpointer = create_checkpointer(CHECKPOINT_PATH) if CHECKPOINT_PATH else None
+        
+        workflow = create_research_workflow(
+            model_name=MODEL_NAME,
+            local=LOCAL,
+            parallel=PARALLEL_MODE,
+            routing_mode=ROUTING_MODE,
+            checkpointer=checkpointer,
+            stream_report=STREAM_REPORT,
+            lazy_agents=FAST_START,
+            chunk_chars=CHUNK_CHARS,
+            quality_gate=QUALITY_GATE,
+            structured_output=STRUCTURED_OUTPUT,
+            agent_models=AGENT_MODELS,
+            speculative_synthesis=SPECULATIVE_SYNTHESIS
+        )
+    except Exception as e:
+        logger.error(f"Failed to create workflow: {str(e)}")
+        sys.exit(1)
+    
+    # The warm-up ran while the graph compiled; only now wait for it to finish
+    if warm_ups is not None:
+        wait_for_warm_up(warm_ups)
+    
+    return workflow
+
+
+def open_analysis_store():
+    if not ANALYSIS_STORE_PATH:
+        return None
+    logger.info(f"Incremental re-analysis enabled: {ANALYSIS_STORE_PATH}")
+    # Outputs of different agent models must not be reused for each other
+    overrides = "".join(f"|{agent}={local}:{model}" for agent, (model, local) in sorted(AGENT_MODELS.items()))
+    return AnalysisStore(ANALYSIS_STORE_PATH, scope=f"{LOCAL}:{MODEL_NAME}{overrides}")
+
+
+def export_metrics():
+    display_metrics_summary()
+    
+    if METRICS_EXPORT_PATH:
+        metrics.export(METRICS_EXPORT_PATH)
+        logger.info(f"Metrics exported to {METRICS_EXPORT_PATH}")
+
+
+def log_cache_statistics():
+    cache = get_llm_cache()
+    if cache is None:
+        return
+    
+    cache_stats = cache.stats()
+    logger.info(f"LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                f"({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['entries']} entries)")
+
+
+def log_rate_limit_statistics():
+    if 0 not in BACKENDS:
+        return
+    
+    limiter_stats = get_rate_limiter().stats()
+    logger.info(f"OpenAI rate limiter: concurrency limit {limiter_stats['limit']} "
+                f"(peak {limiter_stats['peak_in_flight']} in flight), "
+                f"{limiter_stats['throttles']} throttled responses, {limiter_stats['retries']} retries")
+
+
+def log_quality_gate_statistics():
+    if not QUALITY_GATE:
+        return
+    
+    gate_stats = get_quality_gate_stats()
+    logger.info(f"Quality gate: {gate_stats['skipped']} of {gate_stats['checked']} critical reviews skipped "
+                f"({gate_stats['skip_rate']:.0%} skip rate)")
+
+
+def log_speculation_statistics():
+    if not SPECULATIVE_SYNTHESIS:
+        return
+    
+    speculation_stats = get_speculation_stats()
+    logger.info(f"Speculative synthesis: {speculation_stats['kept']} of {speculation_stats['started']} reports kept "
+                f"({speculation_stats['hit_rate']:.0%} hit rate, "
+                f"about {speculation_stats['wasted_tokens']} tokens spent on discarded reports)")
+
+
 def display_welcome_banner():
     banner = """
 ---------------------------------------------------------------
@@ -102,19 +276,51 @@ def display_welcome_banner():
 
 def main():
     set_verbosity(VERBOSITY)
+    configure_logging(LOG_MODE, json_path=LOG_JSON_PATH)
+    set_message_log_limit(MESSAGE_LOG_LIMIT)
+    set_prompt_layout(PROMPT_LAYOUT)
+    configure_context_budgets(**CONTEXT_BUDGETS)
     
     display_welcome_banner()
     
-    if LOCAL == 0:
+    configure_http_pool(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+    configure_rate_limiter(
+        initial_limit=OPENAI_INITIAL_CONCURRENCY,
+        max_limit=OPENAI_MAX_CONCURRENCY,
+        max_retries=OPENAI_MAX_RETRIES
+    )
+    
+    if LLM_CACHE_PATH:
+        configure_llm_cache(LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS, max_entries=LLM_CACHE_MAX_ENTRIES)
+        logger.info(f"LLM response cache enabled: {LLM_CACHE_PATH}")
+    
+    if 0 in BACKENDS:
         logger.info("Loading OpenAI API key...")
         load_api_key()
-        if not check_openai_connection():
-            sys.exit(1)
+    
+    models = sorted(set(MODEL_PROFILES.values()))
+    warm_ups = None
+    if FAST_START:
+        logger.info("Warming up the models in the background...")
+        warm_ups = [start_warm_up(model, local) for model, local in models]
     else:
-        logger.info("Checking Ollama connection...")
-        if not check_ollama_connection(MODEL_NAME):
-            logger.error("Ollama is not running or model not found")
+        if 0 in BACKENDS and not check_openai_connection():
             sys.exit(1)
+        for model, local in models:
+            if local != 1:
+                continue
+            logger.info(f"Checking Ollama connection ({model})...")
+            if not check_ollama_connection(model):
+                logger.error("Ollama is not running or model not found")
+                sys.exit(1)
+    
+    if BATCH_INPUT:
+        run_batch_mode(warm_ups)
+        return
     
     logger.info("Using embedded sample paper abstract")
     paper_abstract = SAMPLE_PAPER.strip()
@@ -127,15 +333,15 @@ def main():
     
     initial_state = create_initial_state(paper_abstract)
     
+    analysis_store = open_analysis_store()
+    if analysis_store is not None:
+        initial_state = analysis_store.prefill(initial_state)
+    
     if VERBOSITY >= 2:
         logger.section("INITIAL STATE")
         logger.info(get_state_summary(initial_state))
     
-    try:
-        workflow = create_research_workflow(model_name=MODEL_NAME, local=LOCAL)
-    except Exception as e:
-        logger.error(f"Failed to create workflow: {str(e)}")
-        sys.exit(1)
+    workflow = build_workflow(warm_ups)
     
     if INTERACTIVE_MODE:
         logger.info("Interactive mode enabled - press Enter after each agent")
@@ -144,7 +350,13 @@ def main():
     start_time = time.time()
     
     try:
-        final_state = run_workflow(workflow, initial_state)
+        if RESUME_THREAD_ID:
+            final_state = resume_workflow(workflow, RESUME_THREAD_ID, timeout=PAPER_TIMEOUT_SECONDS)
+        else:
+            final_state = run_workflow(workflow, initial_state, timeout=PAPER_TIMEOUT_SECONDS)
+        
+        if analysis_store is not None:
+            analysis_store.save(final_state)
         
     except KeyboardInterrupt:
         logger.warning("\nWorkflow interrupted by user")
@@ -162,12 +374,57 @@ def main():
     
     if VERBOSITY >= 1:
         display_workflow_summary(final_state)
+        logger.workflow_summary(
+            total_agents=metrics.executions,
+            iterations=final_state.get("iteration_count", 0),
+            time_taken=elapsed_time
+        )
     
     logger.section("EXECUTION STATISTICS")
     logger.info(f"Total execution time: {elapsed_time:.2f} seconds")
     logger.info(f"Total agent messages: {len(final_state.get('messages', []))}")
     logger.info(f"Workflow iterations: {final_state.get('iteration_count', 0)}")
     logger.info(f"Analysis complete: {final_state.get('analysis_complete', False)}")
+    log_cache_statistics()
+    log_rate_limit_statistics()
+    log_quality_gate_statistics()
+    log_speculation_statistics()
+    export_metrics()
+    
+    if RESULT_OUTPUT_PATH:
+        with create_result_sink(RESULT_OUTPUT_PATH, RESULT_FIELDS) as sink:
+            sink.write_state(final_state.get("paper_id", "sample"), final_state, elapsed_time)
+        logger.info(f"Result written to {sink.path}")
+    
+    logger.header("DEMONSTRATION END")
+
+
+def run_batch_mode(warm_ups=None):
+    logger.info(f"Batch input: {BATCH_INPUT}")
+    logger.info(f"Batch output: {BATCH_OUTPUT}")
+    
+    workflow = build_workflow(warm_ups)
+    
+    literature_agent = None
+    if LITERATURE_BATCH_SIZE:
+        literature_agent = LiteratureReviewerAgent(
+            *MODEL_PROFILES["literature_reviewer"], chunk_chars=CHUNK_CHARS, batch_size=LITERATURE_BATCH_SIZE
+        )
+    
+    stats = run_batch(workflow, BATCH_INPUT, BATCH_OUTPUT, max_workers=BATCH_WORKERS, result_fields=RESULT_FIELDS,
+                      analysis_store=open_analysis_store(), literature_agent=literature_agent,
+                      paper_timeout=PAPER_TIMEOUT_SECONDS, paper_verbosity=PAPER_VERBOSITY)
+    
+    logger.section("BATCH STATISTICS")
+    logger.info(f"Papers succeeded: {stats['succeeded']}")
+    logger.info(f"Papers failed: {stats['failed']}")
+    logger.info(f"Papers skipped (already done): {stats['skipped']}")
+    logger.info(f"Total execution time: {stats['elapsed_time']:.2f} seconds")
+    log_cache_statistics()
+    log_rate_limit_statistics()
+    log_quality_gate_statistics()
+    log_speculation_statistics()
+    export_metrics()
     
     logger.header("DEMONSTRATION END")
 
@@ -177,4 +434,4 @@ if __name__ == "__main__":
         main()
     except KeyboardInterrupt:
         print("\n\nInterrupt!")
-        sys.exit(0)
\ No newline at end of file
+        sys.exit(0)
\ No newline at end of file
@@ -1,25 +1,51 @@
 from .logger import (
     MASLogger,
+    AgentMessage,
     logger,
     set_verbosity,
+    configure_logging,
+    log_context,
     format_agent_message
 )
 from .prompts import (
     build_supervisor_prompt,
     build_literature_prompt,
     build_technical_prompt,
+    build_literature_chunk_prompt,
+    build_literature_reduce_prompt,
+    build_literature_batch_prompt,
+    build_technical_chunk_prompt,
+    build_technical_reduce_prompt,
     build_critical_prompt,
-    build_synthesis_prompt
+    build_synthesis_prompt,
+    build_partial_report,
+    build_critical_review_addendum,
+    build_shared_context,
+    set_prompt_layout,
+    get_prompt_layout
 )
 
 __all__ = [
     "MASLogger",
+    "AgentMessage",
     "logger",
     "set_verbosity",
+    "configure_logging",
+    "log_context",
     "format_agent_message",
     "build_supervisor_prompt",
     "build_literature_prompt",
     "build_technical_prompt",
+    "build_literature_chunk_prompt",
+    "build_literature_reduce_prompt",
+    "build_literature_batch_prompt",
+    "build_technical_chunk_prompt",
+    "build_technical_reduce_prompt",
     "build_critical_prompt",
-    "build_synthesis_prompt"
+    "build_synthesis_prompt",
+    "build_partial_report",
+    "build_critical_review_addendum",
+    "build_shared_context",
+    "set_prompt_layout",
+    "get_prompt_layout"
 ]
\ No newline at end of file
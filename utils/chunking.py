@@ -0,0 +1,142 @@
+"""Section-aware splitting of long papers and bounded map-reduce over the chunks"""
+
+import re
+from typing import Callable, Iterator, List
+
+HEADER_PATTERN = re.compile(
+    r"^\s*(#{1,6}\s+\S.*"                                   # Markdown headers
+    r"|(\d+(\.\d+)*\.?|[IVX]+\.)\s+[A-Z][^.]{0,80}"          # "3 Method", "2.1 Setup", "IV. Results"
+    r"|(abstract|introduction|related work|background|methods?|methodology|approach"
+    r"|experiments?|evaluation|results|discussion|limitations|conclusions?|references)\s*:?"
+    r"|[A-Z][A-Z0-9 \-:]{2,60})\s*$",                       # ALL CAPS lines
+    re.IGNORECASE
+)
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def is_section_header(line: str) -> bool:
+    stripped = line.strip()
+    return 0 < len(stripped) <= 90 and bool(HEADER_PATTERN.match(stripped))
+
+
+def _split_oversized(paragraph: str, max_chars: int) -> Iterator[str]:
+    """Splits a paragraph longer than max_chars at sentence boundaries (hard cut as last resort)"""
+    piece = ""
+    for sentence in SENTENCE_END.split(paragraph):
+        while len(sentence) > max_chars:
+            if piece:
+                yield piece
+                piece = ""
+            yield sentence[:max_chars]
+            sentence = sentence[max_chars:]
+        if piece and len(piece) + len(sentence) + 1 > max_chars:
+            yield piece
+            piece = ""
+        piece = f"{piece} {sentence}" if piece else sentence
+    if piece:
+        yield piece
+
+
+def split_into_chunks(text: str, max_chars: int = 3000) -> List[str]:
+    """
+    Splits a paper into chunks of at most max_chars, cutting at paragraph boundaries and
+    preferring to start a new chunk at section headers so sections are analyzed together.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_size = 0
+
+    def flush():
+        nonlocal current, current_size
+        if current:
+            chunks.append("\n".join(current))
+        current, current_size = [], 0
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+
+        # A header opens a new chunk unless the current one is still small
+        if is_section_header(line) and current_size >= max_chars // 2:
+            flush()
+
+        for piece in _split_oversized(line, max_chars):
+            if current and current_size + len(piece) + 1 > max_chars:
+                flush()
+            current.append(piece)
+            current_size += len(piece) + 1
+
+    flush()
+    return chunks
+
+
+def _group(notes: List[str], max_chars: int) -> List[List[str]]:
+    groups: List[List[str]] = [[]]
+    size = 0
+    for note in notes:
+        if groups[-1] and size + len(note) > max_chars:
+            groups.append([])
+            size = 0
+        groups[-1].append(note)
+        size += len(note)
+    return groups
+
+
+def map_reduce(
+    map_llm,
+    reduce_llm,
+    chunks: List[str],
+    build_map_messages: Callable[[str, int, int], list],
+    build_reduce_messages: Callable[[List[str]], list],
+    max_concurrency: int = 4,
+    max_reduce_chars: int = 8000
+) -> str:
+    """
+    Analyzes every chunk with map_llm (at most max_concurrency requests in flight), then
+    reduces the chunk notes into one answer with reduce_llm. Notes that do not fit
+    max_reduce_chars are reduced in groups first (tree reduction), so no single prompt
+    grows with the paper length.
+    """
+    config = {"max_concurrency": max_concurrency}
+    total = len(chunks)
+    notes = [response.content for response in map_llm.batch(
+        [build_map_messages(chunk, index + 1, total) for index, chunk in enumerate(chunks)], config=config
+    )]
+
+    while len(notes) > 1 and sum(len(note) for note in notes) > max_reduce_chars:
+        groups = _group(notes, max_reduce_chars)
+        if len(groups) in (1, len(notes)):
+            break
+        notes = [response.content for response in reduce_llm.batch(
+            [build_reduce_messages(group) for group in groups], config=config
+        )]
+
+    return reduce_llm.invoke(build_reduce_messages(notes)).content
+
+
+async def amap_reduce(
+    map_llm,
+    reduce_llm,
+    chunks: List[str],
+    build_map_messages: Callable[[str, int, int], list],
+    build_reduce_messages: Callable[[List[str]], list],
+    max_concurrency: int = 4,
+    max_reduce_chars: int = 8000
+) -> str:
+    """Async counterpart of map_reduce"""
+    config = {"max_concurrency": max_concurrency}
+    total = len(chunks)
+    notes = [response.content for response in await map_llm.abatch(
+        [build_map_messages(chunk, index + 1, total) for index, chunk in enumerate(chunks)], config=config
+    )]
+
+    while len(notes) > 1 and sum(len(note) for note in notes) > max_reduce_chars:
+        groups = _group(notes, max_reduce_chars)
+        if len(groups) in (1, len(notes)):
+            break
+        notes = [response.content for response in await reduce_llm.abatch(
+            [build_reduce_messages(group) for group in groups], config=config
+        )]
+
+    return (await reduce_llm.ainvoke(build_reduce_messages(notes))).content
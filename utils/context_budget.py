@@ -0,0 +1,145 @@
+"""
+Token budgets for the variable parts of the agent prompts (paper, earlier agent outputs,
+message history). The prompt builders hand their sections to fit_sections, which splits
+the agent's budget between them by weight and trims only what does not fit, so prompt
+size stays bounded however long the paper or the analyses get. Tokens are counted with
+tiktoken when its encoding is available, otherwise estimated from the text length.
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, Optional
+
+# Prompt tokens available to the variable sections of each prompt; change them with configure_context_budgets
+CONTEXT_BUDGETS = {
+    "supervisor": 400,        # Paper opening and recent message history (status lines are not counted)
+    "literature": 3000,       # The paper (also per abstract in multi-paper batch requests)
+    "technical": 3000,        # Paper and literature review
+    "critical": 2000,         # Paper, literature review and technical analysis
+    "synthesis": 3000,        # Paper and all three analyses
+    "chunk_context": 100,     # Literature review repeated in every chunk prompt
+    "chunk_notes": 3000,      # All chunk notes merged by a reduce prompt
+    "shared_paper": 3000,     # "shared_prefix" layout: fixed per field, so every agent sees the same prefix
+    "shared_output": 800,     # "shared_prefix" layout: each earlier agent output
+}
+
+CHARS_PER_TOKEN = 4           # Estimate used when tiktoken is not available
+TIKTOKEN_ENCODING = "cl100k_base"
+TRIM_MARKER = "[...]"
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+BLANK_LINES_PATTERN = re.compile(r"\n\s*\n\s*\n+")
+SPACES_PATTERN = re.compile(r"[ \t]+")
+
+
+def configure_context_budgets(**budgets: int):
+    unknown = set(budgets) - set(CONTEXT_BUDGETS)
+    if unknown:
+        raise ValueError(f"Unknown context budgets: {sorted(unknown)}")
+    CONTEXT_BUDGETS.update(budgets)
+
+
+def _get_encoding():
+    """The tiktoken encoding, or None when tiktoken or its encoding file is unavailable (tried once)"""
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if not _encoding_loaded:
+            _encoding_loaded = True
+            try:
+                import tiktoken
+
+                _encoding = tiktoken.get_encoding(TIKTOKEN_ENCODING)
+            except Exception:
+                _encoding = None
+        return _encoding
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def compact(text: str) -> str:
+    """Whitespace-only compression: collapses runs of spaces and blank lines"""
+    text = SPACES_PATTERN.sub(" ", text or "")
+    return BLANK_LINES_PATTERN.sub("\n\n", text).strip()
+
+
+def _cut(text: str, max_tokens: int, keep_tail: bool) -> str:
+    encoding = _get_encoding()
+    if encoding is None:
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        return text[-max_chars:] if keep_tail else text[:max_chars]
+    tokens = encoding.encode(text, disallowed_special=())
+    return encoding.decode(tokens[-max_tokens:] if keep_tail else tokens[:max_tokens])
+
+
+def trim_to_tokens(text: str, max_tokens: int, keep_tail: bool = False) -> str:
+    """
+    Shortens text to at most max_tokens tokens, keeping its beginning (or its end with
+    keep_tail) and ending the cut at a sentence or line boundary when one is close.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= count_tokens(TRIM_MARKER) + 1:
+        return TRIM_MARKER
+
+    kept = _cut(text, max_tokens - count_tokens(TRIM_MARKER) - 1, keep_tail)
+    if keep_tail:
+        boundary = max(kept.find("\n"), kept.find(". ") + 1)
+        if 0 < boundary < len(kept) // 5:
+            kept = kept[boundary:]
+        return f"{TRIM_MARKER} {kept.lstrip()}"
+
+    boundary = max(kept.rfind("\n"), kept.rfind(". ") + 1)
+    if boundary > len(kept) * 4 // 5:
+        kept = kept[:boundary]
+    return f"{kept.rstrip()} {TRIM_MARKER}"
+
+
+def allocate_budget(sizes: Dict[str, int], budget: int, weights: Optional[Dict[str, float]] = None) -> Dict[str, int]:
+    """
+    Splits budget between sections by weight. Sections smaller than their share keep their
+    full size and the unused rest is shared among the others, so only the sections that
+    are larger than their share get trimmed.
+    """
+    weights = weights or {}
+    allocation = {}
+    pending = {name: size for name, size in sizes.items()}
+    left = budget
+
+    while pending:
+        total_weight = sum(weights.get(name, 1.0) for name in pending)
+        shares = {name: left * weights.get(name, 1.0) / total_weight for name in pending}
+        fitting = [name for name, size in pending.items() if size <= shares[name]]
+        if not fitting:
+            allocation.update({name: int(share) for name, share in shares.items()})
+            break
+        for name in fitting:
+            allocation[name] = pending.pop(name)
+            left -= allocation[name]
+
+    return allocation
+
+
+def fit_sections(
+    sections: Dict[str, str],
+    budget: int,
+    weights: Optional[Dict[str, float]] = None,
+    keep_tail: Iterable[str] = ()
+) -> Dict[str, str]:
+    """Compacts every section and trims the ones that exceed their share of budget"""
+    compacted = {name: compact(text) for name, text in sections.items()}
+    allocation = allocate_budget({name: count_tokens(text) for name, text in compacted.items()}, budget, weights)
+    keep_tail = set(keep_tail)
+    return {
+        name: trim_to_tokens(text, allocation[name], keep_tail=name in keep_tail)
+        for name, text in compacted.items()
+    }
@@ -0,0 +1,130 @@
+"""
+Per-paper time budget. run_workflow turns a timeout into an absolute deadline in the run
+config; the node wrappers hand it to the agents as state["deadline"] and stop any agent
+still running when it passes. Agents use the helpers below to fit their work into the
+remaining time.
+"""
+
+import contextvars
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+from utils.logger import logger
+
+# Defaults used by the agents; change them with configure_deadlines
+DEADLINE_SETTINGS = {
+    "tokens_per_second": 15.0,   # Generation speed assumed when shrinking num_predict
+    "min_tokens": 64,            # Never shrink an output budget below this
+    "rerun_reserve": 90.0,       # Seconds that must remain for a Critical Reviewer rerun to be honored
+    "synthesis_reserve": 30.0,   # With less time left, the supervisor goes straight to synthesis
+    "rerun_reserve_share": 0.5,      # Short budgets: reserves are capped at these shares of the total budget
+    "synthesis_reserve_share": 0.25,
+    "max_workers": 32,           # Threads shared by all calls run with call_with_timeout
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def configure_deadlines(**settings: Any):
+    unknown = set(settings) - set(DEADLINE_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown deadline settings: {sorted(unknown)}")
+    DEADLINE_SETTINGS.update(settings)
+    if "max_workers" in settings:
+        _shutdown_executor()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DEADLINE_SETTINGS["max_workers"], thread_name_prefix="deadline-call")
+        return _executor
+
+
+def _shutdown_executor():
+    # Calls already submitted still finish on the old executor's threads
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = None
+
+
+def remaining_time(state: dict) -> Optional[float]:
+    """Seconds left before the paper's deadline, or None when the run has no time budget"""
+    deadline = state.get("deadline")
+    if deadline is None:
+        return None
+    return deadline - time.time()
+
+
+def reserve(name: str, state: dict) -> float:
+    """
+    Seconds of DEADLINE_SETTINGS[name] ("rerun_reserve" or "synthesis_reserve"), capped at its
+    share of the paper's total time budget so short budgets are not spent on reserves alone
+    """
+    budget = state.get("time_budget")
+    if budget is None:
+        return DEADLINE_SETTINGS[name]
+    return min(DEADLINE_SETTINGS[name], DEADLINE_SETTINGS[f"{name}_share"] * budget)
+
+
+def fit_to_deadline(llm, state: dict, share: float = 1.0):
+    """
+    Returns llm with its output limit (num_predict / max_tokens) lowered so that generating
+    it takes at most share of the remaining time; llm itself when it already fits or the
+    run has no deadline.
+    """
+    remaining = remaining_time(state)
+    if remaining is None:
+        return llm
+
+    field = "max_tokens" if llm._llm_type == "openai-chat" else "num_predict"
+    limit = getattr(llm, field, None)
+    budget = max(DEADLINE_SETTINGS["min_tokens"], int(remaining * share * DEADLINE_SETTINGS["tokens_per_second"]))
+    if limit is None or budget >= limit:
+        return llm
+
+    logger.info(f"Time budget: limiting output to {budget} tokens ({max(remaining, 0):.0f}s left)")
+    update = {field: budget}
+    scope = getattr(llm.cache, "scope", None)
+    if scope is not None:
+        # The shorter answer must not be cached under the full-length configuration
+        update["cache"] = llm.cache.parent.scoped(**{**json.loads(scope), "num_predict": budget})
+    return llm.model_copy(update=update)
+
+
+def fit_structured_to_deadline(llm, structured_llm, schema, state: dict, share: float = 1.0):
+    """
+    fit_to_deadline for agents with a schema-constrained LLM (see create_structured_llm):
+    returns (llm, structured_llm), both with the lowered output limit when it applies
+    """
+    fitted = fit_to_deadline(llm, state, share)
+    if fitted is llm or structured_llm is None:
+        return fitted, structured_llm
+
+    from utils.model_factory import create_structured_llm
+
+    return fitted, create_structured_llm(fitted, schema)
+
+
+def call_with_timeout(func: Callable[[], Any], timeout: float) -> Any:
+    """
+    Runs func on a shared, bounded thread pool with the caller's context (run config, metrics
+    metadata) and waits at most timeout seconds, raising concurrent.futures.TimeoutError after
+    that. A timed-out call is abandoned, not cancelled: it keeps running and holds its worker
+    (and interpreter exit) until it returns, so hung calls reduce the pool's capacity (see
+    DEADLINE_SETTINGS["max_workers"]). Only a call still waiting for a free worker is dropped.
+    """
+    context = contextvars.copy_context()
+    future = _get_executor().submit(context.run, func)
+    try:
+        return future.result(timeout=max(timeout, 0.0))
+    except FutureTimeoutError:
+        future.cancel()
+        raise
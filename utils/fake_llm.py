@@ -0,0 +1,141 @@
+"""Deterministic local stand-in chat model for benchmarks and offline runs (create_llm with local=2)"""
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# Defaults used by create_llm; change them with configure_fake_llm before building the workflow
+FAKE_LLM_SETTINGS = {
+    "latency": 0.05,          # Fixed seconds per call (request overhead + prompt processing)
+    "time_per_token": 0.0,    # Additional seconds per generated token
+    "output_tokens": 200,     # Words generated for free-text agents (capped by num_predict)
+}
+
+PROGRESS_PATTERN = re.compile(r"- (Literature Review|Technical Analysis|Critical Review|Final Report): (\w+)")
+SECTION_PATTERN = re.compile(r"^([A-Z][A-Z /]+):\s*$", re.MULTILINE)
+PAPER_MARKER_PATTERN = re.compile(r"^=== PAPER (\d+) ===$", re.MULTILINE)
+ROUTING_ORDER = [
+    ("Literature Review", "literature_reviewer"),
+    ("Technical Analysis", "technical_analyzer"),
+    ("Critical Review", "critical_reviewer"),
+    ("Final Report", "synthesis"),
+]
+FILLER_WORDS = ["analysis", "method", "results", "model", "approach", "evidence",
+                "training", "robust", "baseline", "dataset", "novel", "framework"]
+
+
+def configure_fake_llm(**settings: Any):
+    unknown = set(settings) - set(FAKE_LLM_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown fake LLM settings: {sorted(unknown)}")
+    FAKE_LLM_SETTINGS.update(settings)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Answers every agent prompt with well-formed, deterministic output: routing JSON for
+    the supervisor (following the progress block of its prompt), an accepting evaluation
+    for the critical reviewer, and sectioned text for the other agents. Latency and
+    output length are configurable so that benchmarks measure framework overhead only.
+    """
+
+    model: str = "fake-llm"
+    temperature: float = 0.5
+    num_predict: int = 800
+    latency: float = 0.05
+    time_per_token: float = 0.0
+    output_tokens: int = 200
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": self.model, "temperature": self.temperature, "num_predict": self.num_predict}
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+
+        if "Supervisor Agent" in prompt:
+            progress = dict(PROGRESS_PATTERN.findall(prompt))
+            next_agent = next((agent for label, agent in ROUTING_ORDER if progress.get(label) == "Pending"), "FINISH")
+            return json.dumps({
+                "reasoning": f"Next pending step is {next_agent}.",
+                "next_agent": next_agent,
+                "priority": "medium"
+            })
+
+        if "Quality Assessor Agent" in prompt:
+            return json.dumps({
+                "literature_quality": "GOOD",
+                "literature_assessment": "Coverage is sufficient.",
+                "technical_quality": "GOOD",
+                "technical_assessment": "Methodology is assessed.",
+                "reasoning": "Both analyses are complete enough for synthesis.",
+                "needs_rerun": []
+            })
+
+        # Deterministic filler text under the section headers requested by the prompt
+        output_format = prompt.split("OUTPUT FORMAT:", 1)[-1]
+        sections = SECTION_PATTERN.findall(output_format) or ["ANALYSIS"]
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+        # Multi-paper prompts get one marked answer per paper
+        papers = PAPER_MARKER_PATTERN.findall(prompt.split("OUTPUT FORMAT:", 1)[0])
+        total_words = min(self.output_tokens, self.num_predict // max(1, len(papers)))
+        words_per_section = max(1, total_words // len(sections))
+
+        lines = []
+        for paper in papers or [None]:
+            if paper is not None:
+                lines.append(f"=== PAPER {paper} ===")
+            for index, section in enumerate(sections):
+                words = [FILLER_WORDS[(seed + index * 31 + i) % len(FILLER_WORDS)] for i in range(words_per_section)]
+                lines.append(f"{section}:\n{' '.join(words)}\n")
+        return "\n".join(lines)
+
+    def _usage(self, messages: List[BaseMessage], content: str) -> Dict[str, int]:
+        input_tokens = sum(len(str(message.content)) for message in messages) // 4
+        output_tokens = len(content.split())
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        content = self._reply(messages)
+        time.sleep(self.latency + self.time_per_token * len(content.split()))
+        message = AIMessage(content=content, usage_metadata=self._usage(messages, content))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        content = self._reply(messages)
+        await asyncio.sleep(self.latency + self.time_per_token * len(content.split()))
+        message = AIMessage(content=content, usage_metadata=self._usage(messages, content))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        content = self._reply(messages)
+        time.sleep(self.latency)
+        for word in content.split(" "):
+            time.sleep(self.time_per_token)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(messages, content)))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        content = self._reply(messages)
+        await asyncio.sleep(self.latency)
+        for word in content.split(" "):
+            await asyncio.sleep(self.time_per_token)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(messages, content)))
@@ -0,0 +1,89 @@
+"""Process-wide pooled HTTP clients shared by every model created through create_llm"""
+
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+
+# Connection pool settings; change them with configure_http_pool before creating the workflow
+HTTP_POOL_SETTINGS = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 60.0,   # Seconds an idle connection stays open for reuse
+    "timeout": 600.0,           # Long generations on a local model can take minutes
+}
+
+_clients: Dict[tuple, Any] = {}
+_lock = threading.Lock()
+
+
+def configure_http_pool(**settings: Any):
+    """Updates pool settings; clients already created keep their old settings until reset_http_pool()"""
+    unknown = set(settings) - set(HTTP_POOL_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown HTTP pool settings: {sorted(unknown)}")
+    HTTP_POOL_SETTINGS.update(settings)
+
+
+def _httpx_kwargs() -> Dict[str, Any]:
+    return {
+        "limits": httpx.Limits(
+            max_connections=HTTP_POOL_SETTINGS["max_connections"],
+            max_keepalive_connections=HTTP_POOL_SETTINGS["max_keepalive_connections"],
+            keepalive_expiry=HTTP_POOL_SETTINGS["keepalive_expiry"]
+        ),
+        "timeout": HTTP_POOL_SETTINGS["timeout"]
+    }
+
+
+def _get_or_create(key: tuple, factory):
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            _clients[key] = client
+        return client
+
+
+def get_openai_http_clients():
+    """
+    Shared (sync, async) httpx clients for ChatOpenAI. Requests go through the adaptive
+    concurrency limiter (utils.rate_limiter), which also owns retries and backoff.
+    """
+    from utils.rate_limiter import AdaptiveTransport, AsyncAdaptiveTransport
+
+    def sync_client():
+        limits = _httpx_kwargs()["limits"]
+        return httpx.Client(transport=AdaptiveTransport(httpx.HTTPTransport(limits=limits)), **_httpx_kwargs())
+
+    def async_client():
+        limits = _httpx_kwargs()["limits"]
+        return httpx.AsyncClient(transport=AsyncAdaptiveTransport(httpx.AsyncHTTPTransport(limits=limits)), **_httpx_kwargs())
+
+    return (
+        _get_or_create(("openai", "sync"), sync_client),
+        _get_or_create(("openai", "async"), async_client)
+    )
+
+
+def get_ollama_clients(host: Optional[str] = None):
+    """Shared (sync, async) ollama clients for one Ollama host"""
+    from ollama import AsyncClient, Client
+
+    return (
+        _get_or_create(("ollama", "sync", host), lambda: Client(host=host, **_httpx_kwargs())),
+        _get_or_create(("ollama", "async", host), lambda: AsyncClient(host=host, **_httpx_kwargs()))
+    )
+
+
+def reset_http_pool():
+    """
+    Closes and forgets the sync clients. Async clients are dropped without closing:
+    their connections belong to the event loop that opened them, so a process that
+    runs several asyncio.run() loops should reset the pool between them.
+    """
+    with _lock:
+        for (backend, kind, *_), client in _clients.items():
+            if kind == "sync":
+                client.close()
+        _clients.clear()
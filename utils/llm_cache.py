@@ -0,0 +1,139 @@
+"""Persistent, content-addressed cache for LLM responses, plugged into LangChain chat models via create_llm"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import warnings
+from typing import Any, Dict, Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+
+# loads() is flagged as beta on every cache hit; the serialized format is our own
+warnings.filterwarnings("ignore", message="The function `loads` is in beta")
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    SQLite-backed LangChain cache. Entries are keyed by a SHA-256 of the model
+    configuration string (model, temperature, num_predict/max_tokens, ...) and the
+    serialized message list. Supports TTL expiry, a max entry count with
+    least-recently-used eviction, and keeps hit/miss counters.
+    """
+
+    def __init__(self, path: str = ".llm_cache.sqlite", ttl_seconds: Optional[float] = None, max_entries: Optional[int] = 10000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, generations TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT generations, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        generations = [loads(generation) for generation in json.loads(row[0])]
+        for generation in generations:
+            # Lets callbacks (utils.metrics) tell cached responses apart from generated ones
+            message = getattr(generation, "message", None)
+            if message is not None:
+                message.response_metadata["cache_hit"] = True
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+        generations = json.dumps([dumps(generation) for generation in return_val])
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, generations, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, generations, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def scoped(self, **model_config: Any) -> "ScopedLLMCache":
+        """
+        View of this cache bound to an explicit model configuration. Some backends
+        (ChatOllama) leave model and sampling options out of the llm_string LangChain
+        passes to the cache, so create_llm adds them to the key itself.
+        """
+        return ScopedLLMCache(self, json.dumps(model_config, sort_keys=True))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries
+        }
+
+
+class ScopedLLMCache(BaseCache):
+    """Delegates to a shared SQLiteLLMCache with the model configuration prepended to every key"""
+
+    def __init__(self, parent: SQLiteLLMCache, scope: str):
+        self.parent = parent
+        self.scope = scope
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        return self.parent.lookup(prompt, f"{self.scope}\x00{llm_string}")
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.parent.update(prompt, f"{self.scope}\x00{llm_string}", return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.parent.clear(**kwargs)
@@ -1,120 +1,269 @@
 from colorama import Fore, Style, init
-from typing import Dict, Any
+from typing import Dict, Any, NamedTuple, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+import atexit
 import json
+import queue
+import threading
+import time
 from datetime import datetime
 
 init(autoreset=True)
 
+LOG_MODES = ("console", "queue")
+
+
+class LogContext(NamedTuple):
+    """Run the current log lines belong to; verbosity None = the logger's own verbosity"""
+    run_id: str
+    paper_id: str
+    verbosity: Optional[int]
+
+
+# Set per run by log_context; copied into agent threads and tasks by LangGraph
+_log_context: ContextVar[Optional[LogContext]] = ContextVar("log_context", default=None)
+
+
+@contextmanager
+def log_context(run_id: Optional[str] = None, paper_id: Optional[str] = None, verbosity: Optional[int] = None):
+    """
+    Tags every log line written inside the block (including agent threads and tasks started
+    from it) with run_id/paper_id, and optionally overrides the verbosity for this run only.
+    Unset arguments are inherited from an enclosing log_context.
+    """
+    outer = _log_context.get()
+    context = LogContext(
+        run_id=run_id or (outer.run_id if outer else "") or paper_id or "",
+        paper_id=paper_id or (outer.paper_id if outer else ""),
+        verbosity=verbosity if verbosity is not None else (outer.verbosity if outer else None)
+    )
+    token = _log_context.set(context)
+    try:
+        yield context
+    finally:
+        try:
+            _log_context.reset(token)
+        except ValueError:
+            # A streaming generator closed from another context; that context never saw the tags
+            pass
+
 
 class MASLogger:
-    
+    """
+    Console logger of the agents. In "console" mode (default) lines are printed right away.
+    In "queue" mode the caller only enqueues a record; a background thread renders it to
+    the console, prefixed with its run id, and appends it as a JSON line to json_path.
+    """
+
     def __init__(self, verbosity: int = 1):
         self.verbosity = verbosity
-        
+        self.mode = "console"
+        self.console = True
+        self._queue: Optional[queue.Queue] = None
+        self._worker: Optional[threading.Thread] = None
+        self._json_file = None
+
+    def enabled(self, level: int) -> bool:
+        """Cheap check for callers that build expensive messages"""
+        context = _log_context.get()
+        if context is None or context.verbosity is None:
+            return self.verbosity >= level
+        return context.verbosity >= level
+
+    def start_queue(self, json_path: Optional[str] = None, console: bool = True):
+        self.stop_queue()
+        self._json_file = open(json_path, "a", encoding="utf-8") if json_path else None
+        self.console = console
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._drain, name="log-writer", daemon=True)
+        self._worker.start()
+        self.mode = "queue"
+
+    def stop_queue(self):
+        """Writes out everything still queued and returns to direct console output"""
+        if self._queue is None:
+            return
+        self._queue.put(None)
+        self._worker.join()
+        if self._json_file is not None:
+            self._json_file.close()
+        self._queue = self._worker = self._json_file = None
+        self.mode = "console"
+        self.console = True
+
+    def flush(self):
+        if self._queue is not None:
+            self._queue.join()
+
+    def _drain(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                record, text, end = item
+                if self.console and text is not None:
+                    tag = record.get("run_id") if record else ""
+                    if tag:
+                        text = "\n".join(f"[{tag}] {line}" if line.strip() else line for line in text.split("\n"))
+                    print(text, end=end, flush=self._queue.empty())
+                if self._json_file is not None and record is not None:
+                    self._json_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    if self._queue.empty():
+                        self._json_file.flush()
+            finally:
+                self._queue.task_done()
+
+    def _write(self, event: str, message: str, text: str, end: str = "\n", structured: bool = True, **fields: Any):
+        if self._queue is None:
+            print(text, end=end, flush=end != "\n")
+            return
+
+        record = None
+        if structured:
+            context = _log_context.get()
+            record = {
+                "ts": time.time(),
+                "event": event,
+                "run_id": context.run_id if context else "",
+                "paper_id": context.paper_id if context else "",
+                "thread": threading.current_thread().name,
+                "message": message,
+                **fields
+            }
+        self._queue.put((record, text, end))
+
     def header(self, text: str):
-        if self.verbosity >= 0:
-            print(f"\n{Fore.CYAN}{'-' * 60}")
-            print(f"{Fore.CYAN}{text}")
-            print(f"{Fore.CYAN}{'-' * 60}{Style.RESET_ALL}\n")
-    
+        if self.enabled(0):
+            self._write("header", text, f"\n{Fore.CYAN}{'-' * 60}\n{Fore.CYAN}{text}\n{Fore.CYAN}{'-' * 60}{Style.RESET_ALL}\n")
+
     def section(self, text: str):
-        if self.verbosity >= 1:
-            print(f"\n{Fore.YELLOW}{'-' * 60}")
-            print(f"{Fore.YELLOW}{text}")
-            print(f"{Fore.YELLOW}{'-' * 60}{Style.RESET_ALL}\n")
-    
+        if self.enabled(1):
+            self._write("section", text, f"\n{Fore.YELLOW}{'-' * 60}\n{Fore.YELLOW}{text}\n{Fore.YELLOW}{'-' * 60}{Style.RESET_ALL}\n")
+
     def agent_start(self, agent_name: str, role: str):
-        if self.verbosity >= 1:
-            print(f"{Fore.GREEN}{agent_name} - {role}{Style.RESET_ALL}")
-            if self.verbosity >= 2:
-                print(f"{Fore.CYAN}Timestamp: {datetime.now().strftime('%H:%M:%S')}{Style.RESET_ALL}")
-    
+        if self.enabled(1):
+            text = f"{Fore.GREEN}{agent_name} - {role}{Style.RESET_ALL}"
+            if self.enabled(2):
+                text += f"\n{Fore.CYAN}Timestamp: {datetime.now().strftime('%H:%M:%S')}{Style.RESET_ALL}"
+            self._write("agent_start", role, text, agent=agent_name)
+
     def reasoning(self, thought: str):
-        if self.verbosity >= 1:
-            print(f"{Fore.MAGENTA}Reasoning:{Style.RESET_ALL}")
-            lines = thought.split('\n')
-            for line in lines:
-                if line.strip():
-                    print(f"   {line}")
-            print()
-    
+        if self.enabled(1):
+            lines = [f"   {line}" for line in thought.split('\n') if line.strip()]
+            self._write("reasoning", thought, "\n".join([f"{Fore.MAGENTA}Reasoning:{Style.RESET_ALL}", *lines, ""]))
+
     def decision(self, decision: str, reason: str = ""):
-        if self.verbosity >= 1:
-            print(f"{Fore.GREEN}Decision: {decision}{Style.RESET_ALL}")
-            if reason and self.verbosity >= 2:
-                print(f"   Reason: {reason}")
-            print()
-    
+        if self.enabled(1):
+            text = f"{Fore.GREEN}Decision: {decision}{Style.RESET_ALL}"
+            if reason and self.enabled(2):
+                text += f"\n   Reason: {reason}"
+            self._write("decision", decision, text + "\n", reason=reason)
+
     def state_update(self, field: str, preview: str = ""):
-        if self.verbosity >= 1:
-            print(f"{Fore.BLUE}State update: {field}{Style.RESET_ALL}")
-            print("\n----------------------------------------------")
-            if preview and self.verbosity >= 2:
+        if self.enabled(1):
+            text = f"{Fore.BLUE}State update: {field}{Style.RESET_ALL}\n\n----------------------------------------------"
+            if preview and self.enabled(2):
                 preview_text = preview[:100] + "..." if len(preview) > 100 else preview
-                print(f"   Preview: {preview_text}")
-            print()
-    
+                text += f"\n   Preview: {preview_text}"
+            self._write("state_update", field, text + "\n", preview=preview[:100])
+
     def communication(self, from_agent: str, message: str):
-        if self.verbosity >= 2:
-            print(f"{Fore.CYAN}{from_agent} -> Blackboard:{Style.RESET_ALL}")
-            print(f"   {message[:150]}...")
-            print()
-    
+        if self.enabled(2):
+            self._write("communication", message, f"{Fore.CYAN}{from_agent} -> Blackboard:{Style.RESET_ALL}\n   {message[:150]}...\n",
+                        agent=from_agent)
+
     def state_snapshot(self, state: Dict[str, Any]):
-        if self.verbosity >= 2:
-            print(f"{Fore.YELLOW}State snapshot:{Style.RESET_ALL}")
+        if self.enabled(2):
+            lines = [f"{Fore.YELLOW}State snapshot:{Style.RESET_ALL}"]
             for key, value in state.items():
                 if key == "messages":
-                    print(f"   {key}: {len(value)} messages")
+                    lines.append(f"   {key}: {len(value)} messages")
                 elif key == "paper_abstract" and value:
-                    print(f"   {key}: {len(value)} chars")
+                    lines.append(f"   {key}: {len(value)} chars")
                 elif isinstance(value, str) and len(value) > 100:
-                    print(f"   {key}: {value[:100]}...")
+                    lines.append(f"   {key}: {value[:100]}...")
                 else:
-                    print(f"   {key}: {value}")
-            print()
-    
+                    lines.append(f"   {key}: {value}")
+            self._write("state_snapshot", "\n".join(lines[1:]), "\n".join(lines) + "\n")
+
     def error(self, message: str):
-        print(f"{Fore.RED}ERROR: {message}{Style.RESET_ALL}\n")
-    
+        self._write("error", message, f"{Fore.RED}ERROR: {message}{Style.RESET_ALL}\n")
+
     def warning(self, message: str):
-        if self.verbosity >= 1:
-            print(f"{Fore.YELLOW}WARNING: {message}{Style.RESET_ALL}\n")
-    
+        if self.enabled(1):
+            self._write("warning", message, f"{Fore.YELLOW}WARNING: {message}{Style.RESET_ALL}\n")
+
     def success(self, message: str):
-        print(f"{Fore.GREEN}{message}{Style.RESET_ALL}\n")
-    
+        self._write("success", message, f"{Fore.GREEN}{message}{Style.RESET_ALL}\n")
+
     def info(self, message: str):
-        if self.verbosity >= 1:
-            print(f"{Fore.WHITE}{message}{Style.RESET_ALL}")
-    
+        if self.enabled(1):
+            self._write("info", message, f"{Fore.WHITE}{message}{Style.RESET_ALL}")
+
     def final_output(self, report: str):
         self.header("FINAL ANALYSIS REPORT")
-        print(f"{Fore.WHITE}{report}{Style.RESET_ALL}")
-        print(f"\n{Fore.CYAN}{'-' * 60}{Style.RESET_ALL}\n")
-    
+        self._write("final_report", report, f"{Fore.WHITE}{report}{Style.RESET_ALL}\n\n{Fore.CYAN}{'-' * 60}{Style.RESET_ALL}\n")
+
+    def stream_start(self):
+        self.header("FINAL ANALYSIS REPORT")
+
+    def stream_token(self, token: str):
+        # Tokens are rendered only; the complete report is logged by its agent
+        self._write("token", token, f"{Fore.WHITE}{token}{Style.RESET_ALL}", end="", structured=False)
+
+    def stream_end(self):
+        self._write("stream_end", "", f"\n\n{Fore.CYAN}{'-' * 60}{Style.RESET_ALL}\n", structured=False)
+
     def workflow_summary(self, total_agents: int, iterations: int, time_taken: float):
-        if self.verbosity >= 1:
+        if self.enabled(1):
             self.section("WORKFLOW SUMMARY")
-            print(f"   Total Agents Executed: {total_agents}")
-            print(f"   Total Iterations: {iterations}")
-            print(f"   Time Taken: {time_taken:.2f} seconds")
-            print(f"   Average per Agent: {time_taken/total_agents:.2f}s")
-            print()
+            lines = [
+                f"   Total Agents Executed: {total_agents}",
+                f"   Total Iterations: {iterations}",
+                f"   Time Taken: {time_taken:.2f} seconds"
+            ]
+            if total_agents:
+                lines.append(f"   Average per Agent: {time_taken/total_agents:.2f}s")
+            self._write("workflow_summary", "Workflow summary", "\n".join(lines) + "\n",
+                        total_agents=total_agents, iterations=iterations, time_taken=time_taken)
+
 
+class AgentMessage(NamedTuple):
+    """Compact, immutable message log entry; get() keeps the dict-style access of older code"""
+    agent: str
+    content: str
+    action: str
+    timestamp: float
 
-def format_agent_message(agent_name: str, content: str, action: str = "") -> Dict[str, str]:
-    return {
-        "agent": agent_name,
-        "content": content,
-        "action": action,
-        "timestamp": datetime.now().isoformat()
-    }
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        return getattr(self, key, default)
+
+
+def format_agent_message(agent_name: str, content: str, action: str = "") -> AgentMessage:
+    return AgentMessage(agent_name, content, action, time.time())
 
 
 logger = MASLogger(verbosity=1)
+atexit.register(logger.stop_queue)
 
 
 def set_verbosity(level: int):
-    global logger
-    logger = MASLogger(verbosity=level)
\ No newline at end of file
+    # Updated in place: modules hold a reference to the shared logger from their import
+    logger.verbosity = level
+
+
+def configure_logging(mode: str = "console", json_path: Optional[str] = None, console: bool = True) -> MASLogger:
+    """
+    "console": print every line right away (default). "queue": agents only enqueue log
+    records; a background thread prints them (console=True) tagged with their run id and
+    appends them as JSON lines to json_path.
+    """
+    if mode not in LOG_MODES:
+        raise ValueError(f"Unknown log mode '{mode}', expected one of {LOG_MODES}")
+    if mode == "queue":
+        logger.start_queue(json_path, console)
+    else:
+        logger.stop_queue()
+    return logger
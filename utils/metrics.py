@@ -0,0 +1,298 @@
+"""Per-agent latency, token and cost instrumentation, collected on a side channel next to the workflow state"""
+
+import csv
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+# USD per 1M (prompt, completion) tokens; models not listed (e.g. local Ollama) cost 0.
+# Prompt tokens served from OpenAI's prompt cache are billed at CACHED_PROMPT_DISCOUNT of the prompt price.
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+CACHED_PROMPT_DISCOUNT = 0.5
+
+METRIC_FIELDS = [
+    "run_id",
+    "paper_id",
+    "node",
+    "agent",
+    "model",
+    "started_at",
+    "wall_time",
+    "llm_time",
+    "llm_calls",
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+    "prompt_eval_time",
+    "cache_hits",
+    "retries",
+    "cost_usd"
+]
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    prompt_price, completion_price = MODEL_PRICING.get(model, (0.0, 0.0))
+    billed_prompt_tokens = prompt_tokens - cached_tokens * (1 - CACHED_PROMPT_DISCOUNT)
+    return (billed_prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+SUMMARY_KEYS = ("node", "agent", "model")
+SUMMED_FIELDS = ("wall_time", "llm_time", "llm_calls", "prompt_tokens", "completion_tokens",
+                 "cached_tokens", "prompt_eval_time", "cache_hits", "retries", "cost_usd")
+
+
+def current_run_id() -> str:
+    """Workflow run of the current node or LLM call, from the run metadata set by graph.workflow"""
+    from langchain_core.runnables.config import var_child_runnable_config
+
+    return ((var_child_runnable_config.get() or {}).get("metadata") or {}).get("run_id", "")
+
+
+class MetricsRecorder:
+    """
+    Collects one record per agent execution. Node wrappers open and close records;
+    LLM callbacks add their timings and token counts to the open record of the same
+    (run_id, paper_id, node), which LangGraph exposes in the run metadata, so concurrent
+    runs of one paper id are kept apart. Only the last max_records records are kept;
+    summaries are aggregated as records close, so they cover every execution. A group's
+    paper count is the number of runs that reached it.
+    """
+
+    def __init__(self, max_records: int = 10000):
+        self.records: Deque[Dict[str, Any]] = deque(maxlen=max_records)
+        self.executions = 0
+        self._totals: Dict[str, Dict[str, Dict[str, Any]]] = {key: {} for key in SUMMARY_KEYS}
+        # Groups each recent run was already counted in, for the per-group paper counts
+        self._run_groups: "OrderedDict[str, set]" = OrderedDict()
+        self._open: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def set_max_records(self, max_records: int):
+        with self._lock:
+            self.records = deque(self.records, maxlen=max_records)
+
+    def _new_record(self, paper_id: str, node: str, agent: str = "", run_id: str = "") -> Dict[str, Any]:
+        return {
+            "run_id": run_id,
+            "paper_id": paper_id,
+            "node": node,
+            "agent": agent,
+            "model": "",
+            "started_at": time.time(),
+            "wall_time": 0.0,
+            "llm_time": 0.0,
+            "llm_calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cached_tokens": 0,         # Prompt tokens served from the provider's prompt cache (OpenAI)
+            "prompt_eval_time": 0.0,    # Seconds spent processing prompts (reported by Ollama)
+            "cache_hits": 0,
+            "retries": 0,
+            "cost_usd": 0.0
+        }
+
+    def _close(self, record: Dict[str, Any]):
+        # Called with the lock held
+        self.records.append(record)
+        self.executions += 1
+
+        run = record["run_id"] or record["paper_id"]
+        counted = self._run_groups.pop(run, None) or set()
+        self._run_groups[run] = counted
+        while len(self._run_groups) > self.records.maxlen:
+            self._run_groups.popitem(last=False)
+
+        for key in SUMMARY_KEYS:
+            name = record[key] or "unknown"
+            group = self._totals[key].setdefault(name, {"executions": 0, "papers": 0, **{field: 0 for field in SUMMED_FIELDS}})
+            group["executions"] += 1
+            if (key, name) not in counted:
+                counted.add((key, name))
+                group["papers"] += 1
+            for field in SUMMED_FIELDS:
+                group[field] += record[field]
+
+    def start_node(self, paper_id: str, node: str, agent: str, run_id: Optional[str] = None) -> Dict[str, Any]:
+        record = self._new_record(paper_id, node, agent, current_run_id() if run_id is None else run_id)
+        with self._lock:
+            self._open[(record["run_id"], paper_id, node)] = record
+        return record
+
+    def end_node(self, record: Dict[str, Any]):
+        record["wall_time"] = time.time() - record["started_at"]
+        with self._lock:
+            self._open.pop((record["run_id"], record["paper_id"], record["node"]), None)
+            self._close(record)
+
+    def _record_for(self, run_id: str, paper_id: str, node: str) -> Tuple[Dict[str, Any], bool]:
+        record = self._open.get((run_id, paper_id, node))
+        if record is None:
+            # LLM call made outside a workflow node (e.g. a standalone agent call) is its own execution
+            return self._new_record(paper_id, node, run_id=run_id), True
+        return record, False
+
+    def record_llm_call(
+        self,
+        paper_id: str,
+        node: str,
+        model: str,
+        llm_time: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cache_hit: bool = False,
+        cached_tokens: int = 0,
+        prompt_eval_time: float = 0.0,
+        run_id: str = ""
+    ):
+        with self._lock:
+            record, standalone = self._record_for(run_id, paper_id, node)
+            record["model"] = model or record["model"]
+            record["llm_calls"] += 1
+            record["llm_time"] += llm_time
+            if cache_hit:
+                record["cache_hits"] += 1
+            else:
+                record["prompt_tokens"] += prompt_tokens
+                record["completion_tokens"] += completion_tokens
+                record["cached_tokens"] += cached_tokens
+                record["prompt_eval_time"] += prompt_eval_time
+                record["cost_usd"] += estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+            if standalone:
+                self._close(record)
+
+    def record_retry(self, paper_id: str, node: str, run_id: str = ""):
+        with self._lock:
+            record, standalone = self._record_for(run_id, paper_id, node)
+            record["retries"] += 1
+            if standalone:
+                self._close(record)
+
+    def run_executions(self, run_id: str) -> int:
+        """Executions of one workflow run among the records still kept"""
+        with self._lock:
+            return sum(1 for record in self.records if record["run_id"] == run_id)
+
+    def reset(self):
+        with self._lock:
+            self.records = deque(maxlen=self.records.maxlen)
+            self.executions = 0
+            self._totals = {key: {} for key in SUMMARY_KEYS}
+            self._run_groups = OrderedDict()
+            self._open = {}
+
+    def summary_by(self, key: str = "node") -> Dict[str, Dict[str, Any]]:
+        """
+        Aggregates records by node, agent or model, including each group's share of total
+        wall time and cost and its cost per analyzed paper
+        """
+        if key not in SUMMARY_KEYS:
+            raise ValueError(f"Unknown summary key '{key}', expected one of {SUMMARY_KEYS}")
+        with self._lock:
+            summary = {name: dict(group) for name, group in self._totals[key].items()}
+
+        total_time = sum(group["wall_time"] for group in summary.values()) or 1.0
+        total_cost = sum(group["cost_usd"] for group in summary.values()) or 1.0
+        for name, group in summary.items():
+            group["cost_per_paper"] = group["cost_usd"] / group["papers"]
+            group["time_share"] = group["wall_time"] / total_time
+            group["cost_share"] = group["cost_usd"] / total_cost
+            group["cached_token_rate"] = group["cached_tokens"] / group["prompt_tokens"] if group["prompt_tokens"] else 0.0
+            group["prompt_eval_per_call"] = group["prompt_eval_time"] / group["llm_calls"] if group["llm_calls"] else 0.0
+
+        return summary
+
+    def export_json(self, path: str):
+        with self._lock:
+            records = list(self.records)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"records": records, "by_node": self.summary_by("node"), "by_model": self.summary_by("model")}, f, indent=2)
+
+    def export_csv(self, path: str):
+        with self._lock:
+            records = list(self.records)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=METRIC_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(records)
+
+    def export(self, path: str):
+        if path.endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Times every chat model call and reads token usage from the response metadata"""
+
+    def __init__(self, recorder: MetricsRecorder):
+        self.recorder = recorder
+        self._runs: Dict[UUID, tuple] = {}
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[Any]],
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> None:
+        metadata = metadata or {}
+        self._runs[run_id] = (
+            time.time(),
+            metadata.get("paper_id", ""),
+            metadata.get("langgraph_node", ""),
+            metadata.get("ls_model_name", ""),
+            metadata.get("run_id", "")
+        )
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        start_time, paper_id, node, model, workflow_run_id = run
+
+        prompt_tokens = completion_tokens = cached_tokens = 0
+        prompt_eval_time = 0.0
+        cache_hit = False
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if message is None:
+                    continue
+                usage = getattr(message, "usage_metadata", None) or {}
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+                cached_tokens += (usage.get("input_token_details") or {}).get("cache_read") or 0
+                # Ollama reports its prompt processing time in nanoseconds
+                prompt_eval_time += (message.response_metadata.get("prompt_eval_duration") or 0) / 1e9
+                cache_hit = cache_hit or bool(message.response_metadata.get("cache_hit"))
+
+        self.recorder.record_llm_call(
+            paper_id, node, model, time.time() - start_time,
+            prompt_tokens, completion_tokens, cache_hit, cached_tokens, prompt_eval_time, workflow_run_id
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._runs.pop(run_id, None)
+
+    def on_retry(self, retry_state: Any, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        run = self._runs.get(run_id) or self._runs.get(parent_run_id)
+        if run is not None:
+            self.recorder.record_retry(run[1], run[2], run[4])
+
+
+metrics = MetricsRecorder()
+metrics_handler = MetricsCallbackHandler(metrics)
@@ -1,21 +1,149 @@
 """Factory function to create the appropriate LLM instance based on configuration"""
 
-from langchain_ollama import ChatOllama
-from langchain_openai import ChatOpenAI
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from utils.http_pool import get_ollama_clients, get_openai_http_clients
+from utils.llm_cache import SQLiteLLMCache
+from utils.metrics import metrics_handler
+
+# Shared response cache handed to every model built by create_llm (disabled until configured)
+_llm_cache: Optional[SQLiteLLMCache] = None
+
+# Graph agents whose model can be chosen individually, see resolve_agent_models
+AGENT_NAMES = ("supervisor", "literature_reviewer", "technical_analyzer", "critical_reviewer", "synthesis")
+
+
+def configure_llm_cache(path: str = ".llm_cache.sqlite", ttl_seconds: Optional[float] = None, max_entries: Optional[int] = 10000) -> SQLiteLLMCache:
+    """Enables the on-disk response cache for all LLMs created afterwards"""
+    global _llm_cache
+    _llm_cache = SQLiteLLMCache(path=path, ttl_seconds=ttl_seconds, max_entries=max_entries)
+    return _llm_cache
+
+
+def get_llm_cache() -> Optional[SQLiteLLMCache]:
+    return _llm_cache
 
 
 def create_llm(model_name: str, local: int = 1, temperature: float = 0.5, num_predict: int = 800):
-    if local == 1:
-        # Use Ollama locally
-        return ChatOllama(
+    # Every model reports timings and token usage to the shared metrics recorder
+    extra_kwargs = {"callbacks": [metrics_handler]}
+    
+    # Only pass a cache when configured, otherwise LangChain's global default applies
+    if _llm_cache is not None:
+        extra_kwargs["cache"] = _llm_cache.scoped(
+            local=local,
             model=model_name,
             temperature=temperature,
             num_predict=num_predict
         )
+
+    if local == 2:
+        # Deterministic offline stand-in (benchmarks), see utils.fake_llm
+        from utils.fake_llm import FakeChatModel, FAKE_LLM_SETTINGS
+        return FakeChatModel(
+            model=model_name,
+            temperature=temperature,
+            num_predict=num_predict,
+            **FAKE_LLM_SETTINGS,
+            **extra_kwargs
+        )
+    elif local == 1:
+        # Use Ollama locally (backends are imported on first use to keep startup fast)
+        from langchain_ollama import ChatOllama
+        llm = ChatOllama(
+            model=model_name,
+            temperature=temperature,
+            num_predict=num_predict,
+            **extra_kwargs
+        )
+        # Replace the per-instance clients with the pooled ones shared by all agents
+        llm._client, llm._async_client = get_ollama_clients(llm.base_url)
+        return llm
     else:
-        # Use OpenAI API
+        # Use OpenAI API, over the pooled HTTP clients shared by all agents
+        from langchain_openai import ChatOpenAI
+        http_client, http_async_client = get_openai_http_clients()
         return ChatOpenAI(
             model=model_name,
             temperature=temperature,
-            max_tokens=num_predict
+            max_tokens=num_predict,
+            http_client=http_client,
+            http_async_client=http_async_client,
+            max_retries=0,  # Retries and backoff are handled by the shared rate limiter
+            **extra_kwargs
         )
+
+
+def resolve_agent_models(
+    model_name: str,
+    local: int = 1,
+    agent_models: Optional[Dict[str, Tuple[str, int]]] = None
+) -> Dict[str, Tuple[str, int]]:
+    """
+    (model_name, local) per agent: agent_models overrides the shared model for some agents,
+    e.g. {"supervisor": ("llama3.2:3b", 1), "synthesis": ("gpt-4o-mini", 0)}. Ollama and
+    OpenAI models can be mixed in one graph.
+    """
+    agent_models = agent_models or {}
+    unknown = set(agent_models) - set(AGENT_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown agents in agent_models: {sorted(unknown)}, expected some of {AGENT_NAMES}")
+    return {agent: tuple(agent_models.get(agent, (model_name, local))) for agent in AGENT_NAMES}
+
+
+def create_structured_llm(llm, schema: Type[BaseModel]):
+    """
+    Wraps an LLM from create_llm so that it answers with JSON matching schema: OpenAI's
+    strict JSON-schema mode, or Ollama's JSON mode (format="json") validated against the
+    schema. The runnable returns {"raw": AIMessage, "parsed": schema instance or None};
+    parsed is None when the answer does not validate, so callers can still parse raw.
+    Returns None for backends without a structured output mode (e.g. the fake model).
+    """
+    from langchain_core.runnables import RunnableLambda
+
+    if llm._llm_type == "openai-chat":
+        return llm.with_structured_output(schema, method="json_schema", strict=True, include_raw=True)
+
+    if llm._llm_type == "chat-ollama":
+        def parse(message):
+            try:
+                parsed = schema.model_validate_json(message.content)
+            except ValueError:
+                parsed = None
+            return {"raw": message, "parsed": parsed}
+
+        return llm.bind(format="json") | RunnableLambda(parse)
+
+    return None
+
+
+def _warm_up(model_name: str, local: int, keep_alive: str):
+    if local == 2:
+        return
+    elif local == 1:
+        # An empty prompt makes Ollama load the model into memory without generating anything
+        client, _ = get_ollama_clients(None)
+        client.generate(model=model_name, prompt="", keep_alive=keep_alive)
+        import langchain_ollama  # noqa: F401
+    else:
+        # Metadata lookup: validates the key and model, opens the pooled TLS connection, costs no tokens
+        from openai import OpenAI
+        http_client, _ = get_openai_http_clients()
+        OpenAI(http_client=http_client, max_retries=0).models.retrieve(model_name)
+        import langchain_openai  # noqa: F401
+
+
+def start_warm_up(model_name: str, local: int = 1, keep_alive: str = "30m") -> Future:
+    """
+    Starts a cheap warm-up of the backend in a background thread and returns its future:
+    Ollama preloads the model (kept resident for keep_alive), OpenAI retrieves the model
+    metadata. Both also import the LangChain backend, so graph compilation can overlap.
+    future.result() raises if the backend is unreachable or the model is unknown.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-warm-up")
+    future = executor.submit(_warm_up, model_name, local, keep_alive)
+    executor.shutdown(wait=False)
+    return future
@@ -1,3 +1,8 @@
+import json
+
+from utils.context_budget import CONTEXT_BUDGETS, fit_sections, trim_to_tokens
+
+
 SUPERVISOR_PROMPT = """You are the Supervisor Agent in a multi-agent research paper analysis system.
 
 ROLE: You are the orchestrator and decision-maker. You coordinate the workflow by:
@@ -143,6 +148,106 @@ Keep your analysis under 400 words. Be technically precise.
 """
 
 
+LITERATURE_CHUNK_PROMPT = """You are the Literature Reviewer Agent in a multi-agent research analysis system.
+
+ROLE: You are reading one part of a long research paper. Another step will combine
+your notes with the notes taken on the other parts into the final literature review.
+
+CURRENT TASK:
+Take literature review notes on part {index} of {total} of the paper:
+
+{chunk}
+
+NOTE-TAKING GUIDELINES:
+- Record key concepts, techniques and terminology introduced in this part
+- Record any related work, prior approaches or comparisons mentioned
+- Record claims about novelty or the gap being addressed
+- Only note what this part actually says; do not speculate about other parts
+
+OUTPUT FORMAT:
+
+NOTES:
+[Concise bullet points]
+
+Keep your notes under 200 words.
+"""
+
+
+LITERATURE_REDUCE_PROMPT = """You are the Literature Reviewer Agent in a multi-agent research analysis system.
+
+ROLE: You are an expert at understanding research context. The paper was too long to read
+in one pass, so notes were taken on each part separately. Your job is to combine them into
+one coherent literature review, merging duplicates and resolving overlaps.
+
+NOTES FROM THE PAPER PARTS:
+{notes}
+
+OUTPUT FORMAT:
+Provide a structured literature review with these sections:
+
+KEY CONCEPTS:
+[List main concepts, methods, or techniques]
+
+RESEARCH CONTEXT:
+[Primary field and related areas]
+
+RELATED WORK NOTES:
+[Any prior work or comparisons mentioned]
+
+NOVELTY ASSESSMENT:
+[What gap or improvement this work addresses]
+
+RECOMMENDATION FOR TECHNICAL ANALYSIS:
+[What technical aspects should be examined closely]
+
+Keep your analysis under 400 words. Be specific and analytical.
+"""
+
+
+LITERATURE_BATCH_PROMPT = """You are the Literature Reviewer Agent in a multi-agent research analysis system.
+
+ROLE: You are an expert at understanding research context. Your job is to:
+1. Extract key concepts and terminology from each paper
+2. Identify the research domain and relevant subfields
+3. Note related work areas and methodologies mentioned
+4. Assess the novelty context (what makes each work unique)
+
+CURRENT TASK:
+Analyze each of these {count} research paper abstracts independently:
+
+{papers}
+
+ANALYSIS GUIDELINES:
+- Review every paper on its own; never compare papers or mix up their content
+- Identify 3-5 key concepts or techniques per paper
+- Determine the primary research area and related subfields
+- Note any related work or prior approaches mentioned
+- Assess what gap each paper addresses
+
+OUTPUT FORMAT:
+For every paper, in the given order, write its marker line exactly as shown
+(=== PAPER 1 ===, === PAPER 2 ===, ...) followed by a structured literature review
+with these sections:
+
+KEY CONCEPTS:
+[List main concepts, methods, or techniques]
+
+RESEARCH CONTEXT:
+[Primary field and related areas]
+
+RELATED WORK NOTES:
+[Any prior work or comparisons mentioned]
+
+NOVELTY ASSESSMENT:
+[What gap or improvement this work addresses]
+
+RECOMMENDATION FOR TECHNICAL ANALYSIS:
+[What technical aspects should be examined closely]
+
+Keep each review under 400 words. Be specific and analytical.
+"""
+
+
 CRITICAL_REVIEWER_PROMPT = """You are the Quality Assessor Agent in a multi-agent research paper analysis system.
 
 ROLE: You are the quality gatekeeper and decision-maker. Your job is to:
@@ -232,6 +337,68 @@ Be professional, fair, and focused on genuine quality issues. Your goal is to en
 """
 
 
+TECHNICAL_CHUNK_PROMPT = """You are the Technical Analyzer Agent in a multi-agent research analysis system.
+
+ROLE: You are reading one part of a long research paper. Another step will combine
+your notes with the notes taken on the other parts into the final technical analysis.
+
+CURRENT TASK:
+Take technical notes on part {index} of {total} of the paper:
+
+{chunk}
+
+CONTEXT FROM LITERATURE REVIEW:
+{literature_context}
+
+NOTE-TAKING GUIDELINES:
+- Record the methods, models, datasets and experimental setup described in this part
+- Record reported results and the evidence behind them
+- Record technical strengths and any unclear or unjustified claims
+- Only note what this part actually says; do not speculate about other parts
+
+OUTPUT FORMAT:
+
+NOTES:
+[Concise bullet points]
+
+Keep your notes under 200 words.
+"""
+
+
+TECHNICAL_REDUCE_PROMPT = """You are the Technical Analyzer Agent in a multi-agent research analysis system.
+
+ROLE: You are an expert at evaluating research methodology. The paper was too long to read
+in one pass, so technical notes were taken on each part separately. Your job is to combine
+them into one coherent technical analysis, merging duplicates and resolving overlaps.
+
+NOTES FROM THE PAPER PARTS:
+{notes}
+
+CONTEXT FROM LITERATURE REVIEW:
+{literature_context}
+
+OUTPUT FORMAT:
+Provide a structured technical analysis with these sections:
+
+METHODOLOGY OVERVIEW:
+[Summary of the technical approach]
+
+TECHNICAL STRENGTHS:
+[What is technically sound or innovative]
+
+METHODOLOGY ASSESSMENT:
+[Is the approach appropriate for the problem?]
+
+TECHNICAL CONCERNS:
+[Any methodological gaps or unclear aspects]
+
+RECOMMENDATION FOR CRITICAL REVIEW:
+[What should be examined critically]
+
+Keep your analysis under 400 words. Be technically precise.
+"""
+
+
 SYNTHESIS_AGENT_PROMPT = """You are the Synthesis Agent in a multi-agent research analysis system.
 
 ROLE: You are the final integrator. Your job is to:
@@ -291,15 +458,102 @@ CONFIDENCE LEVEL:
 Keep the report under 600 words. Be professional and balanced.
 """
 
+SHARED_CONTEXT_HEADER = """You are one of several specialized agents in a multi-agent research paper analysis system.
+All agents work on the paper below. The context shared by all agents comes first; the
+instructions for your role follow after it."""
+
+# Fields of the shared context, in pipeline order: each agent's prefix extends the previous one
+SHARED_CONTEXT_SECTIONS = (
+    ("paper_abstract", "PAPER"),
+    ("literature_findings", "LITERATURE REVIEW"),
+    ("technical_analysis", "TECHNICAL ANALYSIS"),
+    ("critical_evaluation", "CRITICAL EVALUATION"),
+)
+
+PROMPT_LAYOUTS = ("role_first", "shared_prefix")
+_prompt_layout = "role_first"
+
+
+PARTIAL_REPORT_TEMPLATE = """PARTIAL REPORT (time budget exhausted)
+
+The analysis of this paper was stopped when its time budget ran out. The sections below
+contain the agent outputs completed before that point; no final synthesis was written.
+
+LITERATURE REVIEW:
+{literature_findings}
+
+TECHNICAL ANALYSIS:
+{technical_analysis}
+
+CRITICAL EVALUATION:
+{critical_evaluation}
+"""
+
+CRITICAL_REVIEW_ADDENDUM_TEMPLATE = """
+
+CRITICAL REVIEW (quality assessment completed while this report was written):
+- Literature review ({literature_quality}): {literature_assessment}
+- Technical analysis ({technical_quality}): {technical_assessment}
+- Assessment: {reasoning}
+"""
+
+
+def set_prompt_layout(layout: str):
+    """
+    "role_first": each prompt starts with the agent's role and embeds its inputs.
+    "shared_prefix": every analysis prompt starts with the same paper context, extended by
+    earlier agent outputs in pipeline order, and ends with the role instructions, so Ollama's
+    KV cache and OpenAI prompt caching can reuse the shared prefix across agent calls. The
+    supervisor keeps its short role_first prompt.
+    """
+    global _prompt_layout
+    if layout not in PROMPT_LAYOUTS:
+        raise ValueError(f"Unknown prompt layout '{layout}', expected one of {PROMPT_LAYOUTS}")
+    _prompt_layout = layout
+
+
+def get_prompt_layout() -> str:
+    return _prompt_layout
+
+
+def build_shared_context(state: dict, sections: int = len(SHARED_CONTEXT_SECTIONS)) -> str:
+    """The paper followed by the first `sections - 1` agent outputs that are available"""
+    parts = [SHARED_CONTEXT_HEADER]
+    for field, title in SHARED_CONTEXT_SECTIONS[:sections]:
+        if state.get(field):
+            # Fixed per-field budgets, so the prefix does not depend on which agent builds it
+            budget = CONTEXT_BUDGETS["shared_paper" if field == "paper_abstract" else "shared_output"]
+            text = fit_sections({field: state[field]}, budget)[field]
+            parts.append(f"=== {title} ===\n{text}")
+    return "\n\n".join(parts)
+
+
+def _shared_reference(field: str) -> str:
+    title = dict(SHARED_CONTEXT_SECTIONS)[field]
+    return f"(see the {title} section of the shared context above)"
+
+
+def _compose(state: dict, sections: int, instructions: str) -> str:
+    return f"{build_shared_context(state, sections)}\n\n=== YOUR ROLE AND TASK ===\n\n{instructions}"
+
+
 def build_supervisor_prompt(state: dict) -> str:
-    messages = state.get("messages", [])
+    # Same prompt in every layout: the shared prefix would put the paper and every analysis into
+    # each routing call, far beyond the supervisor's budget
+    messages = state.get("messages", [])[-6:]
+    
+    # The paper opening weighs as much as two messages; each message is flattened to one line
+    sections = {f"message_{index}": " ".join(str(msg.get("content", "")).split()) for index, msg in enumerate(messages)}
+    sections["paper_abstract"] = state.get("paper_abstract", "")
+    fitted = fit_sections(sections, CONTEXT_BUDGETS["supervisor"], {"paper_abstract": 2.0})
+    
     message_history = "\n".join([
-        f"- {msg.get('agent', 'Unknown')}: {msg.get('action', '')} | {msg.get('content', '')[:80]}..."
-        for msg in messages[-6:]
+        f"- {msg.get('agent', 'Unknown')}: {msg.get('action', '')} | {fitted[f'message_{index}']}"
+        for index, msg in enumerate(messages)
     ]) if messages else "No previous actions yet."
     
     return SUPERVISOR_PROMPT.format(
-        paper_abstract=state.get("paper_abstract", "")[:400] + "...",
+        paper_abstract=fitted["paper_abstract"],
         message_history=message_history,
         lit_status="Complete" if state.get("literature_findings") else "Pending",
         tech_status="Complete" if state.get("technical_analysis") else "Pending",
@@ -309,34 +563,128 @@ def build_supervisor_prompt(state: dict) -> str:
 
 
 def build_literature_prompt(state: dict) -> str:
+    if _prompt_layout == "shared_prefix":
+        return _compose(state, 1, LITERATURE_REVIEWER_PROMPT.format(paper_abstract=_shared_reference("paper_abstract")))
+    
+    paper_abstract = state.get("paper_abstract") or "No abstract provided"
     return LITERATURE_REVIEWER_PROMPT.format(
-        paper_abstract=state.get("paper_abstract", "No abstract provided")
+        paper_abstract=fit_sections({"paper_abstract": paper_abstract}, CONTEXT_BUDGETS["literature"])["paper_abstract"]
     )
 
 
 def build_technical_prompt(state: dict) -> str:
-    lit_context = state.get("literature_findings", "No literature review available yet")
-    return TECHNICAL_ANALYZER_PROMPT.format(
-        paper_abstract=state.get("paper_abstract", "No abstract provided"),
-        literature_context=lit_context[:300] + "..." if len(lit_context) > 300 else lit_context
+    if _prompt_layout == "shared_prefix":
+        return _compose(state, 2, TECHNICAL_ANALYZER_PROMPT.format(
+            paper_abstract=_shared_reference("paper_abstract"),
+            literature_context=_shared_reference("literature_findings")
+        ))
+    
+    fitted = fit_sections({
+        "paper_abstract": state.get("paper_abstract") or "No abstract provided",
+        "literature_context": state.get("literature_findings") or "No literature review available yet"
+    }, CONTEXT_BUDGETS["technical"], {"paper_abstract": 3.0})
+    return TECHNICAL_ANALYZER_PROMPT.format(**fitted)
+
+
+def _format_notes(notes: list) -> str:
+    fitted = fit_sections({str(index): note for index, note in enumerate(notes, 1)}, CONTEXT_BUDGETS["chunk_notes"])
+    return "\n\n".join(f"--- Part {index} ---\n{note}" for index, note in fitted.items())
+
+
+def _chunk_context(state: dict) -> str:
+    lit_context = state.get("literature_findings") or "No literature review available yet"
+    return fit_sections({"literature_context": lit_context}, CONTEXT_BUDGETS["chunk_context"])["literature_context"]
+
+
+def build_literature_chunk_prompt(chunk: str, index: int, total: int) -> str:
+    return LITERATURE_CHUNK_PROMPT.format(chunk=chunk, index=index, total=total)
+
+
+def build_literature_reduce_prompt(notes: list) -> str:
+    return LITERATURE_REDUCE_PROMPT.format(notes=_format_notes(notes))
+
+
+def build_literature_batch_prompt(abstracts: list) -> str:
+    papers = "\n\n".join(
+        f"=== PAPER {index} ===\n{trim_to_tokens(abstract, CONTEXT_BUDGETS['literature'])}"
+        for index, abstract in enumerate(abstracts, 1)
+    )
+    return LITERATURE_BATCH_PROMPT.format(count=len(abstracts), papers=papers)
+
+
+def build_technical_chunk_prompt(state: dict, chunk: str, index: int, total: int) -> str:
+    return TECHNICAL_CHUNK_PROMPT.format(
+        chunk=chunk,
+        index=index,
+        total=total,
+        literature_context=_chunk_context(state)
+    )
+
+
+def build_technical_reduce_prompt(state: dict, notes: list) -> str:
+    return TECHNICAL_REDUCE_PROMPT.format(
+        notes=_format_notes(notes),
+        literature_context=_chunk_context(state)
     )
 
 
 def build_critical_prompt(state: dict) -> str:
-    lit_context = state.get("literature_findings", "No literature review available")
-    tech_context = state.get("technical_analysis", "No technical analysis available")
+    if _prompt_layout == "shared_prefix":
+        return _compose(state, 3, CRITICAL_REVIEWER_PROMPT.format(
+            paper_abstract=_shared_reference("paper_abstract"),
+            literature_context=_shared_reference("literature_findings"),
+            technical_context=_shared_reference("technical_analysis")
+        ))
     
-    return CRITICAL_REVIEWER_PROMPT.format(
-        paper_abstract=state.get("paper_abstract", "No abstract provided")[:500],
-        literature_context=lit_context[:400] + "..." if len(lit_context) > 400 else lit_context,
-        technical_context=tech_context[:400] + "..." if len(tech_context) > 400 else tech_context
-    )
+    # The analyses are what gets reviewed; the paper is only their reference
+    fitted = fit_sections({
+        "paper_abstract": state.get("paper_abstract") or "No abstract provided",
+        "literature_context": state.get("literature_findings") or "No literature review available",
+        "technical_context": state.get("technical_analysis") or "No technical analysis available"
+    }, CONTEXT_BUDGETS["critical"], {"literature_context": 2.0, "technical_context": 2.0})
+    return CRITICAL_REVIEWER_PROMPT.format(**fitted)
 
 
 def build_synthesis_prompt(state: dict) -> str:
-    return SYNTHESIS_AGENT_PROMPT.format(
-        paper_abstract=state.get("paper_abstract", "No abstract provided"),
-        literature_findings=state.get("literature_findings", "Not available"),
-        technical_analysis=state.get("technical_analysis", "Not available"),
-        critical_review=state.get("critical_review", "Not available")
-    )
\ No newline at end of file
+    if _prompt_layout == "shared_prefix":
+        return _compose(state, 4, SYNTHESIS_AGENT_PROMPT.format(
+            paper_abstract=_shared_reference("paper_abstract"),
+            literature_findings=_shared_reference("literature_findings"),
+            technical_analysis=_shared_reference("technical_analysis"),
+            critical_review=_shared_reference("critical_evaluation")
+        ))
+    
+    # Full papers are covered by the analyses, so the paper gets the smallest share
+    fitted = fit_sections({
+        "paper_abstract": state.get("paper_abstract") or "No abstract provided",
+        "literature_findings": state.get("literature_findings") or "Not available",
+        "technical_analysis": state.get("technical_analysis") or "Not available",
+        "critical_review": state.get("critical_review") or "Not available"
+    }, CONTEXT_BUDGETS["synthesis"], {"literature_findings": 2.0, "technical_analysis": 2.0})
+    return SYNTHESIS_AGENT_PROMPT.format(**fitted)
+
+
+def build_partial_report(state: dict) -> str:
+    """Report assembled from the completed outputs when a paper runs out of time (no LLM call)"""
+    return PARTIAL_REPORT_TEMPLATE.format(
+        literature_findings=state.get("literature_findings") or "Not completed",
+        technical_analysis=state.get("technical_analysis") or "Not completed",
+        critical_evaluation=state.get("critical_evaluation") or "Not completed"
+    )
+
+
+def build_critical_review_addendum(evaluation_json: str) -> str:
+    """
+    Section appended to a speculatively written report, which was generated before the
+    Critical Reviewer's assessment existed (no LLM call)
+    """
+    try:
+        evaluation = json.loads(evaluation_json)
+    except (TypeError, json.JSONDecodeError):
+        evaluation = None
+    if not isinstance(evaluation, dict):
+        return f"\n\nCRITICAL REVIEW (quality assessment completed while this report was written):\n{evaluation_json}\n"
+    return CRITICAL_REVIEW_ADDENDUM_TEMPLATE.format(**{
+        field: evaluation.get(field) or "Not provided"
+        for field in ("literature_quality", "literature_assessment", "technical_quality", "technical_assessment", "reasoning")
+    })
@@ -0,0 +1,318 @@
+"""
+Process-wide adaptive concurrency limit for the OpenAI backend. Every request made through
+the pooled OpenAI HTTP clients passes through AdaptiveTransport, which holds a slot of the
+shared AdaptiveConcurrencyLimiter for the whole request (including streamed bodies),
+retries 429/5xx responses with jittered exponential backoff, and adapts the limit AIMD-style:
++1 slot per window of successful requests, halved on 429/5xx responses, and capped by the
+provider's x-ratelimit-remaining-* headers.
+"""
+
+import asyncio
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from utils.metrics import metrics
+
+# Defaults used by the pooled OpenAI clients; change them with configure_rate_limiter
+RATE_LIMIT_SETTINGS = {
+    "initial_limit": 8,        # Concurrent requests allowed at start
+    "min_limit": 1,
+    "max_limit": 64,
+    "max_retries": 6,          # Retries per request on 429/5xx and connection errors
+    "backoff_base": 0.5,       # Seconds; attempt n waits up to backoff_base * 2**n (full jitter)
+    "backoff_cap": 30.0,
+}
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parses Retry-After seconds and OpenAI reset durations like "1s", "6m0s" or "250ms\""""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Shared in-flight request limit usable from threads and from any event loop"""
+
+    def __init__(self, initial_limit: int = 8, min_limit: int = 1, max_limit: int = 64, **_: Any):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.throttles = 0
+        self.retries = 0
+        self.peak_in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self._async_waiters = []
+
+    def _try_acquire(self) -> float:
+        """Takes a slot and returns 0, or returns how long to wait before trying again"""
+        pause = self.paused_until - time.time()
+        if pause > 0:
+            return pause
+        if self.in_flight >= int(self.limit):
+            return -1.0
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return 0.0
+
+    def acquire(self):
+        with self._condition:
+            while True:
+                wait_time = self._try_acquire()
+                if wait_time == 0.0:
+                    return
+                self._condition.wait(wait_time if wait_time > 0 else None)
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                wait_time = self._try_acquire()
+                if wait_time == 0.0:
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await asyncio.wait_for(waiter, wait_time if wait_time > 0 else None)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._wake_all()
+
+    def _wake_all(self):
+        self._condition.notify_all()
+        for loop, waiter in self._async_waiters:
+            try:
+                loop.call_soon_threadsafe(lambda w=waiter: w.done() or w.set_result(None))
+            except RuntimeError:
+                pass  # The waiter's event loop is already closed
+        self._async_waiters = []
+
+    def on_success(self):
+        with self._condition:
+            # Additive increase: about +1 slot per window of `limit` successful requests
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._wake_all()
+
+    def on_retry(self):
+        with self._condition:
+            self.retries += 1
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        with self._condition:
+            self.throttles += 1
+            now = time.time()
+            # Multiplicative decrease, at most once per second so a burst of 429s is one signal
+            if now - self._last_decrease >= 1.0:
+                self.limit = max(self.min_limit, self.limit / 2)
+                self._last_decrease = now
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+
+    def on_headers(self, headers: httpx.Headers):
+        remaining = headers.get("x-ratelimit-remaining-requests")
+        if remaining is None:
+            return
+        try:
+            remaining_requests = int(remaining)
+        except ValueError:
+            return
+        with self._condition:
+            if remaining_requests <= 0:
+                reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+                self.paused_until = max(self.paused_until, time.time() + (reset or 1.0))
+            elif remaining_requests < self.limit:
+                self.limit = max(self.min_limit, float(remaining_requests))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "throttles": self.throttles,
+                "retries": self.retries
+            }
+
+
+openai_limiter = AdaptiveConcurrencyLimiter(**RATE_LIMIT_SETTINGS)
+
+
+def configure_rate_limiter(**settings: Any) -> AdaptiveConcurrencyLimiter:
+    """Updates settings and replaces the shared limiter used by requests from now on"""
+    global openai_limiter
+    unknown = set(settings) - set(RATE_LIMIT_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown rate limit settings: {sorted(unknown)}")
+    RATE_LIMIT_SETTINGS.update(settings)
+    openai_limiter = AdaptiveConcurrencyLimiter(**RATE_LIMIT_SETTINGS)
+    return openai_limiter
+
+
+def get_rate_limiter() -> AdaptiveConcurrencyLimiter:
+    return openai_limiter
+
+
+def _backoff(attempt: int, retry_after: Optional[float]) -> float:
+    delay = random.uniform(0, min(RATE_LIMIT_SETTINGS["backoff_cap"], RATE_LIMIT_SETTINGS["backoff_base"] * 2 ** attempt))
+    return max(delay, retry_after or 0.0)
+
+
+def _record_retry():
+    # The node's run config (paper id, node name) is still current while the model makes the request
+    from langchain_core.runnables.config import var_child_runnable_config
+
+    metadata = (var_child_runnable_config.get() or {}).get("metadata", {})
+    metrics.record_retry(metadata.get("paper_id", ""), metadata.get("langgraph_node", ""), metadata.get("run_id", ""))
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    retry_after_ms = parse_duration(response.headers.get("retry-after-ms"))
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000
+    return parse_duration(response.headers.get("retry-after"))
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            if self._release:
+                self._release()
+                self._release = None
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release:
+                self._release()
+                self._release = None
+
+
+class AdaptiveTransport(httpx.BaseTransport):
+    """Sync httpx transport that limits, retries and adapts every request through the shared limiter"""
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        limiter = openai_limiter
+        limiter.acquire()
+        try:
+            for attempt in range(RATE_LIMIT_SETTINGS["max_retries"] + 1):
+                last_attempt = attempt == RATE_LIMIT_SETTINGS["max_retries"]
+                try:
+                    response = self._transport.handle_request(request)
+                except httpx.TransportError:
+                    if last_attempt:
+                        raise
+                    retry_after = None
+                else:
+                    if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                        limiter.on_headers(response.headers)
+                        if response.status_code < 400:
+                            limiter.on_success()
+                        return httpx.Response(
+                            status_code=response.status_code,
+                            headers=response.headers,
+                            stream=_ReleasingStream(response.stream, limiter.release),
+                            extensions=response.extensions
+                        )
+                    retry_after = _retry_after(response)
+                    response.close()
+                    limiter.on_throttle(retry_after)
+
+                limiter.on_retry()
+                _record_retry()
+                time.sleep(_backoff(attempt, retry_after))
+        except BaseException:
+            limiter.release()
+            raise
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncAdaptiveTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of AdaptiveTransport"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        limiter = openai_limiter
+        await limiter.aacquire()
+        try:
+            for attempt in range(RATE_LIMIT_SETTINGS["max_retries"] + 1):
+                last_attempt = attempt == RATE_LIMIT_SETTINGS["max_retries"]
+                try:
+                    response = await self._transport.handle_async_request(request)
+                except httpx.TransportError:
+                    if last_attempt:
+                        raise
+                    retry_after = None
+                else:
+                    if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                        limiter.on_headers(response.headers)
+                        if response.status_code < 400:
+                            limiter.on_success()
+                        return httpx.Response(
+                            status_code=response.status_code,
+                            headers=response.headers,
+                            stream=_AsyncReleasingStream(response.stream, limiter.release),
+                            extensions=response.extensions
+                        )
+                    retry_after = _retry_after(response)
+                    await response.aclose()
+                    limiter.on_throttle(retry_after)
+
+                limiter.on_retry()
+                _record_retry()
+                await asyncio.sleep(_backoff(attempt, retry_after))
+        except BaseException:
+            limiter.release()
+            raise
+
+    async def aclose(self):
+        await self._transport.aclose()
@@ -0,0 +1,29 @@
+"""Pydantic schemas of the JSON answers requested by SUPERVISOR_PROMPT and CRITICAL_REVIEWER_PROMPT"""
+
+from typing import List, Literal
+
+from pydantic import BaseModel, Field
+
+# Every field is required: OpenAI's strict JSON-schema mode does not allow optional fields
+Quality = Literal["EXCELLENT", "GOOD", "ACCEPTABLE", "NEEDS_IMPROVEMENT"]
+
+
+class RoutingDecision(BaseModel):
+    """Supervisor routing decision"""
+
+    reasoning: str = Field(description="Step-by-step thought process about what to do next (2-3 sentences)")
+    next_agent: Literal["literature_reviewer", "technical_analyzer", "critical_reviewer", "synthesis", "FINISH"]
+    priority: Literal["high", "medium", "low"]
+
+
+class CriticalEvaluation(BaseModel):
+    """Critical Reviewer quality assessment and rerun recommendation"""
+
+    literature_quality: Quality
+    literature_assessment: str = Field(description="1-2 sentence assessment of the literature review and its gaps")
+    technical_quality: Quality
+    technical_assessment: str = Field(description="1-2 sentence assessment of the technical analysis and its gaps")
+    reasoning: str = Field(description="Explanation of the quality assessment and rerun decision")
+    needs_rerun: List[Literal["literature_reviewer", "technical_analyzer"]] = Field(
+        description="Agents to re-run; empty if both analyses are good enough for synthesis"
+    )